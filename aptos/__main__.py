@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import py_compile
+import sys
+
+from . import avro, codegen, models, ndjson, parallel
+from .util import Parser
+from .validator import Validator
+
+
+def errors(schema, filename, jobs, meter):
+    if jobs != 1:
+        yield from parallel.validate(schema, filename, jobs or None, meter)
+        return
+    check = Validator(schema).check
+    with open(filename, 'rb') as fp:
+        lines = meter.measure(ndjson.records(fp))
+        yield from ndjson.validate(check, lines)
+
+
+def validate(args):
+    schema = Parser.parse(args.schema)
+    output = sys.stdout if args.output is None else open(args.output, 'w')
+    meter, invalid = ndjson.Meter(), 0
+    try:
+        for lineno, error in errors(schema, args.file, args.jobs, meter):
+            invalid += 1
+            output.write('%d\t%s\n' % (lineno, error))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(meter.report(invalid), file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def convert(args):
+    schema = Parser.parse(args.schema)
+    check, loads = Validator(schema).check, json.loads
+    meter, invalid = ndjson.Meter(), 0
+    with open(args.file, 'rb') as fp, open(args.output, 'wb') as output:
+        with avro.Writer(
+                output, schema, args.codec, args.block_size) as writer:
+            for lineno, line in meter.measure(ndjson.records(fp)):
+                try:
+                    instance = loads(line)
+                    check(instance)
+                    writer.write(instance)
+                except (AssertionError, ValueError) as e:
+                    invalid += 1
+                    print('%d\t%s' % (lineno, e))
+    print(meter.report(invalid), file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def generate(args):
+    with open(args.schema, 'rb') as fp:
+        instance = json.loads(fp.read().decode('utf-8'))
+    if 'openapi' in instance:
+        specification = models.OpenAPI.fromJson(instance)
+        specification.accept(models.TypeVisitor(instance))
+        schemas = specification.components.get('schemas', {})
+    else:
+        name = instance.get('title') or os.path.splitext(
+            os.path.basename(args.schema))[0]
+        schemas = {name: Parser.parse(args.schema)}
+    source = codegen.generate(schemas, os.path.basename(args.schema))
+    if args.output is None:
+        sys.stdout.write(source)
+        return 0
+    with open(args.output, 'w') as fp:
+        fp.write(source)
+    # Ship the bytecode too, so that importing the module compiles nothing.
+    py_compile.compile(args.output, doraise=True)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='aptos')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    subparser = subparsers.add_parser(
+        'validate', help='validate newline-delimited JSON against a schema')
+    subparser.add_argument('schema', help='path to the JSON Schema document')
+    subparser.add_argument('file', help='path to the NDJSON file')
+    subparser.add_argument(
+        '-o', '--output',
+        help='write invalid line numbers and errors to OUTPUT, not stdout')
+    subparser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='validate memory-mapped shards of FILE in JOBS processes '
+             '(0 uses every CPU core)')
+    subparser.set_defaults(func=validate)
+    subparser = subparsers.add_parser(
+        'convert', help='convert newline-delimited JSON to an Avro file')
+    subparser.add_argument('schema', help='path to the JSON Schema document')
+    subparser.add_argument('file', help='path to the NDJSON file')
+    subparser.add_argument('output', help='path to the Avro file to write')
+    subparser.add_argument(
+        '-c', '--codec', choices=avro.Writer.codecs, default='deflate',
+        help='compress blocks with CODEC (default: deflate)')
+    subparser.add_argument(
+        '-b', '--block-size', type=int, default=64 * 1024,
+        help='write a block once BLOCK_SIZE bytes are buffered')
+    subparser.set_defaults(func=convert)
+    subparser = subparsers.add_parser(
+        'generate',
+        help='generate a Python module of validators for a JSON Schema or '
+             'the component schemas of an OpenAPI document')
+    subparser.add_argument(
+        'schema', help='path to the JSON Schema or OpenAPI document')
+    subparser.add_argument(
+        '-o', '--output',
+        help='write the module, and its bytecode, to OUTPUT, not stdout')
+    subparser.set_defaults(func=generate)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Validate JSON request bodies in front of an ASGI application.
+
+`Middleware` finds the operation of each HTTP request with a `Router`
+and validates JSON bodies before the application sees them.  Small
+bodies are parsed and validated on the event loop; larger ones are
+handed to a bounded pool of threads or processes, so that a single
+large upload does not hold up every other connection.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+import pickle
+import uuid
+
+from .router import Router
+from .validator import Validator
+
+# The schemas and compiled validators of a worker process, set by
+# `initialize` and compiled on first use.
+schemas, validators = (), {}
+
+
+def initialize(specification):
+    global schemas
+    schemas = specification
+
+
+def check(validator, body, maxErrors):
+    """Return the status and errors of an invalid body, or `None`."""
+    try:
+        instance = json.loads(body)
+    except ValueError as e:
+        return 400, [{'message': 'invalid JSON: %s' % e}]
+    errors = validator.errors(instance, maxErrors)
+    if not errors:
+        return None
+    return 422, [error.asJson() for error in errors]
+
+
+def check_remote(index, body, maxErrors, schema=None):
+    """Run `check` in a worker process against schema `index`.
+
+    Workers of a pool started by `Middleware` were sent every schema by
+    `initialize`; the others are sent the pickled `schema` with each
+    task, and only load it the first time they see `index`.
+    """
+    validator = validators.get(index)
+    if validator is None:
+        schema = schemas[index] if schema is None else pickle.loads(schema)
+        validator = validators[index] = Validator(schema)
+    return check(validator, body, maxErrors)
+
+
+def content_type(headers):
+    for name, value in headers:
+        if name.lower() == b'content-type':
+            return value.decode('latin-1')
+    return 'application/json'
+
+
+def json_type(contentType):
+    kind = contentType.partition(';')[0].strip().lower()
+    return kind == 'application/json' or kind.endswith('+json')
+
+
+class Middleware:
+    """Reject requests whose JSON body does not match their operation.
+
+    `specification` is an `OpenAPI` object or a `Router` built from one.
+    Bodies of at least `threshold` bytes are validated in `executor`, or
+    in a pool of `processes` worker processes, or else in a pool of
+    threads.  An `executor` that is a `ProcessPoolExecutor` is sent the
+    pickled schema with each body.  At most `limit` of them are queued
+    or running at once, and further requests wait their turn.
+
+    Invalid bodies are answered with `400` when they are not JSON, and
+    with `422` and up to `maxErrors` errors when they do not match the
+    schema.  Valid requests are passed on with their body intact and
+    the path parameters in `scope['path_params']`.
+
+    With a `Sampler`, the responses it picks are validated too, once
+    they have been sent, and in the pool from `threshold` bytes on;
+    failures are only counted and reported.
+    """
+
+    def __init__(self, app, specification, threshold=64 * 1024,
+                 executor=None, processes=None, limit=None, maxErrors=10,
+                 sampler=None):
+        self.app = app
+        self.sampler = sampler
+        self.router = (
+            specification if isinstance(specification, Router)
+            else Router(specification))
+        self.threshold = threshold
+        self.maxErrors = maxErrors
+        # Worker processes are sent every schema once, and then only an
+        # index into them with each body.
+        self.indexes = dict(
+            (validator, index)
+            for index, validator in enumerate(self.router.validators.values()))
+        self.owned = executor is None
+        if executor is None and processes:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                processes, initializer=initialize,
+                initargs=(tuple(self.router.validators),))
+        self.remote = isinstance(
+            executor, concurrent.futures.ProcessPoolExecutor)
+        self.payloads = {}
+        if self.remote and not self.owned:
+            # A pool passed in was not started with the schemas, and may
+            # serve other middleware: tasks carry their pickled schema,
+            # and indexes are made unique to this middleware.
+            token = uuid.uuid4().hex
+            self.indexes = dict(
+                (validator, (token, index))
+                for validator, index in self.indexes.items())
+            self.payloads = dict(
+                (validator, pickle.dumps(schema))
+                for schema, validator in self.router.validators.items())
+        self.executor = executor
+        self.workers = processes or min(4, os.cpu_count() or 1)
+        self.limit = limit or self.workers * 2
+        self.semaphore = None
+
+    def close(self):
+        """Shut down the pool, unless it was passed in as `executor`."""
+        if self.owned and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        match = self.router.match(scope['method'], scope['path'])
+        if match is None:
+            return await self.app(scope, receive, send)
+        route, parameters = match
+        scope = dict(scope, path_params=parameters)
+        respond = send
+        if self.sampler is not None and self.sampler.sample(route):
+            respond = self.observe(route, send)
+        contentType = content_type(scope.get('headers', ()))
+        validator = route.request(contentType)
+        if validator is None or not json_type(contentType):
+            return await self.app(scope, receive, respond)
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+        body = bytes(body)
+        if len(body) < self.threshold:
+            result = check(validator, body, self.maxErrors)
+        else:
+            result = await self.offload(validator, body)
+        if result is not None:
+            return await self.reject(send, *result)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await self.app(scope, replay, respond)
+
+    def observe(self, route, send):
+        """Wrap `send` to validate the response once it has been sent."""
+        status, contentType, body = None, None, bytearray()
+
+        async def observed(message):
+            nonlocal status, contentType
+            await send(message)
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                contentType = content_type(message.get('headers', ()))
+            elif message['type'] == 'http.response.body':
+                body.extend(message.get('body', b''))
+                if not message.get('more_body', False) and json_type(
+                        contentType):
+                    await self.verify(route, status, contentType, bytes(body))
+        return observed
+
+    async def verify(self, route, status, contentType, body):
+        """Validate a sampled response, in the pool if it is large."""
+        sampler = self.sampler
+        if len(body) < self.threshold:
+            sampler.check(route, status, contentType, body)
+            return
+        errors, elapsed = await self.submit(functools.partial(
+            sampler.validate, route, status, contentType, body), False)
+        sampler.account(route, status, errors, elapsed)
+
+    async def offload(self, validator, body):
+        if self.remote:
+            task = functools.partial(
+                check_remote, self.indexes[validator], body, self.maxErrors,
+                self.payloads.get(validator))
+        else:
+            task = functools.partial(check, validator, body, self.maxErrors)
+        return await self.submit(task)
+
+    async def submit(self, task, remote=True):
+        """Run `task` in the pool, with at most `limit` tasks at once.
+
+        Tasks that cannot be sent to worker processes pass `remote=False`
+        and, with a process pool, run in the loop's default thread pool.
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.limit)
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                self.workers, thread_name_prefix='aptos')
+        executor = self.executor if remote or not self.remote else None
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, task)
+
+    @staticmethod
+    async def reject(send, status, errors):
+        body = json.dumps({'errors': errors}).encode('utf-8')
+        await send({
+            'type': 'http.response.start', 'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1'))]})
+        await send({'type': 'http.response.body', 'body': body})
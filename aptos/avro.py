@@ -0,0 +1,631 @@
+"""Avro binary encoding compiled from an Avro schema.
+
+`Codec` turns a schema, either the output of `RecordVisitor` or a
+`Primitive` tree that is converted with it, into a pair of specialised
+closures: one appends the encoding of an instance to a `bytearray`, the
+other reads an instance back from a buffer and returns it with the
+position that follows it.  `Writer` and `Reader` stream instances to and
+from Avro object container files.
+"""
+import json
+import os
+import struct
+import zlib
+
+from . import primitives
+from .visitors import RecordVisitor
+
+DOUBLE = struct.Struct('<d')
+FLOAT = struct.Struct('<f')
+
+# Object container files start with these four bytes.
+MAGIC = b'Obj\x01'
+
+# The Python classes each Avro type accepts when choosing a union branch.
+CLASSES = {
+    'null': (type(None),),
+    'boolean': (bool,),
+    'int': (int,),
+    'long': (int,),
+    'float': (int, float,),
+    'double': (int, float,),
+    'bytes': (bytes,),
+    'string': (str,),
+    'fixed': (bytes,),
+    'enum': (str,),
+    'array': (list, tuple,),
+    'map': (dict,),
+    'record': (dict,),
+}
+
+
+def write_long(value, out):
+    # Zig-zag maps signed integers to unsigned ones so that numbers of
+    # small magnitude have a short varint encoding.
+    n = (value << 1) ^ (value >> 63)
+    while n & ~0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_long(data, position):
+    b = data[position]
+    position += 1
+    n = b & 0x7F
+    shift = 7
+    while b & 0x80:
+        b = data[position]
+        position += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+    return (n >> 1) ^ -(n & 1), position
+
+
+# The range of values of the Avro integer types.
+RANGES = {
+    'int': (-(1 << 31), 1 << 31),
+    'long': (-(1 << 63), 1 << 63),
+}
+
+
+def integer(bits):
+    low, high = -(1 << (bits - 1)), 1 << (bits - 1)
+
+    def write(value, out):
+        if value.__class__ is bool or not isinstance(value, int):
+            raise ValueError('%r is not an integer' % value)
+        if not low <= value < high:
+            raise ValueError('%r is out of range for a %d bit integer' % (
+                value, bits))
+        write_long(value, out)
+    return write, read_long
+
+
+def write_null(value, out):
+    pass
+
+
+def read_null(data, position):
+    return None, position
+
+
+def write_boolean(value, out):
+    if value.__class__ is not bool:
+        raise ValueError('%r is not a boolean' % value)
+    out.append(1 if value else 0)
+
+
+def read_boolean(data, position):
+    return data[position] == 1, position + 1
+
+
+def floating(packer):
+    pack, unpack, size = packer.pack, packer.unpack_from, packer.size
+
+    def write(value, out):
+        if value.__class__ is bool or not isinstance(value, (int, float)):
+            raise ValueError('%r is not a number' % value)
+        try:
+            out += pack(value)
+        except (OverflowError, struct.error):
+            raise ValueError('%r is out of range for a %d bit float' % (
+                value, size * 8))
+
+    def read(data, position):
+        return unpack(data, position)[0], position + size
+    return write, read
+
+
+def write_bytes(value, out):
+    write_long(len(value), out)
+    out += value
+
+
+def read_bytes(data, position):
+    size, position = read_long(data, position)
+    end = position + size
+    if end > len(data):
+        raise IndexError(end)
+    return bytes(data[position:end]), end
+
+
+def write_string(value, out):
+    value = value.encode('utf-8')
+    write_long(len(value), out)
+    out += value
+
+
+def read_string(data, position):
+    size, position = read_long(data, position)
+    end = position + size
+    if end > len(data):
+        raise IndexError(end)
+    return str(data[position:end], 'utf-8'), end
+
+
+def read_count(data, position):
+    """Read the item count of a block of an array or map."""
+    count, position = read_long(data, position)
+    if count < 0:
+        # A negative count is followed by the block size in bytes.
+        count = -count
+        size, position = read_long(data, position)
+    return count, position
+
+
+class Codec:
+    """Encode and decode instances of one Avro schema.
+
+    The schema is compiled once, and like `Validator`, a `Codec` keeps
+    no per-call state, so it can be shared between threads.
+    """
+
+    __slots__ = ('schema', 'write', 'read',)
+
+    def __init__(self, schema):
+        if isinstance(schema, primitives.Component):
+            schema = schema.accept(RecordVisitor())
+        self.schema = schema
+        self.write, self.read = Compiler().compile(schema)
+
+    def encode(self, instance):
+        out = bytearray()
+        self.write(instance, out)
+        return bytes(out)
+
+    def decode(self, data):
+        try:
+            instance, position = self.read(data, 0)
+        except (IndexError, struct.error):
+            raise ValueError('truncated Avro data')
+        if position != len(data):
+            raise ValueError('%d bytes of trailing data' % (
+                len(data) - position))
+        return instance
+
+
+class Compiler:
+    """Build the writer and reader closures of an Avro schema."""
+
+    types = {
+        'null': (write_null, read_null),
+        'boolean': (write_boolean, read_boolean),
+        'int': integer(32),
+        'long': integer(64),
+        'float': floating(FLOAT),
+        'double': floating(DOUBLE),
+        'bytes': (write_bytes, read_bytes),
+        'string': (write_string, read_string),
+    }
+
+    def __init__(self):
+        # Named types by full name, filled in as they are compiled so
+        # that a record can refer to itself.  Each is a list of its
+        # schema, writer, reader and, once a union needs it, predicate.
+        self.named = {}
+        self.namespace = None
+
+    def compile(self, schema):
+        if isinstance(schema, list):
+            return self.union(schema)
+        if isinstance(schema, str):
+            if schema in self.types:
+                return self.types[schema]
+            return self.reference(schema)
+        kind = schema['type']
+        if isinstance(kind, (list, dict)):
+            return self.compile(kind)
+        if kind in ('record', 'error'):
+            return self.record(schema)
+        if kind == 'enum':
+            return self.enum(schema)
+        if kind == 'array':
+            return self.array(schema)
+        if kind == 'map':
+            return self.map(schema)
+        if kind == 'fixed':
+            return self.fixed(schema)
+        return self.compile(kind)
+
+    def kind(self, schema):
+        """Return the Avro type name of `schema`."""
+        if isinstance(schema, list):
+            return 'union'
+        if isinstance(schema, dict):
+            return self.kind(schema['type'])
+        if schema in CLASSES:
+            return schema
+        return self.kind(self.lookup(schema)[0])
+
+    def register(self, schema):
+        name = schema.get('name')
+        if not name:
+            raise ValueError('Avro %s schemas need a name' % schema['type'])
+        namespace = schema.get('namespace', self.namespace)
+        if namespace and '.' not in name:
+            name = '%s.%s' % (namespace, name)
+        if name in self.named:
+            raise ValueError('the Avro type %r is defined twice' % name)
+        cell = self.named[name] = [schema, None, None, None]
+        return cell
+
+    def lookup(self, name):
+        """Return the cell of a named type, by full or relative name."""
+        if '.' not in name and self.namespace:
+            cell = self.named.get('%s.%s' % (self.namespace, name))
+            if cell is not None:
+                return cell
+        cell = self.named.get(name)
+        if cell is None:
+            raise ValueError('unknown Avro type %r' % name)
+        return cell
+
+    def reference(self, name):
+        cell = self.lookup(name)
+
+        def write(value, out):
+            cell[1](value, out)
+
+        def read(data, position):
+            return cell[2](data, position)
+        return write, read
+
+    def accepts(self, schema):
+        """Build a predicate telling whether a value fits `schema`.
+
+        Unions use it to choose between branches accepting the same
+        Python class.  Records accept the dicts with all of their fields
+        without a default and no other members.
+        """
+        if isinstance(schema, list):
+            branches = tuple(self.accepts(branch) for branch in schema)
+            return lambda value: any(accept(value) for accept in branches)
+        if isinstance(schema, str):
+            if schema in RANGES:
+                low, high = RANGES[schema]
+                return lambda value: (
+                    value.__class__ is int and low <= value < high)
+            if schema in CLASSES:
+                classes = CLASSES[schema]
+                return lambda value: value.__class__ in classes
+            cell = self.lookup(schema)
+
+            def accept(value):
+                # Built on first use, as a record may contain itself.
+                if cell[3] is None:
+                    cell[3] = self.accepts(cell[0])
+                return cell[3](value)
+            return accept
+        kind = schema['type']
+        if isinstance(kind, (list, dict)):
+            return self.accepts(kind)
+        if kind in ('record', 'error'):
+            fields = tuple(
+                (field['name'], self.accepts(field['type']),
+                 'default' in field)
+                for field in schema['fields'])
+            names = frozenset(name for name, _, _ in fields)
+
+            def accept(value):
+                if value.__class__ is not dict:
+                    return False
+                for name, member, optional in fields:
+                    if name in value:
+                        if not member(value[name]):
+                            return False
+                    elif not optional:
+                        return False
+                return all(name in names for name in value)
+            return accept
+        if kind == 'enum':
+            keys = frozenset(
+                primitives.canonical(symbol) for symbol in schema['symbols'])
+            return lambda value: (
+                value.__class__ is str and value in keys)
+        if kind == 'array':
+            items = self.accepts(schema['items'])
+            return lambda value: value.__class__ in (list, tuple) and all(
+                items(item) for item in value)
+        if kind == 'map':
+            values = self.accepts(schema['values'])
+            return lambda value: value.__class__ is dict and all(
+                values(member) for member in value.values())
+        if kind == 'fixed':
+            size = schema['size']
+            return lambda value: (
+                value.__class__ is bytes and len(value) == size)
+        return self.accepts(kind)
+
+    def record(self, schema):
+        cell = self.register(schema)
+        namespace, self.namespace = self.namespace, schema.get(
+            'namespace', self.namespace)
+        fields = []
+        for field in schema['fields']:
+            write, read = self.compile(field['type'])
+            fields.append((field['name'], write, read, 'default' in field,
+                           field.get('default')))
+        self.namespace = namespace
+        writers = tuple(
+            (name, write, optional, default)
+            for name, write, read, optional, default in fields)
+        readers = tuple(
+            (name, read, optional and default is None)
+            for name, write, read, optional, default in fields)
+
+        def write(value, out):
+            for name, write, optional, default in writers:
+                if name in value:
+                    write(value[name], out)
+                elif optional:
+                    write(default, out)
+                else:
+                    raise ValueError('missing field %r' % name)
+
+        def read(data, position):
+            value = {}
+            for name, read, omit in readers:
+                member, position = read(data, position)
+                # Optional members that were absent come back absent.
+                if member is not None or not omit:
+                    value[name] = member
+            return value, position
+        cell[1:3] = [write, read]
+        return write, read
+
+    def enum(self, schema):
+        cell = self.register(schema)
+        symbols = tuple(schema['symbols'])
+        indices = dict(
+            (primitives.canonical(symbol), index)
+            for index, symbol in enumerate(symbols))
+
+        def write(value, out):
+            index = indices.get(primitives.canonical(value))
+            if index is None:
+                raise ValueError('%r is not one of the symbols %r' % (
+                    value, symbols))
+            write_long(index, out)
+
+        def read(data, position):
+            index, position = read_long(data, position)
+            return symbols[index], position
+        cell[1:3] = [write, read]
+        return write, read
+
+    def fixed(self, schema):
+        cell = self.register(schema)
+        size = schema['size']
+
+        def write(value, out):
+            if len(value) != size:
+                raise ValueError('%r is not %d bytes long' % (value, size))
+            out += value
+
+        def read(data, position):
+            end = position + size
+            if end > len(data):
+                raise IndexError(end)
+            return bytes(data[position:end]), end
+        cell[1:3] = [write, read]
+        return write, read
+
+    def array(self, schema):
+        write_item, read_item = self.compile(schema['items'])
+
+        def write(value, out):
+            if value:
+                write_long(len(value), out)
+                for item in value:
+                    write_item(item, out)
+            out.append(0)
+
+        def read(data, position):
+            value = []
+            append = value.append
+            count, position = read_count(data, position)
+            while count:
+                for _ in range(count):
+                    item, position = read_item(data, position)
+                    append(item)
+                count, position = read_count(data, position)
+            return value, position
+        return write, read
+
+    def map(self, schema):
+        write_value, read_value = self.compile(schema['values'])
+
+        def write(value, out):
+            if value:
+                write_long(len(value), out)
+                for key, member in value.items():
+                    write_string(key, out)
+                    write_value(member, out)
+            out.append(0)
+
+        def read(data, position):
+            value = {}
+            count, position = read_count(data, position)
+            while count:
+                for _ in range(count):
+                    key, position = read_string(data, position)
+                    value[key], position = read_value(data, position)
+                count, position = read_count(data, position)
+            return value, position
+        return write, read
+
+    def union(self, schema):
+        branches = tuple(self.compile(branch) for branch in schema)
+        kinds = tuple(self.kind(branch) for branch in schema)
+        # The branches accepting each Python class, in schema order.  A
+        # class accepted by a single branch needs no further checks.
+        candidates = {}
+        for index, kind in enumerate(kinds):
+            for cls in CLASSES.get(kind, ()):
+                candidates.setdefault(cls, []).append(index)
+        choices = dict(
+            (cls, indexes[0]) for cls, indexes in candidates.items()
+            if len(indexes) == 1)
+        tried = dict(
+            (cls, tuple(
+                (index, self.accepts(schema[index])) for index in indexes))
+            for cls, indexes in candidates.items() if len(indexes) > 1)
+        readers = tuple(read for write, read in branches)
+
+        def write(value, out):
+            index = choices.get(value.__class__)
+            if index is None:
+                for index, accept in tried.get(value.__class__, ()):
+                    if accept(value):
+                        break
+                else:
+                    raise ValueError(
+                        '%r does not match any branch of %r' % (
+                            value, schema))
+            write_long(index, out)
+            branches[index][0](value, out)
+
+        def read(data, position):
+            index, position = read_long(data, position)
+            return readers[index](data, position)
+        return write, read
+
+
+# The file metadata in the header of an object container file.
+METADATA = Codec({'type': 'map', 'values': 'bytes'})
+
+
+def read_stream_long(fp):
+    """Read a varint from `fp`, or return None at the end of the file."""
+    data = bytearray(fp.read(1))
+    if not data:
+        return None
+    while data[-1] & 0x80:
+        b = fp.read(1)
+        if not b:
+            raise ValueError('truncated Avro data')
+        data += b
+    return read_long(data, 0)[0]
+
+
+class Writer:
+    """Stream instances into an Avro object container file.
+
+    Encoded instances are buffered until the buffer reaches `blockSize`
+    bytes and are then written out as one block, compressed with `zlib`
+    when `codec` is `'deflate'`, and followed by the sync marker of the
+    file.  Only the current block is ever held in memory.
+    """
+
+    codecs = ('null', 'deflate',)
+
+    def __init__(self, fp, schema, codec='null', blockSize=64 * 1024,
+                 metadata=None):
+        if codec not in self.codecs:
+            raise ValueError('unsupported Avro codec %r' % codec)
+        self.fp = fp
+        self.encoder = Codec(schema)
+        self.codec = codec
+        self.blockSize = blockSize
+        self.sync = os.urandom(16)
+        self.buffer = bytearray()
+        self.count = 0
+        metadata = dict(metadata or {})
+        metadata['avro.schema'] = json.dumps(
+            self.encoder.schema).encode('utf-8')
+        metadata['avro.codec'] = codec.encode('utf-8')
+        header = bytearray(MAGIC)
+        METADATA.write(metadata, header)
+        header += self.sync
+        fp.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, instance):
+        buffer = self.buffer
+        size = len(buffer)
+        try:
+            self.encoder.write(instance, buffer)
+        except Exception:
+            # Drop the partial encoding so the block stays readable.
+            del buffer[size:]
+            raise
+        self.count += 1
+        if len(buffer) >= self.blockSize:
+            self.flush()
+
+    def writeMany(self, instances):
+        for instance in instances:
+            self.write(instance)
+
+    def flush(self):
+        if not self.count:
+            return
+        data = bytes(self.buffer)
+        if self.codec == 'deflate':
+            compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            data = compressor.compress(data) + compressor.flush()
+        block = bytearray()
+        write_long(self.count, block)
+        write_long(len(data), block)
+        block += data
+        block += self.sync
+        self.fp.write(block)
+        self.buffer = bytearray()
+        self.count = 0
+
+    def close(self):
+        self.flush()
+
+
+class Reader:
+    """Lazily read the instances of an Avro object container file.
+
+    The header is read on construction, and iterating decodes one block
+    at a time.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        if fp.read(4) != MAGIC:
+            raise ValueError('not an Avro object container file')
+        metadata = {}
+        count = read_stream_long(fp)
+        while count:
+            if count < 0:
+                count = -count
+                read_stream_long(fp)
+            for _ in range(count):
+                key = fp.read(read_stream_long(fp)).decode('utf-8')
+                metadata[key] = fp.read(read_stream_long(fp))
+            count = read_stream_long(fp)
+        self.metadata = metadata
+        self.codec = metadata.get('avro.codec', b'null').decode('utf-8')
+        if self.codec not in Writer.codecs:
+            raise ValueError('unsupported Avro codec %r' % self.codec)
+        self.schema = json.loads(metadata['avro.schema'].decode('utf-8'))
+        self.decoder = Codec(self.schema)
+        self.sync = fp.read(16)
+
+    def __iter__(self):
+        fp, read = self.fp, self.decoder.read
+        while True:
+            count = read_stream_long(fp)
+            if count is None:
+                return
+            size = read_stream_long(fp)
+            data = fp.read(size)
+            if len(data) != size or fp.read(16) != self.sync:
+                raise ValueError('corrupt Avro block')
+            if self.codec == 'deflate':
+                data = zlib.decompress(data, -15)
+            position = 0
+            for _ in range(count):
+                instance, position = read(data, position)
+                yield instance
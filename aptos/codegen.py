@@ -0,0 +1,386 @@
+"""Generate standalone Python validator modules from schemas.
+
+`generate` writes the checks `Compiler` would build as plain Python
+source: one `validate_<Name>` function per schema, raising
+`AssertionError` with the same messages, and nothing to import from
+`aptos` at run time.  Scalar keywords are inlined into the function of
+the object that holds them, while objects, recursive references and the
+branches of unions are functions of their own.
+"""
+from . import primitives
+from .visitors import Visitor, identifier
+
+HEADER = '''\
+"""Validators generated by aptos from %s.
+
+Every `validate_<Name>` function raises `AssertionError` when an instance
+does not match the schema.  Do not edit this module; generate it again.
+"""
+%s
+# The JSON type of an instance, keyed by its Python class.
+KINDS = {
+    dict: 'object', list: 'array', tuple: 'array', str: 'string',
+    int: 'integer', float: 'number', bool: 'boolean', type(None): 'null',
+}
+
+
+def canonical(value):
+    cls = value.__class__
+    if cls is str or cls is int or cls is float or value is None:
+        return value
+    if cls is bool:
+        return ('boolean', value)
+    if isinstance(value, dict):
+        return ('object', frozenset(
+            (name, canonical(member)) for name, member in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ('array', tuple(canonical(element) for element in value))
+    return value
+
+
+def multiple_of(instance, multipleOf):
+    if isinstance(instance, int) and isinstance(multipleOf, int):
+        return instance %% multipleOf == 0
+    quotient = instance / multipleOf
+    return quotient == int(quotient)
+
+
+def duplicate(instance):
+    seen = set()
+    add = seen.add
+    for index, element in enumerate(instance):
+        key = canonical(element)
+        if key in seen:
+            return index
+        add(key)
+    return None
+
+
+def matches(branches, instance, limit=1):
+    index, discriminator, choices, rest, every = branches
+    kind = KINDS.get(instance.__class__)
+    if kind is None:
+        candidates = every
+    elif kind == 'object' and discriminator is not None and (
+            discriminator in instance):
+        candidates = choices.get(canonical(instance[discriminator]), rest)
+    else:
+        candidates = index[kind]
+    count = 0
+    for check in candidates:
+        try:
+            check(instance)
+        except AssertionError:
+            continue
+        count += 1
+        if count == limit:
+            break
+    return count'''
+
+INDENT = '    '
+
+
+def generate(schemas, source='a schema'):
+    """Return the source of a module validating each of `schemas`.
+
+    `schemas` maps names to resolved `Primitive` trees, as parsed by
+    `Parser.parse` or found in the `components.schemas` of an `OpenAPI`
+    specification.
+    """
+    return Generator().generate(schemas, source)
+
+
+def literal(key):
+    """Render a canonical key as a deterministic Python expression."""
+    if isinstance(key, frozenset):
+        return 'frozenset((%s))' % ''.join(
+            literal(member) + ', ' for member in sorted(key, key=repr))
+    if isinstance(key, tuple):
+        return '(%s)' % ''.join(literal(member) + ', ' for member in key)
+    return repr(key)
+
+
+def indent(lines):
+    return [INDENT + line for line in lines]
+
+
+class Generator(Visitor):
+    """Emit the statements that validate a variable against a node.
+
+    Every visit method takes the name of the variable to check and
+    returns a list of source lines.  Objects are emitted once, as
+    functions named after the node, and called wherever they are used.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.functions = []
+        self.constants = {}
+        self.variables = 0
+        # Names chosen for the schemas being generated, used wherever
+        # one schema is reached from another.
+        self.reserved = {}
+
+    def generate(self, schemas, source):
+        entries = []
+        for name, schema in schemas.items():
+            self.reserved.setdefault(
+                primitives.resolved(schema), 'validate_%s' % identifier(name))
+        for name, schema in schemas.items():
+            name = 'validate_%s' % identifier(name)
+            target = self.function(schema)
+            if target != name:
+                entries.append('%s = %s' % (name, target))
+        imports = ''
+        if any(expression.startswith('re.') for expression in self.constants):
+            imports = 'import re\n'
+        lines = [HEADER % (source, imports)]
+        lines.extend(self.functions)
+        if entries:
+            lines.extend(['', ''] + entries)
+        if self.constants:
+            lines.extend(['', ''])
+            lines.extend(
+                '%s = %s' % (name, expression)
+                for expression, name in self.constants.items())
+        return '\n'.join(lines) + '\n'
+
+    def function(self, node):
+        """Return the name of the function validating `node`."""
+        if isinstance(node, primitives.Reference) and (
+                node.target is not None):
+            return self.function(node.target)
+        if node in self.names:
+            return self.names[node]
+        name = self.reserved.get(node) or '_%s%d' % (
+            node.__class__.__name__.lower(), len(self.names))
+        self.names[node] = name
+        # Reserve the slot first: nested functions are emitted afterwards.
+        position = len(self.functions)
+        self.functions.append(None)
+        body = node.accept(self, 'instance', True) or ['pass']
+        self.functions[position] = '\n'.join(
+            ['', '', 'def %s(instance):' % name] + indent(body))
+        return name
+
+    def constant(self, expression):
+        """Bind `expression` to a module-level name, once."""
+        name = self.constants.get(expression)
+        if name is None:
+            name = self.constants[expression] = '_K%d' % len(self.constants)
+        return name
+
+    def variable(self):
+        self.variables += 1
+        return 'v%d' % self.variables
+
+    def branches(self, branches):
+        """Bind the type index of `branches` to a constant for `matches`."""
+        index = branches.build()
+
+        def names(items):
+            return '(%s)' % ''.join(
+                self.function(branch) + ', ' for branch in items)
+        choices = rest = 'None'
+        if branches.discriminator is not None:
+            choices = '{%s}' % ', '.join(
+                '%s: %s' % (literal(key), names(items))
+                for key, items in sorted(
+                    branches.choices.items(), key=lambda item: repr(item[0])))
+            rest = names(branches.rest)
+        kinds = ', '.join(
+            '%r: %s' % (kind, names(index[kind])) for kind in sorted(index))
+        return self.constant('({%s}, %r, %s, %s, %s)' % (
+            kinds, branches.discriminator, choices, rest, names(branches)))
+
+    @staticmethod
+    def expect(variable, *types):
+        check = 'isinstance(%s, %s)' % (
+            variable, types[0].__name__ if len(types) == 1 else '(%s)' % (
+                ', '.join(cls.__name__ for cls in types)))
+        if int in types:
+            # `bool` is a subclass of `int`, but not a JSON number.
+            check += ' and %s.__class__ is not bool' % variable
+        return ['assert %s, %r %% (%s, %r)' % (
+            check, '%r is not of type %r', variable,
+            tuple(cls.__name__ for cls in types))]
+
+    def visitPrimitive(self, primitive, variable, *args):
+        lines = []
+        if primitive.enum:
+            enum = self.constant(repr(primitive.enum))
+            if all(symbol.__class__ is str for symbol in primitive.enum):
+                keys = self.constant('frozenset(%s)' % enum)
+                lines.append('assert %s.__class__ is str and %s in %s, \'%%r not equal to one of the elements in this keyword\\\'s array value %%r\' %% (%s, %s)' % (variable, variable, keys, variable, enum))  # noqa: E501
+            else:
+                keys = self.constant(
+                    'frozenset(canonical(symbol) for symbol in %s)' % enum)
+                lines.append('assert canonical(%s) in %s, \'%%r not equal to one of the elements in this keyword\\\'s array value %%r\' %% (%s, %s)' % (variable, keys, variable, enum))  # noqa: E501
+        if primitive.const is not None:
+            if primitive.const.__class__ in (str, int, float):
+                # Strings and numbers are their own canonical keys.
+                const = key = repr(primitive.const)
+            else:
+                const = self.constant(repr(primitive.const))
+                key = self.constant('canonical(%s)' % const)
+            lines.append('assert canonical(%s) == %s, \'%%r not equal to the value of this keyword %%r\' %% (%s, %s)' % (variable, key, variable, const))  # noqa: E501
+        for item in primitive.allOf:
+            lines.extend(item.accept(self, variable))
+        if primitive.anyOf:
+            lines.extend(primitive.anyOf.accept(self, variable))
+        if primitive.oneOf:
+            lines.extend(primitive.oneOf.accept(self, variable))
+        return lines
+
+    def visitAnyOf(self, anyOf, variable, *args):
+        return ['assert matches(%s, %s), \'%%r is not valid against any of the schemas of this keyword\' %% (%s,)' % (self.branches(anyOf), variable, variable)]  # noqa: E501
+
+    def visitOneOf(self, oneOf, variable, *args):
+        count = self.variable()
+        return [
+            '%s = matches(%s, %s, 2)' % (count, self.branches(oneOf), variable),  # noqa: E501
+            'assert %s == 1, \'%%r is valid against %%s of the schemas of this keyword, not exactly one\' %% (%s, \'more than one\' if %s else \'none\')' % (count, variable, count),  # noqa: E501
+        ]
+
+    def visitEnum(self, enumeration, variable, *args):
+        return self.visitPrimitive(enumeration, variable)
+
+    def visitUnion(self, union, variable, *args):
+        kinds = tuple(sorted(union.kinds))
+        return ['assert matches(%s, %s), \'%%r does not match any of the types %%r\' %% (%s, %r)' % (self.branches(union.type), variable, variable, kinds)] + self.visitPrimitive(union, variable)  # noqa: E501
+
+    def visitArray(self, array, variable, *args):
+        lines = self.expect(variable, list, tuple)
+        lines.extend(self.visitPrimitive(array, variable))
+        if isinstance(array.items, primitives.Component):
+            element = self.variable()
+            body = array.items.accept(self, element)
+            if body:
+                lines.append('for %s in %s:' % (element, variable))
+                lines.extend(indent(body))
+        elif array.items is not None:
+            for index, item in enumerate(array.items):
+                element = self.variable()
+                body = item.accept(self, element)
+                if body:
+                    lines.append('if len(%s) > %d:' % (variable, index))
+                    lines.append('%s%s = %s[%d]' % (
+                        INDENT, element, variable, index))
+                    lines.extend(indent(body))
+            if array.additionalItems is False:
+                lines.append('assert len(%s) <= %d, \'%%r is not less than, or equal to, the number of items %%r\' %% (len(%s), %d)' % (variable, len(array.items), variable, len(array.items)))  # noqa: E501
+        if array.maxItems:
+            lines.append('assert len(%s) <= %r, \'%%r is not less than, or equal to, the value of this keyword %%r\' %% (len(%s), %r)' % (variable, array.maxItems, variable, array.maxItems))  # noqa: E501
+        if array.minItems:
+            lines.append('assert len(%s) >= %r, \'%%r is not greater than, or equal to, the value of this keyword %%r\' %% (len(%s), %r)' % (variable, array.minItems, variable, array.minItems))  # noqa: E501
+        if array.uniqueItems:
+            index = self.variable()
+            lines.extend([
+                '%s = duplicate(%s)' % (index, variable),
+                'assert %s is None, \'elements are not unique, %%r at index %%d equals an earlier element\' %% (%s[%s], %s)' % (index, variable, index, index),  # noqa: E501
+            ])
+        return lines
+
+    def visitBoolean(self, boolean, variable, *args):
+        return self.expect(variable, bool) + self.visitPrimitive(
+            boolean, variable)
+
+    def visitInt(self, integer, variable, *args):
+        return self.expect(variable, int) + self.visitNumber(
+            integer, variable)
+
+    def visitLong(self, long, variable, *args):
+        return self.expect(variable, int, float) + self.visitNumber(
+            long, variable)
+
+    def visitNumber(self, number, variable, *args):
+        lines = self.visitPrimitive(number, variable)
+        maximum, minimum = number.maximum, number.minimum
+        if maximum is not None:
+            if number.exclusiveMaximum:
+                lines.append('assert %s < %r, \'%%r is not less than the value of this keyword %%r\' %% (%s, %r)' % (variable, maximum, variable, maximum))  # noqa: E501
+            else:
+                lines.append('assert %s <= %r, \'%%r is not less than, or equal to, the value of this keyword %%r\' %% (%s, %r)' % (variable, maximum, variable, maximum))  # noqa: E501
+        if minimum is not None:
+            if number.exclusiveMinimum:
+                lines.append('assert %s > %r, \'%%r is not greater than the value of this keyword %%r\' %% (%s, %r)' % (variable, minimum, variable, minimum))  # noqa: E501
+            else:
+                lines.append('assert %s >= %r, \'%%r is not greater than, or equal to, the value of this keyword %%r\' %% (%s, %r)' % (variable, minimum, variable, minimum))  # noqa: E501
+        if number.multipleOf:
+            lines.append('assert multiple_of(%s, %r), \'%%r is not a multiple of the value of this keyword %%r\' %% (%s, %r)' % (variable, number.multipleOf, variable, number.multipleOf))  # noqa: E501
+        return lines
+
+    def visitNull(self, null, variable, *args):
+        return ['assert %s is None, %r %% (%s, %r)' % (
+            variable, '%r is not of type %r', variable,
+            ('NoneType',))] + self.visitPrimitive(null, variable)
+
+    def visitString(self, string, variable, *args):
+        lines = self.expect(variable, str)
+        lines.extend(self.visitPrimitive(string, variable))
+        if string.maxLength:
+            lines.append('assert len(%s) <= %r, \'%%r is not less than, or equal to, the value of this keyword %%r\' %% (len(%s), %r)' % (variable, string.maxLength, variable, string.maxLength))  # noqa: E501
+        if string.minLength:
+            lines.append('assert len(%s) >= %r, \'%%r is not greater than, or equal to, the value of this keyword %%r\' %% (len(%s), %r)' % (variable, string.minLength, variable, string.minLength))  # noqa: E501
+        if string.pattern:
+            expression = self.constant('re.compile(%r)' % string.pattern)
+            lines.append('assert %s.match(%s) is not None, \'%%r does not match the instance successfully %%r\' %% (%r, %s)' % (expression, variable, string.pattern, variable))  # noqa: E501
+        return lines
+
+    def visitDeclared(self, declared, variable, inline=False):
+        if not inline:
+            return ['%s(%s)' % (self.function(declared), variable)]
+        lines = self.expect(variable, dict)
+        lines.extend(self.visitPrimitive(declared, variable))
+        if declared.maxProperties:
+            lines.append('assert len(%s) <= %r, \'%%r is not less than, or equal to, the value of this keyword %%r\' %% (len(%s), %r)' % (variable, declared.maxProperties, variable, declared.maxProperties))  # noqa: E501
+        if declared.minProperties:
+            lines.append('assert len(%s) >= %r, \'%%r is not greater than, or equal to, the value of this keyword %%r\' %% (len(%s), %r)' % (variable, declared.minProperties, variable, declared.minProperties))  # noqa: E501
+        if declared.required:
+            required = self.constant(repr(list(declared.required)))
+            for item in declared.required:
+                lines.append('assert %r in %s, \'%%r is not the name of a property in the instance %%r\' %% (%s, %r)' % (item, variable, required, item))  # noqa: E501
+        if declared.properties:
+            lines.extend(declared.properties.accept(self, variable))
+        if declared.patternProperties:
+            lines.extend(declared.patternProperties.accept(self, variable))
+        return lines
+
+    def visitProperties(self, properties, variable, *args):
+        lines = []
+        for name, member in properties.items():
+            if isinstance(member, (primitives.Record, primitives.Reference)):
+                # Objects are checked by a function of their own.
+                lines.append('if %r in %s:' % (name, variable))
+                lines.extend(indent(member.accept(
+                    self, '%s[%r]' % (variable, name))))
+                continue
+            value = self.variable()
+            body = member.accept(self, value)
+            if body:
+                lines.append('if %r in %s:' % (name, variable))
+                lines.append('%s%s = %s[%r]' % (INDENT, value, variable, name))
+                lines.extend(indent(body))
+        return lines
+
+    def visitPatternProperties(self, patternProperties, variable, *args):
+        name, value = self.variable(), self.variable()
+        lines = ['for %s, %s in %s.items():' % (name, value, variable)]
+        if patternProperties.expression is not None:
+            prefilter = self.constant(
+                're.compile(%r)' % patternProperties.expression.pattern)
+            lines.append('%sif %s.search(%s) is None:' % (
+                INDENT, prefilter, name))
+            lines.append('%s%scontinue' % (INDENT, INDENT))
+        for pattern, _ in patternProperties.expressions:
+            expression = self.constant('re.compile(%r)' % pattern)
+            body = patternProperties[pattern].accept(self, value) or ['pass']
+            lines.append('%sif %s.search(%s) is not None:' % (
+                INDENT, expression, name))
+            lines.extend(indent(indent(body)))
+        return lines
+
+    def visitUnknown(self, unknown, variable, *args):
+        if unknown.target is None:
+            raise ValueError('unresolved reference %r' % unknown.value)
+        return ['%s(%s)' % (self.function(unknown.target), variable)]
@@ -0,0 +1,309 @@
+from . import primitives, vector
+from .primitives import canonical
+from .visitors import Visitor, duplicate, matches, multiple_of, typed
+
+
+def compile(primitive):
+    """Compile `primitive` into a function that validates an instance."""
+    compiler = Compiler()
+    check = primitive.accept(compiler)
+    compiler.link()
+    return check
+
+
+def chain(checks):
+    checks = tuple(checks)
+    if not checks:
+        return lambda instance: None
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(instance):
+        for check in checks:
+            check(instance)
+    return validate
+
+
+def expect(*types):
+    """Build a check asserting that an instance is one of `types`."""
+    def check(instance):
+        assert typed(instance, types), '%r is not of type %r' % (
+            instance, tuple(cls.__name__ for cls in types))
+    return check
+
+
+class Compiler(Visitor):
+    """Turn a `Primitive` tree into nested validation closures.
+
+    The tree is walked once; every keyword that is left at its default
+    value is skipped entirely, so the returned function only runs the
+    checks the schema actually declares.  The closures accept the same
+    instances as `ValidationVisitor`, type checks included, and raise
+    `AssertionError` with the same messages.
+    """
+
+    def __init__(self):
+        # Compiled targets of recursive references, filled in by `link`.
+        self.targets = {}
+
+    def link(self):
+        """Compile the targets of recursive references found so far."""
+        while None in self.targets.values():
+            for target, check in list(self.targets.items()):
+                if check is None:
+                    self.targets[target] = target.accept(self)
+
+    def visitPrimitive(self, primitive, *args):
+        checks = []
+        if primitive.enum:
+            enum, keys = primitive.enum, primitive.enumKeys
+            if all(symbol.__class__ is str for symbol in enum):
+                def check(instance):
+                    assert instance.__class__ is str and instance in keys, '%r not equal to one of the elements in this keyword\'s array value %r' % (instance, enum)  # noqa: E501
+            else:
+                def check(instance):
+                    assert canonical(instance) in keys, '%r not equal to one of the elements in this keyword\'s array value %r' % (instance, enum)  # noqa: E501
+            checks.append(check)
+        if primitive.const is not None:
+            const, key = primitive.const, primitive.constKey
+
+            def check(instance):
+                assert canonical(instance) == key, '%r not equal to the value of this keyword %r' % (instance, const)  # noqa: E501
+            checks.append(check)
+        checks.extend(item.accept(self, *args) for item in primitive.allOf)
+        if primitive.anyOf:
+            checks.append(primitive.anyOf.accept(self, *args))
+        if primitive.oneOf:
+            checks.append(primitive.oneOf.accept(self, *args))
+        return checks
+
+    def visitAnyOf(self, anyOf, *args):
+        trial = self.branches(anyOf, *args)
+
+        def check(instance):
+            assert matches(anyOf, instance, trial), '%r is not valid against any of the schemas of this keyword' % instance  # noqa: E501
+        return check
+
+    def visitOneOf(self, oneOf, *args):
+        trial = self.branches(oneOf, *args)
+
+        def check(instance):
+            count = matches(oneOf, instance, trial, 2)
+            assert count == 1, '%r is valid against %s of the schemas of this keyword, not exactly one' % (instance, 'more than one' if count else 'none')  # noqa: E501
+        return check
+
+    def branches(self, branches, *args):
+        """Compile `branches` into a trial function for `matches`."""
+        checks = dict(
+            (branch, branch.accept(self, *args)) for branch in branches)
+        branches.build()
+
+        def trial(branch, instance):
+            checks[branch](instance)
+        return trial
+
+    def visitEnum(self, enumeration, *args):
+        return chain(self.visitPrimitive(enumeration, *args))
+
+    def visitUnion(self, union, *args):
+        branches, trial = union.type, self.branches(union.type, *args)
+        kinds = tuple(sorted(union.kinds))
+
+        def check(instance):
+            assert matches(branches, instance, trial), (
+                '%r does not match any of the types %r' % (instance, kinds))
+        return chain([check] + self.visitPrimitive(union, *args))
+
+    def visitArray(self, array, *args):
+        checks = [expect(list, tuple)]
+        checks.extend(self.visitPrimitive(array, *args))
+        if isinstance(array.items, primitives.Component):
+            member = array.items.accept(self, *args)
+            vectorized = vector.vectorize(array.items)
+            if vectorized is None:
+                def items(instance):
+                    for element in instance:
+                        member(element)
+            else:
+                threshold = vector.THRESHOLD
+
+                def items(instance):
+                    if len(instance) >= threshold and vectorized(instance):
+                        return
+                    for element in instance:
+                        member(element)
+            checks.append(items)
+        elif array.items is not None:
+            members = tuple(item.accept(self, *args) for item in array.items)
+
+            def items(instance):
+                for member, element in zip(members, instance):
+                    member(element)
+            checks.append(items)
+            if array.additionalItems is False:
+                size = len(members)
+
+                def additionalItems(instance):
+                    assert len(instance) <= size, (
+                        '%r is not less than, or equal to, the number of items %r' % (len(instance), size))  # noqa: E501
+                checks.append(additionalItems)
+        if array.maxItems:
+            maxItems = array.maxItems
+
+            def check(instance):
+                assert len(instance) <= maxItems, (
+                    '%r is not less than, or equal to, the value of this keyword %r' % (len(instance), maxItems))  # noqa: E501
+            checks.append(check)
+        if array.minItems:
+            minItems = array.minItems
+
+            def check(instance):
+                assert len(instance) >= minItems, (
+                    '%r is not greater than, or equal to, the value of this keyword %r' % (len(instance), minItems))  # noqa: E501
+            checks.append(check)
+        if array.uniqueItems:
+            def check(instance):
+                index = duplicate(instance)
+                assert index is None, (
+                    'elements are not unique, %r at index %d equals an earlier element' % (instance[index], index))  # noqa: E501
+            checks.append(check)
+        return chain(checks)
+
+    def visitBoolean(self, boolean, *args):
+        return chain([expect(bool)] + self.visitPrimitive(boolean, *args))
+
+    def visitInt(self, integer, *args):
+        return chain([expect(int)] + self.visitNumber(integer, *args))
+
+    def visitLong(self, long, *args):
+        return chain([expect(int, float)] + self.visitNumber(long, *args))
+
+    def visitNumber(self, number, *args):
+        checks = self.visitPrimitive(number, *args)
+        if number.maximum is not None:
+            maximum = number.maximum
+            if number.exclusiveMaximum:
+                def check(instance):
+                    assert instance < maximum, (
+                        '%r is not less than the value of this keyword %r' % (instance, maximum))  # noqa: E501
+            else:
+                def check(instance):
+                    assert instance <= maximum, (
+                        '%r is not less than, or equal to, the value of this keyword %r' % (instance, maximum))  # noqa: E501
+            checks.append(check)
+        if number.minimum is not None:
+            minimum = number.minimum
+            if number.exclusiveMinimum:
+                def check(instance):
+                    assert instance > minimum, (
+                        '%r is not greater than the value of this keyword %r' % (instance, minimum))  # noqa: E501
+            else:
+                def check(instance):
+                    assert instance >= minimum, (
+                        '%r is not greater than, or equal to, the value of this keyword %r' % (instance, minimum))  # noqa: E501
+            checks.append(check)
+        if number.multipleOf:
+            multipleOf = number.multipleOf
+
+            def check(instance):
+                assert multiple_of(instance, multipleOf), (
+                    '%r is not a multiple of the value of this keyword %r' % (instance, multipleOf))  # noqa: E501
+            checks.append(check)
+        return checks
+
+    def visitNull(self, null, *args):
+        return chain(
+            [expect(type(None))] + self.visitPrimitive(null, *args))
+
+    def visitString(self, string, *args):
+        checks = [expect(str)]
+        checks.extend(self.visitPrimitive(string, *args))
+        if string.maxLength:
+            maxLength = string.maxLength
+
+            def check(instance):
+                assert len(instance) <= maxLength, (
+                    '%r is not less than, or equal to, the value of this keyword %r' % (len(instance), maxLength))  # noqa: E501
+            checks.append(check)
+        if string.minLength:
+            minLength = string.minLength
+
+            def check(instance):
+                assert len(instance) >= minLength, (
+                    '%r is not greater than, or equal to, the value of this keyword %r' % (len(instance), minLength))  # noqa: E501
+            checks.append(check)
+        if string.pattern:
+            pattern, match = string.pattern, string.expression.match
+
+            def check(instance):
+                assert match(instance) is not None, (
+                    '%r does not match the instance successfully %r' % (pattern, instance))  # noqa: E501
+            checks.append(check)
+        return chain(checks)
+
+    def visitDeclared(self, declared, *args):
+        checks = [expect(dict)]
+        checks.extend(self.visitPrimitive(declared, *args))
+        if declared.maxProperties:
+            maxProperties = declared.maxProperties
+
+            def check(instance):
+                assert len(instance) <= maxProperties, (
+                    '%r is not less than, or equal to, the value of this keyword %r' % (len(instance), maxProperties))  # noqa: E501
+            checks.append(check)
+        if declared.minProperties:
+            minProperties = declared.minProperties
+
+            def check(instance):
+                assert len(instance) >= minProperties, (
+                    '%r is not greater than, or equal to, the value of this keyword %r' % (len(instance), minProperties))  # noqa: E501
+            checks.append(check)
+        if declared.required:
+            required = declared.required
+
+            def check(instance):
+                for item in required:
+                    assert item in instance, '%r is not the name of a property in the instance %r' % (required, item)  # noqa: E501
+            checks.append(check)
+        if declared.properties:
+            checks.append(declared.properties.accept(self, *args))
+        if declared.patternProperties:
+            checks.append(declared.patternProperties.accept(self, *args))
+        return chain(checks)
+
+    def visitProperties(self, properties, *args):
+        members = tuple(
+            (name, member.accept(self, *args))
+            for name, member in properties.items())
+
+        def check(instance):
+            for name, member in members:
+                if name in instance:
+                    member(instance[name])
+        return check
+
+    def visitPatternProperties(self, patternProperties, *args):
+        members = tuple(
+            (expression.search, patternProperties[pattern].accept(self, *args))
+            for pattern, expression in patternProperties.expressions)
+        prefilter = patternProperties.expression
+
+        def check(instance):
+            for name, value in instance.items():
+                if prefilter is not None and prefilter.search(name) is None:
+                    continue
+                for search, member in members:
+                    if search(name) is not None:
+                        member(value)
+        return check
+
+    def visitUnknown(self, unknown, *args):
+        target = unknown.target
+        if target is None:
+            raise ValueError('unresolved reference %r' % unknown.value)
+        targets = self.targets
+        targets.setdefault(target, None)
+
+        def check(instance):
+            targets[target](instance)
+        return check
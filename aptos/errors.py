@@ -0,0 +1,240 @@
+from . import primitives
+from .primitives import canonical
+from .visitors import Visitor, duplicate, escape, matches, multiple_of
+
+
+def pointer(path):
+    """Format a sequence of reference tokens as a JSON pointer."""
+    return ''.join('/' + escape(str(token)) for token in path)
+
+
+def collect(primitive, instance, max_errors=None):
+    """Return every `ValidationError` of `instance` against `primitive`.
+
+    Collection stops once `max_errors` errors have been found.
+    """
+    return Collector(max_errors).collect(primitive, instance)
+
+
+class ValidationError:
+    """A single violation of a schema keyword.
+
+    The instance and schema locations are kept as tuples of reference
+    tokens and the message as a template with its arguments, so nothing
+    is formatted until the error is actually read.
+    """
+
+    __slots__ = ('keyword', 'instancePath', 'schemaPath', 'template', 'args',)
+
+    def __init__(self, keyword, instancePath, schemaPath, template, args=()):
+        self.keyword = keyword
+        self.instancePath = instancePath
+        self.schemaPath = schemaPath
+        self.template = template
+        self.args = args
+
+    @property
+    def instancePointer(self):
+        return pointer(self.instancePath)
+
+    @property
+    def schemaPointer(self):
+        return pointer(self.schemaPath)
+
+    @property
+    def message(self):
+        return self.template % self.args
+
+    def asJson(self):
+        return {
+            'keyword': self.keyword,
+            'instance': self.instancePointer,
+            'schema': self.schemaPointer,
+            'message': self.message,
+        }
+
+    def __str__(self):
+        return '%s: %s' % (self.instancePointer or '/', self.message)
+
+    def __repr__(self):
+        return '%s(%r, %r, %r)' % (
+            self.__class__.__name__, self.keyword, self.instancePointer,
+            self.message)
+
+
+class Limit(Exception):
+    """Raised by `Collector` once the error budget is spent."""
+
+
+class Collector(Visitor):
+    """Walk a `Primitive` tree and record every failed keyword.
+
+    The instance, its path, the schema path and the list of errors are
+    passed down through `accept`, so the visitor itself only holds the
+    error budget.  The checks mirror the ones made by `Compiler`.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+
+    def collect(self, primitive, instance):
+        errors = []
+        try:
+            primitive.accept(self, instance, (), (), errors)
+        except Limit:
+            pass
+        return errors
+
+    def report(self, errors, keyword, path, schema, template, *args):
+        errors.append(ValidationError(
+            keyword, path, schema + (keyword,), template, args))
+        if self.limit is not None and len(errors) >= self.limit:
+            raise Limit()
+
+    def expect(self, instance, path, schema, errors, *types):
+        if isinstance(instance, types) and (
+                bool in types or not isinstance(instance, bool)):
+            return True
+        self.report(
+            errors, 'type', path, schema, '%r is not of type %r', instance,
+            tuple(cls.__name__ for cls in types))
+        return False
+
+    def visitPrimitive(self, primitive, instance, path, schema, errors):
+        if primitive.enum and (
+                canonical(instance) not in primitive.enumKeys):
+            self.report(errors, 'enum', path, schema, '%r not equal to one of the elements in this keyword\'s array value %r', instance, primitive.enum)  # noqa: E501
+        if primitive.const is not None and (
+                canonical(instance) != primitive.constKey):
+            self.report(errors, 'const', path, schema, '%r not equal to the value of this keyword %r', instance, primitive.const)  # noqa: E501
+        for index, item in enumerate(primitive.allOf):
+            item.accept(
+                self, instance, path, schema + ('allOf', index), errors)
+        if primitive.anyOf and not matches(
+                primitive.anyOf, instance, self.trial):
+            self.report(errors, 'anyOf', path, schema, '%r is not valid against any of the schemas of this keyword', instance)  # noqa: E501
+        if primitive.oneOf:
+            count = matches(primitive.oneOf, instance, self.trial, 2)
+            if count != 1:
+                self.report(errors, 'oneOf', path, schema, '%r is valid against %s of the schemas of this keyword, not exactly one', instance, 'more than one' if count else 'none')  # noqa: E501
+
+    @staticmethod
+    def trial(branch, instance):
+        assert not Collector(1).collect(branch, instance)
+
+    def visitEnum(self, enumeration, *args):
+        self.visitPrimitive(enumeration, *args)
+
+    def visitUnion(self, union, instance, path, schema, errors):
+        if not matches(union.type, instance, self.trial):
+            self.report(errors, 'type', path, schema, '%r does not match any of the types %r', instance, tuple(sorted(union.kinds)))  # noqa: E501
+        self.visitPrimitive(union, instance, path, schema, errors)
+
+    def visitArray(self, array, instance, path, schema, errors):
+        if not self.expect(instance, path, schema, errors, list, tuple):
+            return
+        self.visitPrimitive(array, instance, path, schema, errors)
+        if isinstance(array.items, primitives.Component):
+            items = schema + ('items',)
+            for index, element in enumerate(instance):
+                array.items.accept(
+                    self, element, path + (index,), items, errors)
+        elif array.items is not None:
+            for index, (item, element) in enumerate(
+                    zip(array.items, instance)):
+                item.accept(self, element, path + (index,),
+                            schema + ('items', index), errors)
+            if array.additionalItems is False and (
+                    len(instance) > len(array.items)):
+                self.report(errors, 'additionalItems', path, schema, '%r is not less than, or equal to, the number of items %r', len(instance), len(array.items))  # noqa: E501
+        if array.maxItems and len(instance) > array.maxItems:
+            self.report(errors, 'maxItems', path, schema, '%r is not less than, or equal to, the value of this keyword %r', len(instance), array.maxItems)  # noqa: E501
+        if array.minItems and len(instance) < array.minItems:
+            self.report(errors, 'minItems', path, schema, '%r is not greater than, or equal to, the value of this keyword %r', len(instance), array.minItems)  # noqa: E501
+        if array.uniqueItems:
+            index = duplicate(instance)
+            if index is not None:
+                self.report(errors, 'uniqueItems', path, schema, 'elements are not unique, %r at index %d equals an earlier element', instance[index], index)  # noqa: E501
+
+    def visitBoolean(self, boolean, instance, path, schema, errors):
+        if self.expect(instance, path, schema, errors, bool):
+            self.visitPrimitive(boolean, instance, path, schema, errors)
+
+    def visitInt(self, integer, instance, path, schema, errors):
+        if self.expect(instance, path, schema, errors, int):
+            self.visitNumber(integer, instance, path, schema, errors)
+
+    def visitLong(self, long, instance, path, schema, errors):
+        if self.expect(instance, path, schema, errors, int, float):
+            self.visitNumber(long, instance, path, schema, errors)
+
+    def visitNumber(self, number, instance, path, schema, errors):
+        self.visitPrimitive(number, instance, path, schema, errors)
+        maximum, minimum = number.maximum, number.minimum
+        if maximum is not None:
+            if number.exclusiveMaximum and instance >= maximum:
+                self.report(errors, 'maximum', path, schema, '%r is not less than the value of this keyword %r', instance, maximum)  # noqa: E501
+            elif instance > maximum:
+                self.report(errors, 'maximum', path, schema, '%r is not less than, or equal to, the value of this keyword %r', instance, maximum)  # noqa: E501
+        if minimum is not None:
+            if number.exclusiveMinimum and instance <= minimum:
+                self.report(errors, 'minimum', path, schema, '%r is not greater than the value of this keyword %r', instance, minimum)  # noqa: E501
+            elif instance < minimum:
+                self.report(errors, 'minimum', path, schema, '%r is not greater than, or equal to, the value of this keyword %r', instance, minimum)  # noqa: E501
+        if number.multipleOf and not multiple_of(instance, number.multipleOf):
+            self.report(errors, 'multipleOf', path, schema, '%r is not a multiple of the value of this keyword %r', instance, number.multipleOf)  # noqa: E501
+
+    def visitNull(self, null, instance, path, schema, errors):
+        if self.expect(instance, path, schema, errors, type(None)):
+            self.visitPrimitive(null, instance, path, schema, errors)
+
+    def visitString(self, string, instance, path, schema, errors):
+        if not self.expect(instance, path, schema, errors, str):
+            return
+        self.visitPrimitive(string, instance, path, schema, errors)
+        if string.maxLength and len(instance) > string.maxLength:
+            self.report(errors, 'maxLength', path, schema, '%r is not less than, or equal to, the value of this keyword %r', len(instance), string.maxLength)  # noqa: E501
+        if string.minLength and len(instance) < string.minLength:
+            self.report(errors, 'minLength', path, schema, '%r is not greater than, or equal to, the value of this keyword %r', len(instance), string.minLength)  # noqa: E501
+        if string.pattern and string.expression.match(instance) is None:
+            self.report(errors, 'pattern', path, schema, '%r does not match the instance successfully %r', string.pattern, instance)  # noqa: E501
+
+    def visitDeclared(self, declared, instance, path, schema, errors):
+        if not self.expect(instance, path, schema, errors, dict):
+            return
+        self.visitPrimitive(declared, instance, path, schema, errors)
+        if declared.maxProperties and len(instance) > declared.maxProperties:
+            self.report(errors, 'maxProperties', path, schema, '%r is not less than, or equal to, the value of this keyword %r', len(instance), declared.maxProperties)  # noqa: E501
+        if declared.minProperties and len(instance) < declared.minProperties:
+            self.report(errors, 'minProperties', path, schema, '%r is not greater than, or equal to, the value of this keyword %r', len(instance), declared.minProperties)  # noqa: E501
+        for item in declared.required:
+            if item not in instance:
+                self.report(errors, 'required', path, schema, '%r is not the name of a property in the instance %r', declared.required, item)  # noqa: E501
+        if declared.properties:
+            declared.properties.accept(
+                self, instance, path, schema + ('properties',), errors)
+        if declared.patternProperties:
+            declared.patternProperties.accept(
+                self, instance, path, schema + ('patternProperties',),
+                errors)
+
+    def visitProperties(self, properties, instance, path, schema, errors):
+        for name, member in properties.items():
+            if name in instance:
+                member.accept(self, instance[name], path + (name,),
+                              schema + (name,), errors)
+
+    def visitPatternProperties(self, patternProperties, instance, path,
+                               schema, errors):
+        for name, value in instance.items():
+            for pattern, expression in patternProperties.expressions:
+                if expression.search(name) is not None:
+                    patternProperties[pattern].accept(
+                        self, value, path + (name,), schema + (pattern,),
+                        errors)
+
+    def visitUnknown(self, unknown, instance, path, schema, errors):
+        target = unknown.target
+        if target is None:
+            raise ValueError('unresolved reference %r' % unknown.value)
+        target.accept(self, instance, path, schema, errors)
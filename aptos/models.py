@@ -1,6 +1,6 @@
-import re
+import threading
 
-from copy import deepcopy
+from collections.abc import ItemsView, ValuesView
 
 from .primitives import (
     Component,
@@ -47,7 +47,8 @@ class OpenAPIVisitor:
             content[key] = value.accept(self, *args)
 
     def visit_media_type(self, media_type, *args):
-        media_type.schema = media_type.schema.accept(self, *args)
+        if media_type.schema is not None:
+            media_type.schema = media_type.schema.accept(self, *args)
         return media_type
 
     def visit_components(self, components, *args):
@@ -71,19 +72,125 @@ class OpenAPIVisitor:
 
 class TypeVisitor(OpenAPIVisitor, visitors.TypeVisitor):
 
-    def visitUnknown(self, unknown, *args):
-        context = deepcopy(self.context) if not args else args[0]
-        match = re.match(r'^(([^:/?#]+):)?(//([^/?#]*))?([^?#]*)(\?([^#]*))?(#(.*))?', unknown.value)  # noqa: E501
-        if match is None:
-            raise ValueError()
-        group = match.group(9)
-        if group == '/':
-            primitive = Creator.create(context.get('type')).fromJson(context)
-            return primitive.accept(self)
-        components = group.split('/')[1:]
-        context = context[components.pop(0)]
-        unknown.value = '#/{}'.format('/'.join(components))
-        return self.visitUnknown(unknown, context)
+    def __init__(self, context):
+        super().__init__(context)
+        # Held by the `Lazy` mappings of one specification while they
+        # convert a value, since they share this visitor.  It is
+        # reentrant because converting one value may read another.
+        self.lock = threading.RLock()
+
+    def visit_specification(self, specification, *args):
+        # Components are resolved first so that references from paths
+        # share the nodes already built for `components.schemas`.
+        specification.components.accept(self, *args)
+        specification.paths.accept(self, *args)
+        return specification
+
+    def visit_components(self, components, *args):
+        for name, schema in components.get('schemas', {}).items():
+            components['schemas'][name] = self.resolve(
+                '/components/schemas/{}'.format(visitors.escape(name)),
+                schema)
+        components['responses'].accept(self, *args)
+
+
+class Lazy(dict):
+    """A mapping whose raw JSON values are converted on first access.
+
+    `convert` is called with the key and raw value of an entry the first
+    time it is read, and the result replaces the raw value.  Every way of
+    reading values, copying or comparing the mapping converts them
+    first.  Conversions hold `lock`, which the lazy mappings of one
+    specification share with its `TypeVisitor`.
+    """
+
+    def __init__(self, instance, convert, lock=None):
+        super().__init__(instance)
+        self.convert = convert
+        self.pending = set(instance)
+        self.lock = threading.RLock() if lock is None else lock
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key in self.pending:
+            with self.lock:
+                # Another thread may have converted it in the meantime.
+                value = super().__getitem__(key)
+                if key in self.pending:
+                    value = self.convert(key, value)
+                    super().__setitem__(key, value)
+                    self.pending.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.pending.discard(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.pending.discard(key)
+
+    def __iter__(self):
+        # Overriding `__iter__` stops `dict(lazy)` and `{**lazy}` from
+        # copying the raw values, so they read through `__getitem__`.
+        return super().__iter__()
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, dict(self.items()))
+
+    def __or__(self, other):
+        return dict(self.items()) | other
+
+    def __ror__(self, other):
+        return other | dict(self.items())
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def copy(self):
+        return dict(self.items())
+
+    def pop(self, key, *default):
+        if key not in self:
+            return super().pop(key, *default)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self.pending.clear()
 
 
 class OpenAPI(Component):
@@ -97,13 +204,21 @@ class OpenAPI(Component):
         self.components = components
 
     @classmethod
-    def fromJson(cls, instance):
-        instance = deepcopy(instance)
+    def fromJson(cls, instance, lazy=False):
+        """Build a specification from its JSON document.
+
+        With `lazy`, paths, media types and component schemas are kept as
+        raw JSON and are only converted, with their references resolved,
+        the first time they are read.  The result must not be visited with
+        a `TypeVisitor` afterwards.
+        """
+        resolver = TypeVisitor(instance) if lazy else None
+        instance = dict(instance)
         instance['servers'] = list(
             Server.fromJson(server) for server in instance.get('servers', []))
-        instance['paths'] = Paths.fromJson(instance.get('paths'))
+        instance['paths'] = Paths.fromJson(instance.get('paths'), resolver)
         instance['components'] = Components.fromJson(
-            instance.get('components'))
+            instance.get('components'), resolver)
         return cls(**instance)
 
     def accept(self, visitor, *args):
@@ -113,14 +228,21 @@ class OpenAPI(Component):
 class Components(dict, Component):
 
     @classmethod
-    def fromJson(cls, instance=None):
-        if instance is None:
-            instance = {}
-        for name, schema in instance.get('schemas', {}).items():
-            instance['schemas'][name] = Creator.create(
-                schema.get('type')).fromJson(schema)
-        instance['responses'] = Responses.fromJson(instance.get('responses'))
-        instance['callbacks'] = Callbacks.fromJson(instance.get('callbacks'))
+    def fromJson(cls, instance=None, resolver=None):
+        instance = {} if instance is None else dict(instance)
+        if 'schemas' in instance and resolver is not None:
+            instance['schemas'] = Lazy(
+                instance['schemas'], lambda name, schema: resolver.resolve(
+                    '/components/schemas/{}'.format(visitors.escape(name))),
+                resolver.lock)
+        elif 'schemas' in instance:
+            instance['schemas'] = {
+                name: Creator.create(schema.get('type')).fromJson(schema)
+                for name, schema in instance['schemas'].items()}
+        instance['responses'] = Responses.fromJson(
+            instance.get('responses'), resolver)
+        instance['callbacks'] = Callbacks.fromJson(
+            instance.get('callbacks'), resolver)
         return cls(**instance)
 
     def accept(self, visitor, *args):
@@ -142,17 +264,25 @@ class Server:
 class Paths(dict, Component):
 
     @classmethod
-    def fromJson(cls, instance=None):
+    def fromJson(cls, instance=None, resolver=None):
         if instance is None:
-            instance = {}
-        for key, value in instance.items():
-            instance[key] = PathItem.fromJson(value)
-        return cls(instance)
+            return cls()
+        if resolver is not None:
+            return LazyPaths(
+                instance,
+                lambda key, value: PathItem.fromJson(value, resolver),
+                resolver.lock)
+        return cls(
+            (key, PathItem.fromJson(value)) for key, value in instance.items())
 
     def accept(self, visitor, *args):
         return visitor.visit_paths(self, *args)
 
 
+class LazyPaths(Lazy, Paths):
+    pass
+
+
 class PathItem(Component):
 
     operations = (
@@ -176,11 +306,13 @@ class PathItem(Component):
         self.parameters = [] if parameters is None else parameters
 
     @classmethod
-    def fromJson(cls, instance):
+    def fromJson(cls, instance, resolver=None):
+        instance = dict(instance)
         for operation in cls.operations:
             if operation not in instance:
                 continue
-            instance[operation] = Operation.fromJson(instance.get(operation))
+            instance[operation] = Operation.fromJson(
+                instance.get(operation), resolver)
         instance['servers'] = list(
             Server.fromJson(server) for server in instance.get('servers', []))
         return cls(**instance)
@@ -197,8 +329,10 @@ class RequestBody(Component):
         self.required = required
 
     @classmethod
-    def fromJson(cls, instance):
-        instance['content'] = Content.fromJson(instance.get('content'))
+    def fromJson(cls, instance, resolver=None):
+        instance = dict(instance)
+        instance['content'] = Content.fromJson(
+            instance.get('content'), resolver)
         return cls(**instance)
 
     def accept(self, visitor, *args):
@@ -225,12 +359,14 @@ class Operation:
         self.servers = [] if servers is None else servers
 
     @classmethod
-    def fromJson(cls, instance):
+    def fromJson(cls, instance, resolver=None):
+        instance = dict(instance)
         instance['requestBody'] = RequestBody.fromJson(
-            instance.get('requestBody', {}))
-        instance['responses'] = Responses.fromJson(instance['responses'])
+            instance.get('requestBody', {}), resolver)
+        instance['responses'] = Responses.fromJson(
+            instance['responses'], resolver)
         instance['callbacks'] = Callbacks.fromJson(
-            instance.get('callbacks', {}))
+            instance.get('callbacks', {}), resolver)
         return cls(**instance)
 
     def accept(self, visitor, *args):
@@ -240,12 +376,12 @@ class Operation:
 class Responses(dict, Component):
 
     @classmethod
-    def fromJson(cls, instance=None):
+    def fromJson(cls, instance=None, resolver=None):
         if instance is None:
-            instance = {}
-        for key, value in instance.items():
-            instance[key] = Response.fromJson(value)
-        return cls(instance)
+            return cls()
+        return cls(
+            (key, Response.fromJson(value, resolver))
+            for key, value in instance.items())
 
     def accept(self, visitor, *args):
         return visitor.visit_responses(self, *args)
@@ -260,8 +396,10 @@ class Response(Component):
         self.links = links
 
     @classmethod
-    def fromJson(cls, instance):
-        instance['content'] = Content.fromJson(instance.get('content'))
+    def fromJson(cls, instance, resolver=None):
+        instance = dict(instance)
+        instance['content'] = Content.fromJson(
+            instance.get('content'), resolver)
         return cls(**instance)
 
     def accept(self, visitor, *args):
@@ -271,26 +409,35 @@ class Response(Component):
 class Content(dict, Component):
 
     @classmethod
-    def fromJson(cls, instance=None):
+    def fromJson(cls, instance=None, resolver=None):
         if instance is None:
-            instance = {}
-        for key, value in instance.items():
-            instance[key] = MediaType.fromJson(value)
-        return cls(instance)
+            return cls()
+        if resolver is not None:
+            return LazyContent(
+                instance,
+                lambda key, value: MediaType.fromJson(value).accept(resolver),
+                resolver.lock)
+        return cls(
+            (key, MediaType.fromJson(value))
+            for key, value in instance.items())
 
     def accept(self, visitor, *args):
         return visitor.visit_content(self, *args)
 
 
+class LazyContent(Lazy, Content):
+    pass
+
+
 class Callbacks(dict, Component):
 
     @classmethod
-    def fromJson(cls, instance=None):
+    def fromJson(cls, instance=None, resolver=None):
         if instance is None:
-            instance = {}
-        for key, value in instance.items():
-            instance[key] = Callback.fromJson(value)
-        return cls(instance)
+            return cls()
+        return cls(
+            (key, Callback.fromJson(value, resolver))
+            for key, value in instance.items())
 
     def accept(self, visitor, *args):
         return visitor.visit_callbacks(self, *args)
@@ -299,12 +446,12 @@ class Callbacks(dict, Component):
 class Callback(dict, Component):
 
     @classmethod
-    def fromJson(cls, instance=None):
+    def fromJson(cls, instance=None, resolver=None):
         if instance is None:
-            instance = {}
-        for key, value in instance.items():
-            instance[key] = PathItem.fromJson(value)
-        return cls(instance)
+            return cls()
+        return cls(
+            (key, PathItem.fromJson(value, resolver))
+            for key, value in instance.items())
 
     def accept(self, visitor, *args):
         return visitor.visit_callback(self, *args)
@@ -321,6 +468,7 @@ class MediaType(Component):
 
     @classmethod
     def fromJson(cls, instance):
+        instance = dict(instance)
         if 'schema' in instance:
             schema = instance['schema']
             schema = Creator.create(schema.get('type')).fromJson(schema)
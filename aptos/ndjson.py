@@ -0,0 +1,41 @@
+import json
+import time
+
+
+def records(fp, start=1):
+    """Yield `(lineno, line)` for every non-blank line of `fp`."""
+    for lineno, line in enumerate(fp, start):
+        if line.strip():
+            yield lineno, line
+
+
+def validate(check, lines):
+    """Yield `(lineno, error)` for every line that fails `check`."""
+    loads = json.loads
+    for lineno, line in lines:
+        try:
+            check(loads(line))
+        except (AssertionError, ValueError) as e:
+            yield lineno, e
+
+
+class Meter:
+    """Count the records and bytes flowing through a pipeline."""
+
+    def __init__(self):
+        self.records = 0
+        self.size = 0
+        self.start = time.perf_counter()
+
+    def measure(self, lines):
+        for lineno, line in lines:
+            self.records += 1
+            self.size += len(line)
+            yield lineno, line
+
+    def report(self, invalid=0):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (
+            '%d records, %d invalid in %.3fs (%.0f records/s, %.2f MB/s)' % (
+                self.records, invalid, elapsed, self.records / elapsed,
+                self.size / elapsed / 1e6))
@@ -0,0 +1,80 @@
+import json
+import mmap
+import multiprocessing
+import os
+
+from .compiler import compile
+
+# The compiled schema of the current worker process, set once by
+# `initialize` so that tasks only carry byte offsets.
+check = None
+
+
+def initialize(schema):
+    global check
+    check = compile(schema)
+
+
+def shards(filename, count):
+    """Split `filename` into `count` byte ranges ending at newlines."""
+    size = os.path.getsize(filename)
+    if not size:
+        return []
+    with open(filename, 'rb') as fp, mmap.mmap(
+            fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offsets = [0]
+        for i in range(1, count):
+            end = mm.find(b'\n', max(size * i // count, offsets[-1]))
+            if end == -1:
+                break
+            offsets.append(end + 1)
+    if offsets[-1] != size:
+        offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def lines(mm, begin, end):
+    mm.seek(begin)
+    while mm.tell() < end:
+        yield mm.readline()
+
+
+def validate_shard(task):
+    """Validate one shard; line numbers are relative to its start."""
+    filename, begin, end = task
+    loads, errors, lineno, records = json.loads, [], 0, 0
+    with open(filename, 'rb') as fp, mmap.mmap(
+            fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for lineno, line in enumerate(lines(mm, begin, end), 1):
+            if not line.strip():
+                continue
+            records += 1
+            try:
+                check(loads(line))
+            except (AssertionError, ValueError) as e:
+                errors.append((lineno, str(e)))
+    return lineno, records, errors
+
+
+def validate(schema, filename, processes=None, meter=None):
+    """Validate an NDJSON file across a pool of processes.
+
+    The file is memory-mapped and split at newline boundaries into
+    several shards per process.  `schema` is sent to each worker once,
+    and `(lineno, error)` pairs are yielded in file order.
+    """
+    processes = processes or os.cpu_count() or 1
+    tasks = [
+        (filename, begin, end)
+        for begin, end in shards(filename, processes * 4)]
+    offset = 0
+    with multiprocessing.Pool(
+            processes, initializer=initialize, initargs=(schema,)) as pool:
+        for count, records, errors in pool.imap(validate_shard, tasks):
+            for lineno, error in errors:
+                yield offset + lineno, error
+            offset += count
+            if meter is not None:
+                meter.records += records
+    if meter is not None:
+        meter.size += sum(end - begin for _, begin, end in tasks)
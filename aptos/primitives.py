@@ -1,6 +1,8 @@
 import re
 
-from copy import deepcopy
+# RFC 3986, appendix B.
+REFERENCE = re.compile(
+    r'^(([^:/?#]+):)?(//([^/?#]*))?([^?#]*)(\?([^#]*))?(#(.*))?')
 
 
 class Creator:
@@ -38,29 +40,174 @@ class Translator:
         }[instance.__class__]
 
 
+# The JSON type of an instance, keyed by its Python class.
+KINDS = {
+    dict: 'object',
+    list: 'array',
+    tuple: 'array',
+    str: 'string',
+    int: 'integer',
+    float: 'number',
+    bool: 'boolean',
+    type(None): 'null',
+}
+
+
 class Component:
 
+    __slots__ = ()
+
     def accept(self, visitor, *args):
         raise NotImplementedError()
 
 
+class Immutable:
+    """Reject every mutation of an empty value shared between primitives.
+
+    Mixed into the `list` and `dict` classes of the values primitives
+    use for the keywords they omit, so that changing the keyword of one
+    node cannot change it on every other node.
+    """
+
+    __slots__ = ()
+
+    def immutable(self, *args, **kwargs):
+        raise TypeError('shared empty %s is immutable' % (
+            self.__class__.__name__))
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = __ior__ = immutable
+    append = extend = insert = remove = sort = reverse = immutable
+    clear = pop = popitem = setdefault = update = immutable
+
+
+class Frozen(Immutable, dict):
+    """An immutable, empty mapping shared by primitives omitting a keyword."""
+
+    __slots__ = ()
+
+
+class FrozenList(Immutable, list):
+    """An immutable, empty list shared by primitives omitting a keyword."""
+
+    __slots__ = ()
+
+
+EMPTY = Frozen()
+
+EMPTY_LIST = FrozenList()
+
+
+def mapping(value, cls=dict):
+    """Copy a mapping keyword into `cls`, sharing `EMPTY` when it is absent.
+
+    Values that are already of a mapping class other than `dict` are kept
+    as they are.
+    """
+    if value is None or value == {}:
+        return EMPTY
+    return cls(value) if value.__class__ is dict else value
+
+
+def sequence(value, cls, empty):
+    """Wrap a list of schemas in `cls`, sharing `empty` when it is absent."""
+    if not value:
+        return empty
+    return value if isinstance(value, cls) else cls(value)
+
+
+def canonical(value):
+    """Return a hashable key that is equal for equal JSON values.
+
+    JSON equality is followed: `1` and `1.0` share a key while `true` and
+    `1` do not, and objects compare regardless of member order.
+    """
+    cls = value.__class__
+    if cls is str or cls is int or cls is float or value is None:
+        return value
+    if cls is bool:
+        return ('boolean', value)
+    if isinstance(value, dict):
+        return ('object', frozenset(
+            (name, canonical(member)) for name, member in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ('array', tuple(canonical(element) for element in value))
+    return value
+
+
+def expression(pattern):
+    """Compile `pattern`, reporting an invalid one at load time."""
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise ValueError('invalid pattern %r: %s' % (pattern, e))
+
+
+def resolved(primitive):
+    """Follow recursive references to the node they point at."""
+    while isinstance(primitive, Reference) and primitive.target is not None:
+        primitive = primitive.target
+    return primitive
+
+
+def pins(primitive):
+    """Return the canonical keys `primitive` restricts an instance to."""
+    if getattr(primitive, 'enumKeys', None):
+        return primitive.enumKeys
+    if getattr(primitive, 'const', None) is not None:
+        return frozenset((primitive.constKey,))
+    return None
+
+
 class Primitive(Component):
+    """The base of every schema node.
+
+    Nodes use `__slots__`, and keywords a schema omits all refer to the
+    same shared, immutable empty values (`EMPTY_LIST`, `EMPTY`,
+    `EMPTY_ALL_OF` and `EMPTY_DEFINITIONS`) rather than to per-node
+    containers.  They have the types of the values the keywords take when
+    present: `enum`, `required`, `anyOf` and `oneOf` are lists.
+
+    Keywords starting with `x-` are specification extensions; they are
+    kept in `extensions` and only read by the visitors they are for.
+
+    `kinds` lists the JSON types of the instances a node can accept and
+    `cost` ranks how expensive it is to check, cheapest first.
+    """
+
+    __slots__ = ('enum', 'const', 'type', 'allOf', 'anyOf', 'oneOf',
+                 'definitions', 'title', 'description', 'default',
+                 'examples', 'format', 'extensions', 'enumKeys',
+                 'constKey',)
 
     keywords = ('enum', 'const', 'type', 'allOf', 'anyOf', 'oneOf',)
 
+    kinds = frozenset(KINDS.values())
+
+    cost = 3
+
     def __init__(self, enum=None, const=None, type=None, allOf=None,
                  anyOf=None, oneOf=None, definitions=None, title='',
                  description='', default=None, examples=None, format='',
                  **kwargs):
         # TODO: include `not`
-        self.enum = [] if enum is None else list(set(enum))
+        # `enum` keeps its declared order without duplicates; `enumKeys`
+        # and `constKey` hold canonical keys for constant-time membership.
+        if enum:
+            keys = {}
+            for symbol in enum:
+                keys.setdefault(canonical(symbol), symbol)
+            self.enum = list(keys.values())
+            self.enumKeys = frozenset(keys)
+        else:
+            self.enum = EMPTY_LIST
+            self.enumKeys = frozenset()
         self.const = const
+        self.constKey = None if const is None else canonical(const)
         self.type = type
-        self.allOf = AllOf() if allOf is None else allOf
-        self.anyOf = [] if anyOf is None else anyOf
-        self.oneOf = [] if oneOf is None else oneOf
-        self.definitions = (
-            Definitions() if definitions is None else definitions)
+        self.allOf = sequence(allOf, AllOf, EMPTY_ALL_OF)
+        self.anyOf = sequence(anyOf, AnyOf, EMPTY_LIST)
+        self.oneOf = sequence(oneOf, OneOf, EMPTY_LIST)
+        self.definitions = definitions or EMPTY_DEFINITIONS
 
         # Metadata keywords
         self.title = title
@@ -68,12 +215,17 @@ class Primitive(Component):
         self.default = default
         self.examples = examples
         self.format = format
+        self.extensions = mapping(dict(
+            (key, value) for key, value in kwargs.items()
+            if key.startswith('x-')))
 
     @classmethod
     def fromJson(cls, instance):
-        instance = deepcopy(instance)
+        instance = dict(instance)
         instance['enum'] = instance.get('enum', [])
         instance['allOf'] = AllOf.fromJson(instance.get('allOf'))
+        instance['anyOf'] = AnyOf.fromJson(instance.get('anyOf'))
+        instance['oneOf'] = OneOf.fromJson(instance.get('oneOf'))
         instance['definitions'] = Definitions.fromJson(
             instance.get('definitions'))
         return cls(**instance)
@@ -81,40 +233,93 @@ class Primitive(Component):
 
 class Definitions(Component, dict):
 
+    __slots__ = ()
+
     @classmethod
     def fromJson(cls, definitions=None):
-        if definitions is None:
-            definitions = {}
-        for name, member in definitions.items():
-            member = Creator.create(member.get('type')).fromJson(member)
-            definitions[name] = member
-        return cls(definitions)
+        if not definitions:
+            return EMPTY_DEFINITIONS
+        return cls(
+            (name, Creator.create(member.get('type')).fromJson(member))
+            for name, member in definitions.items())
 
     def accept(self, visitor, *args):
         return visitor.visitDefinitions(self, *args)
 
 
+class FrozenDefinitions(Immutable, Definitions):
+
+    __slots__ = ()
+
+
+# Shared by every primitive without `definitions`.
+EMPTY_DEFINITIONS = FrozenDefinitions()
+
+
 class Properties(Component, dict):
 
+    __slots__ = ()
+
     @classmethod
     def fromJson(cls, properties=None):
         if properties is None:
-            properties = {}
-        for name, member in properties.items():
-            member = Creator.create(member.get('type')).fromJson(member)
-            properties[name] = member
-        return cls(properties)
+            return cls()
+        return cls(
+            (name, Creator.create(member.get('type')).fromJson(member))
+            for name, member in properties.items())
 
     def accept(self, visitor, *args):
         return visitor.visitProperties(self, *args)
 
 
+class PatternProperties(Properties):
+    """Member schemas keyed by the regular expression names must match.
+
+    Every pattern is compiled once, and `expression` combines all of them
+    so that a name matching none of the patterns is rejected in a single
+    search.  It is `None` when a pattern has groups, since combining the
+    patterns would renumber the groups their backreferences refer to.
+    """
+
+    __slots__ = ('expressions', 'expression',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expressions = tuple(
+            (pattern, expression(pattern)) for pattern in self)
+        if any(compiled.groups for _, compiled in self.expressions):
+            self.expression = None
+            return
+        try:
+            self.expression = re.compile('|'.join(
+                '(?:{})'.format(pattern) for pattern in self))
+        except re.error:
+            # Patterns using group references cannot be combined.
+            self.expression = None
+
+    @classmethod
+    def fromJson(cls, properties=None):
+        if not properties:
+            return EMPTY
+        return super().fromJson(properties)
+
+    def accept(self, visitor, *args):
+        return visitor.visitPatternProperties(self, *args)
+
+
 class Array(Primitive):
     """A JSON array."""
 
+    __slots__ = ('additionalItems', 'items', 'maxItems', 'minItems',
+                 'uniqueItems', 'contains',)
+
     keywords = ('additionalItems', 'items', 'maxItems', 'minItems',
                 'uniqueItems',)
 
+    kinds = frozenset(('array',))
+
+    cost = 4
+
     class List:
 
         @classmethod
@@ -132,22 +337,22 @@ class Array(Primitive):
     def __init__(self, additionalItems=None, items=None, maxItems=0,
                  minItems=0, uniqueItems=False, contains=None, **kwargs):
         super().__init__(**kwargs)
-        self.additionalItems = (
-            {} if additionalItems is None else additionalItems)
+        self.additionalItems = mapping(additionalItems)
         self.items = items
         self.maxItems = maxItems
         self.minItems = minItems
         self.uniqueItems = uniqueItems
-        self.contains = {} if contains is None else contains
+        self.contains = mapping(contains)
 
     @classmethod
     def fromJson(cls, instance):
         instance = super().fromJson(instance)
         items = instance.items
-        instance.items = {
-            dict: Array.List.fromJson,
-            list: Array.Tuple.fromJson,
-        }[items.__class__](items)
+        if items is not None:
+            instance.items = {
+                dict: Array.List.fromJson,
+                list: Array.Tuple.fromJson,
+            }[items.__class__](items)
         return instance
 
     def accept(self, visitor, *args):
@@ -156,10 +361,12 @@ class Array(Primitive):
 
 class AllOf(list):
 
+    __slots__ = ()
+
     @classmethod
     def fromJson(cls, items=None):
-        if items is None:
-            items = []
+        if not items:
+            return EMPTY_ALL_OF
         items = list(
             Creator.create(item.get('type')).fromJson(item) for item in items)
         return cls(items)
@@ -168,11 +375,119 @@ class AllOf(list):
         return visitor.visitAllOf(self, *args)
 
 
+class FrozenAllOf(Immutable, AllOf):
+
+    __slots__ = ()
+
+
+# Shared by every primitive without `allOf`, like `EMPTY_DEFINITIONS`.
+EMPTY_ALL_OF = FrozenAllOf()
+
+
+class Branches(list):
+    """Schemas an instance is tried against, indexed by JSON type.
+
+    `candidates` returns only the branches that accept the type of an
+    instance, cheapest first.  When several object branches pin the same
+    property to constants, as tagged envelopes do, object instances are
+    further narrowed by the value of that property.  The index is built
+    on first use and dropped whenever a branch is replaced.
+    """
+
+    __slots__ = ('index', 'discriminator', 'choices', 'rest',)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.index = None
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.index = None
+
+    @classmethod
+    def fromJson(cls, items=None):
+        if not items:
+            return EMPTY_LIST
+        return cls(
+            Creator.create(item.get('type')).fromJson(item) for item in items)
+
+    def build(self):
+        branches = sorted(self, key=lambda branch: resolved(branch).cost)
+        index = {kind: tuple(
+            branch for branch in branches if kind in resolved(branch).kinds)
+            for kind in Primitive.kinds}
+        self.discriminate(index['object'])
+        self.index = index
+        return index
+
+    def discriminate(self, branches):
+        pinned = {}
+        for position, branch in enumerate(branches):
+            properties = getattr(resolved(branch), 'properties', None) or {}
+            for name, member in properties.items():
+                keys = pins(resolved(member))
+                if keys:
+                    pinned.setdefault(name, {})[position] = keys
+        self.discriminator = None
+        if not pinned:
+            return
+        name = max(sorted(pinned), key=lambda name: len(pinned[name]))
+        keyed = pinned[name]
+        if len(keyed) < 2:
+            return
+        choices = {}
+        for keys in keyed.values():
+            for key in keys:
+                choices[key] = tuple(
+                    branch for position, branch in enumerate(branches)
+                    if position not in keyed or key in keyed[position])
+        self.choices = choices
+        self.rest = tuple(
+            branch for position, branch in enumerate(branches)
+            if position not in keyed)
+        self.discriminator = name
+
+    def candidates(self, instance):
+        index = self.index
+        if index is None:
+            index = self.build()
+        kind = KINDS.get(instance.__class__)
+        if kind is None:
+            return tuple(self)
+        if kind == 'object' and self.discriminator is not None:
+            name = self.discriminator
+            if name in instance:
+                return self.choices.get(canonical(instance[name]), self.rest)
+        return index[kind]
+
+
+class AnyOf(Branches):
+
+    __slots__ = ()
+
+    def accept(self, visitor, *args):
+        return visitor.visitAnyOf(self, *args)
+
+
+class OneOf(Branches):
+
+    __slots__ = ()
+
+    def accept(self, visitor, *args):
+        return visitor.visitOneOf(self, *args)
+
+
 class Boolean(Primitive):
     """A JSON boolean."""
 
+    __slots__ = ()
+
     keywords = ()
 
+    kinds = frozenset(('boolean',))
+
+    cost = 0
+
     def accept(self, visitor, *args):
         return visitor.visitBoolean(self, *args)
 
@@ -180,11 +495,18 @@ class Boolean(Primitive):
 class Integer(Primitive):
     """A JSON number without a fraction or exponent part."""
 
+    __slots__ = ('multipleOf', 'maximum', 'exclusiveMaximum', 'minimum',
+                 'exclusiveMinimum',)
+
     keywords = ('multipleOf', 'maximum', 'exclusiveMaximum', 'minimum',
                 'exclusiveMinimum',)
 
-    def __init__(self, multipleOf=0, maximum=0, exclusiveMaximum=False,
-                 minimum=0, exclusiveMinimum=False, **kwargs):
+    kinds = frozenset(('integer',))
+
+    cost = 1
+
+    def __init__(self, multipleOf=0, maximum=None, exclusiveMaximum=False,
+                 minimum=None, exclusiveMinimum=False, **kwargs):
         super().__init__(**kwargs)
         self.multipleOf = multipleOf
         self.maximum = maximum
@@ -199,9 +521,16 @@ class Integer(Primitive):
 class Number(Primitive):
     """Any JSON number.  Number includes integer."""
 
+    __slots__ = ('multipleOf', 'maximum', 'exclusiveMaximum', 'minimum',
+                 'exclusiveMinimum',)
+
     keywords = ('multipleOf', 'maximum', 'exclusiveMaximum', 'minimum',
                 'exclusiveMinimum',)
 
+    kinds = frozenset(('integer', 'number',))
+
+    cost = 1
+
     def __init__(self, multipleOf=0, maximum=None, exclusiveMaximum=False,
                  minimum=None, exclusiveMinimum=False, **kwargs):
         super().__init__(**kwargs)
@@ -218,8 +547,14 @@ class Number(Primitive):
 class Null(Primitive):
     """The JSON null value."""
 
+    __slots__ = ()
+
     keywords = ()
 
+    kinds = frozenset(('null',))
+
+    cost = 0
+
     def accept(self, visitor, *args):
         return visitor.visitNull(self, *args)
 
@@ -227,10 +562,18 @@ class Null(Primitive):
 class Record(Primitive):
     """A JSON object."""
 
+    __slots__ = ('maxProperties', 'minProperties', 'required', 'properties',
+                 'patternProperties', 'additionalProperties', 'dependencies',
+                 'propertyNames',)
+
     keywords = ('maxProperties', 'minProperties', 'required',
                 'additionalProperties', 'properties', 'patternProperties',
                 'dependencies', 'propertyNames',)
 
+    kinds = frozenset(('object',))
+
+    cost = 5
+
     def __init__(self, maxProperties=0, minProperties=0, required=None,
                  properties=None, patternProperties=None,
                  additionalProperties=None, dependencies=None,
@@ -238,21 +581,25 @@ class Record(Primitive):
         super().__init__(**kwargs)
         self.maxProperties = maxProperties
         self.minProperties = minProperties
-        self.required = [] if required is None else list(set(required))
-        self.properties = properties
-        self.patternProperties = (
-            {} if patternProperties is None else dict(patternProperties))
-        self.additionalProperties = (
-            {} if additionalProperties is None else dict(additionalProperties))
+        self.required = (
+            list(dict.fromkeys(required)) if required else EMPTY_LIST)
+        self.properties = (
+            Properties() if properties is None
+            else Properties(properties) if properties.__class__ is dict
+            else properties)
+        self.patternProperties = mapping(patternProperties, PatternProperties)
+        self.additionalProperties = mapping(additionalProperties)
         self.dependencies = dependencies
-        self.propertyNames = (
-            {} if propertyNames is None else dict(propertyNames))
+        self.propertyNames = mapping(propertyNames)
 
     @classmethod
     def fromJson(cls, instance):
-        instance = super().fromJson(instance)
-        instance.properties = Properties.fromJson(instance.properties)
-        return instance
+        instance = dict(instance)
+        instance['properties'] = Properties.fromJson(
+            instance.get('properties'))
+        instance['patternProperties'] = PatternProperties.fromJson(
+            instance.get('patternProperties'))
+        return super().fromJson(instance)
 
     def accept(self, visitor, *args):
         return visitor.visitDeclared(self, *args)
@@ -261,13 +608,20 @@ class Record(Primitive):
 class String(Primitive):
     """A JSON string."""
 
+    __slots__ = ('maxLength', 'minLength', 'pattern', 'expression',)
+
     keywords = ('maxLength', 'minLength', 'pattern',)
 
+    kinds = frozenset(('string',))
+
+    cost = 2
+
     def __init__(self, maxLength=0, minLength=0, pattern='', **kwargs):
         super().__init__(**kwargs)
         self.maxLength = maxLength
         self.minLength = minLength
         self.pattern = pattern
+        self.expression = expression(pattern) if pattern else None
 
     def accept(self, visitor, *args):
         return visitor.visitString(self, *args)
@@ -275,10 +629,26 @@ class String(Primitive):
 
 class Union(Primitive):
 
+    __slots__ = ()
+
+    @property
+    def kinds(self):
+        return frozenset().union(*(
+            resolved(branch).kinds for branch in self.type))
+
+    @property
+    def cost(self):
+        return max(resolved(branch).cost for branch in self.type)
+
     @classmethod
     def fromJson(cls, instance):
-        instance['type'] = list(
-            Creator.create(identifier).fromJson(instance)
+        instance = dict(instance)
+        # The union evaluates `anyOf` and `oneOf` itself, once.
+        members = dict(instance)
+        members.pop('anyOf', None)
+        members.pop('oneOf', None)
+        instance['type'] = Branches(
+            Creator.create(identifier).fromJson(members)
             for identifier in instance['type'])
         return super().fromJson(instance)
 
@@ -288,13 +658,17 @@ class Union(Primitive):
 
 class Reference(Primitive):
 
+    __slots__ = ('value', 'fragment', 'target',)
+
     def __init__(self, **kwargs):
         value = kwargs['$ref']
-        expression = re.compile(
-            r'^(([^:/?#]+):)?(//([^/?#]*))?([^?#]*)(\?([^#]*))?(#(.*))?')
-        if expression.match(value) is None:
+        match = REFERENCE.match(value)
+        if match is None:
             raise ValueError()
         self.value = value
+        self.fragment = match.group(9) or ''
+        # Set by `TypeVisitor` when the reference is a recursive back-edge.
+        self.target = None
 
     def accept(self, visitor, *args):
         return visitor.visitUnknown(self, *args)
@@ -302,6 +676,8 @@ class Reference(Primitive):
 
 class Enumerated(Primitive):
 
+    __slots__ = ()
+
     def accept(self, visitor, *args):
         return visitor.visitEnum(self, *args)
 
@@ -0,0 +1,379 @@
+"""Protocol Buffers definitions and wire format for `Record` trees.
+
+`proto` renders the output of `ProtobufVisitor` as a proto3 `.proto`
+file, and `Codec` compiles it into closures that write instances
+straight to the protobuf wire format and read them back.
+"""
+import re
+import struct
+
+from . import primitives
+from .visitors import ProtobufVisitor
+
+DOUBLE = struct.Struct('<d')
+
+# Wire types.
+VARINT, FIXED64, DELIMITED, FIXED32 = 0, 1, 2, 5
+
+MASK = (1 << 64) - 1
+
+
+def write_varint(value, out):
+    value &= MASK
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, position):
+    b = data[position]
+    position += 1
+    n = b & 0x7F
+    shift = 7
+    while b & 0x80:
+        b = data[position]
+        position += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+    return n, position
+
+
+def tag(number, wiretype):
+    out = bytearray()
+    write_varint((number << 3) | wiretype, out)
+    return bytes(out)
+
+
+def skip(data, position, wiretype):
+    """Return the position after a field this schema does not know."""
+    if wiretype == VARINT:
+        return read_varint(data, position)[1]
+    if wiretype == FIXED64:
+        return position + 8
+    if wiretype == DELIMITED:
+        size, position = read_varint(data, position)
+        return position + size
+    if wiretype == FIXED32:
+        return position + 4
+    raise ValueError('unsupported wire type %d' % wiretype)
+
+
+def constants(enum):
+    """Return the names of the values of `enum`, starting at zero."""
+    prefix = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', enum['name']).upper()
+    names = ['%s_UNSPECIFIED' % prefix]
+    for index, symbol in enumerate(enum['symbols'], 1):
+        name = re.sub(r'\W+', '_', str(symbol)).strip('_').upper()
+        name = '%s_%s' % (prefix, name) if name else '%s_%d' % (prefix, index)
+        if name in names:
+            name = '%s_%d' % (name, index)
+        names.append(name)
+    return names
+
+
+def proto(message, package=None):
+    """Render the output of `ProtobufVisitor` as a proto3 file."""
+    lines = ['syntax = "proto3";', '']
+    if package:
+        lines.extend(['package %s;' % package, ''])
+    render(message, lines, '')
+    return '\n'.join(lines) + '\n'
+
+
+def render(definition, lines, indent):
+    name = definition['name'] or 'Message'
+    if definition['type'] == 'enum':
+        lines.append('%senum %s {' % (indent, name))
+        for number, constant in enumerate(constants(definition)):
+            lines.append('%s  %s = %d;' % (indent, constant, number))
+        lines.append('%s}' % indent)
+        return
+    lines.append('%smessage %s {' % (indent, name))
+    nested = []
+    for field in definition['fields']:
+        if field['type'] == 'oneof':
+            lines.append('%s  oneof %s {' % (indent, field['name']))
+            for branch in field['fields']:
+                lines.append(declaration(branch, indent + '    '))
+                nested.append(branch['type'])
+            lines.append('%s  }' % indent)
+        else:
+            lines.append(declaration(field, indent + '  '))
+            nested.append(field['type'])
+    rendered = set()
+    for definition in nested:
+        if isinstance(definition, dict) and (
+                definition['name'] not in rendered):
+            rendered.add(definition['name'])
+            render(definition, lines, indent + '  ')
+    lines.append('%s}' % indent)
+
+
+def declaration(field, indent):
+    kind = field['type']
+    if isinstance(kind, dict):
+        kind = kind['name']
+    options = ''
+    if field['json'] != field['name']:
+        options = ' [json_name = "%s"]' % field['json']
+    return '%s%s%s %s = %d%s;' % (
+        indent, 'repeated ' if field.get('label') else '', kind,
+        field['name'], field['number'], options)
+
+
+def int64(value):
+    if value.__class__ is bool or not isinstance(value, int):
+        raise ValueError('%r is not an integer' % value)
+    if not -(1 << 63) <= value < 1 << 63:
+        raise ValueError('%r is out of range for int64' % value)
+    return value
+
+
+def read_int64(data, position):
+    value, position = read_varint(data, position)
+    return value - (1 << 64) if value >> 63 else value, position
+
+
+def boolean(value):
+    if value.__class__ is not bool:
+        raise ValueError('%r is not a boolean' % value)
+    return value
+
+
+def read_bool(data, position):
+    value, position = read_varint(data, position)
+    return bool(value), position
+
+
+def double(value):
+    if value.__class__ is bool or not isinstance(value, (int, float)):
+        raise ValueError('%r is not a number' % value)
+    return value
+
+
+def write_double(value, out):
+    out += DOUBLE.pack(value)
+
+
+def read_double(data, position):
+    return DOUBLE.unpack_from(data, position)[0], position + 8
+
+
+class Codec:
+    """Encode and decode instances of one protobuf message.
+
+    `schema` is a `Record`, converted with `ProtobufVisitor`, or the
+    output of `ProtobufVisitor`.  Fields that are absent or `None` are
+    not written, and decoding leaves fields that are not on the wire
+    out of the instance.
+    """
+
+    __slots__ = ('schema', 'write', 'read',)
+
+    def __init__(self, schema):
+        if isinstance(schema, primitives.Component):
+            schema = schema.accept(ProtobufVisitor())
+        self.schema = schema
+        self.write, self.read = Compiler().compile(schema)
+
+    def encode(self, instance):
+        out = bytearray()
+        self.write(instance, out)
+        return bytes(out)
+
+    def decode(self, data):
+        try:
+            return self.read(data, 0, len(data))
+        except (IndexError, struct.error):
+            raise ValueError('truncated protobuf data')
+
+
+class Compiler:
+    """Build the writer and reader closures of a protobuf message."""
+
+    # How each scalar is converted, written and read, with its wire type.
+    scalars = {
+        'int64': (int64, write_varint, read_int64, VARINT),
+        'bool': (boolean, write_varint, read_bool, VARINT),
+        'double': (double, write_double, read_double, FIXED64),
+    }
+
+    def __init__(self):
+        # Messages by name, so that recursive references can be resolved.
+        self.named = {}
+
+    def compile(self, message):
+        cell = self.named[message['name']] = [None, None]
+        writers, readers = [], {}
+        for field in message['fields']:
+            if field['type'] == 'oneof':
+                writers.append((field['json'], self.oneof(field, readers)))
+            else:
+                write, read, packed = self.field(field)
+                writers.append((field['json'], write))
+                readers[field['number']] = (
+                    field['json'], read, packed, field.get('label'))
+        writers = tuple(writers)
+
+        def write(value, out):
+            for name, write in writers:
+                member = value.get(name)
+                if member is not None:
+                    write(member, out)
+
+        def read(data, position, end):
+            value = {}
+            while position < end:
+                key, position = read_varint(data, position)
+                number, wiretype = key >> 3, key & 7
+                if number not in readers:
+                    position = skip(data, position, wiretype)
+                    continue
+                name, read, packed, repeated = readers[number]
+                if not repeated:
+                    value[name], position = read(data, position)
+                elif packed is not None and wiretype == DELIMITED:
+                    # Packed repeated scalars share one length prefix.
+                    size, position = read_varint(data, position)
+                    items = value.setdefault(name, [])
+                    stop = position + size
+                    while position < stop:
+                        item, position = packed(data, position)
+                        items.append(item)
+                else:
+                    item, position = read(data, position)
+                    value.setdefault(name, []).append(item)
+            if position != end:
+                raise IndexError(position)
+            return value
+        cell[:] = [write, read]
+        return write, read
+
+    def field(self, field):
+        """Return the writer, reader and packed reader of `field`."""
+        kind, number = field['type'], field['number']
+        repeated = field.get('label') == 'repeated'
+        if isinstance(kind, dict):
+            if kind['type'] == 'enum':
+                return self.enum(kind, number, repeated)
+            encode, decode = self.message(*self.compile(kind))
+        elif kind in self.scalars:
+            convert, encode, decode, wiretype = self.scalars[kind]
+            return self.scalar(
+                number, convert, encode, decode, wiretype, repeated)
+        elif kind == 'string':
+            encode, decode = self.string()
+        elif kind in self.named:
+            cell = self.named[kind]
+            encode, decode = self.message(
+                lambda value, out: cell[0](value, out),
+                lambda data, position, end: cell[1](data, position, end))
+        else:
+            raise ValueError('unknown protobuf type %r' % kind)
+        key = tag(number, DELIMITED)
+        if repeated:
+            def write(value, out):
+                for item in value:
+                    out += key
+                    encode(item, out)
+        else:
+            def write(value, out):
+                out += key
+                encode(value, out)
+        return write, decode, None
+
+    def scalar(self, number, convert, encode, decode, wiretype, repeated):
+        if not repeated:
+            key = tag(number, wiretype)
+
+            def write(value, out):
+                out += key
+                encode(convert(value), out)
+            return write, decode, None
+        key = tag(number, DELIMITED)
+
+        def write(value, out):
+            if not value:
+                return
+            payload = bytearray()
+            for item in value:
+                encode(convert(item), payload)
+            out += key
+            write_varint(len(payload), out)
+            out += payload
+        return write, decode, decode
+
+    def enum(self, enum, number, repeated):
+        symbols = (None,) + tuple(enum['symbols'])
+        numbers = dict(
+            (primitives.canonical(symbol), index)
+            for index, symbol in enumerate(symbols) if index)
+
+        def convert(value):
+            index = numbers.get(primitives.canonical(value))
+            if index is None:
+                raise ValueError('%r is not one of the symbols %r' % (
+                    value, symbols[1:]))
+            return index
+
+        def decode(data, position):
+            index, position = read_varint(data, position)
+            return symbols[index], position
+        return self.scalar(number, convert, write_varint, decode, VARINT,
+                           repeated)
+
+    @staticmethod
+    def string():
+        def encode(value, out):
+            value = value.encode('utf-8')
+            write_varint(len(value), out)
+            out += value
+
+        def decode(data, position):
+            size, position = read_varint(data, position)
+            end = position + size
+            if end > len(data):
+                raise IndexError(end)
+            return str(data[position:end], 'utf-8'), end
+        return encode, decode
+
+    @staticmethod
+    def message(write, read):
+        def encode(value, out):
+            payload = bytearray()
+            write(value, payload)
+            write_varint(len(payload), out)
+            out += payload
+
+        def decode(data, position):
+            size, position = read_varint(data, position)
+            end = position + size
+            if end > len(data):
+                raise IndexError(end)
+            return read(data, position, end), end
+        return encode, decode
+
+    def oneof(self, group, readers):
+        # The first branch accepting each Python class writes the value.
+        classes = {
+            'int64': (int,), 'bool': (bool,), 'double': (int, float,),
+            'string': (str,), 'enum': (str,), 'message': (dict,),
+        }
+        choices = {}
+        for field in group['fields']:
+            write, read, packed = self.field(field)
+            readers[field['number']] = (group['json'], read, packed, None)
+            kind = field['type']
+            kind = kind['type'] if isinstance(kind, dict) else (
+                kind if kind in classes else 'message')
+            for cls in classes[kind]:
+                choices.setdefault(cls, write)
+
+        def write(value, out):
+            write = choices.get(value.__class__)
+            if write is None:
+                raise ValueError('%r does not match any field of %r' % (
+                    value, group['name']))
+            write(value, out)
+        return write
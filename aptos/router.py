@@ -0,0 +1,207 @@
+"""Map requests to the operations and schemas of an OpenAPI document.
+
+`Router` indexes the templated paths of a specification in a trie of
+path segments, so finding the operation for a path costs one lookup per
+segment however many paths the specification declares.  Each `Route`
+holds compiled validators for its request bodies and responses.
+"""
+import re
+
+from urllib.parse import unquote
+
+from .models import PathItem
+from .validator import Validator
+
+# A `{name}` template expression within a path segment.
+TEMPLATE = re.compile(r'\{([^{}/]+)\}')
+
+
+def negotiate(validators, contentType):
+    """Return the validator of the media range matching `contentType`."""
+    validator = validators.get(contentType)
+    if validator is not None or not validators:
+        return validator
+    kind = contentType.partition(';')[0].strip().lower()
+    for key in (kind, kind.partition('/')[0] + '/*', '*/*'):
+        validator = validators.get(key)
+        if validator is not None:
+            return validator
+    return None
+
+
+class Route:
+    """An operation of a path template, and the validators of its bodies.
+
+    `names` lists the path parameters in the order their values appear
+    in a path.  Media types without a schema have no validator.
+    """
+
+    __slots__ = ('method', 'template', 'names', 'operation', 'requests',
+                 'responses',)
+
+    def __init__(self, method, template, names, operation, requests,
+                 responses):
+        self.method = method
+        self.template = template
+        self.names = names
+        self.operation = operation
+        self.requests = requests
+        self.responses = responses
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (
+            self.__class__.__name__, self.method.upper(), self.template)
+
+    def request(self, contentType='application/json'):
+        """Return the `Validator` of a request body, or `None`."""
+        return negotiate(self.requests, contentType)
+
+    def response(self, status, contentType='application/json'):
+        """Return the `Validator` of a response body, or `None`.
+
+        An exact status code is preferred to its range, such as `2XX`,
+        and the range to the `default` response.
+        """
+        status = str(status)
+        for key in (status, status[:1] + 'XX', 'default'):
+            validators = self.responses.get(key)
+            if validators is not None:
+                return negotiate(validators, contentType)
+        return None
+
+
+class Node:
+    """A path segment of the trie built by `Router`.
+
+    Literal segments are looked up in `children`.  A segment that is a
+    single template expression matches any non-empty segment through
+    `parameter`, and other templated segments are matched with the
+    regular expressions in `patterns`.
+    """
+
+    __slots__ = ('children', 'parameter', 'patterns', 'routes',)
+
+    def __init__(self):
+        self.children = {}
+        self.parameter = None
+        self.patterns = {}
+        self.routes = {}
+
+    def search(self, segments, position, method, values):
+        """Return the route of `method` below this node, or `None`.
+
+        Literal segments take precedence over templated ones, and a
+        branch that does not lead to a route is abandoned for the next.
+        """
+        if position == len(segments):
+            return self.routes.get(method)
+        segment = segments[position]
+        child = self.children.get(segment)
+        if child is not None:
+            route = child.search(segments, position + 1, method, values)
+            if route is not None:
+                return route
+        size = len(values)
+        for expression, child in self.patterns.values():
+            match = expression.fullmatch(segment)
+            if match is None:
+                continue
+            values.extend(match.groups())
+            route = child.search(segments, position + 1, method, values)
+            if route is not None:
+                return route
+            del values[size:]
+        if self.parameter is not None and segment:
+            values.append(segment)
+            route = self.parameter.search(
+                segments, position + 1, method, values)
+            if route is not None:
+                return route
+            values.pop()
+        return None
+
+
+class Router:
+    """Find the `Route` of a method and path in an `OpenAPI` document.
+
+    Validators are compiled when the router is built, once per schema
+    node, so operations sharing a component schema share its validator.
+    """
+
+    def __init__(self, specification):
+        self.root = Node()
+        self.validators = {}
+        for template, item in specification.paths.items():
+            for method in PathItem.operations:
+                operation = getattr(item, method)
+                if operation is not None:
+                    self.add(method, template, operation)
+
+    def routes(self, node=None):
+        """Yield every route below `node`, the root by default."""
+        node = self.root if node is None else node
+        yield from node.routes.values()
+        children = list(node.children.values())
+        if node.parameter is not None:
+            children.append(node.parameter)
+        children.extend(child for _, child in node.patterns.values())
+        for child in children:
+            yield from self.routes(child)
+
+    def validator(self, schema):
+        validator = self.validators.get(schema)
+        if validator is None:
+            validator = self.validators[schema] = Validator(schema)
+        return validator
+
+    def media(self, content):
+        """Compile the schemas of `content`, keyed by media range."""
+        return dict(
+            (kind, self.validator(media.schema))
+            for kind, media in (content or {}).items()
+            if media.schema is not None)
+
+    def add(self, method, template, operation):
+        node, names = self.root, []
+        for segment in template.split('/')[1:]:
+            found = TEMPLATE.findall(segment)
+            if not found:
+                node = node.children.setdefault(segment, Node())
+            elif TEMPLATE.fullmatch(segment):
+                if node.parameter is None:
+                    node.parameter = Node()
+                node = node.parameter
+            else:
+                pattern = ''.join(
+                    '(.+?)' if index % 2 else re.escape(part)
+                    for index, part in enumerate(TEMPLATE.split(segment)))
+                if pattern not in node.patterns:
+                    node.patterns[pattern] = (re.compile(pattern), Node())
+                node = node.patterns[pattern][1]
+            names.extend(found)
+        method = method.lower()
+        if method in node.routes:
+            raise ValueError('%s %s duplicates %r' % (
+                method.upper(), template, node.routes[method]))
+        body = operation.requestBody
+        node.routes[method] = Route(
+            method, template, tuple(names), operation,
+            self.media(body.content if body is not None else None),
+            dict((str(status), self.media(response.content))
+                 for status, response in operation.responses.items()))
+
+    def match(self, method, path):
+        """Return the route of a request and its path parameters.
+
+        The query string of `path` is ignored and parameter values are
+        percent-decoded.  `None` is returned when no operation matches.
+        """
+        path = path.partition('?')[0]
+        if not path.startswith('/'):
+            return None
+        values = []
+        route = self.root.search(
+            path.split('/')[1:], 0, method.lower(), values)
+        if route is None:
+            return None
+        return route, dict(zip(route.names, map(unquote, values)))
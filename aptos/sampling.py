@@ -0,0 +1,153 @@
+"""Validate a sample of responses within a budget of CPU time.
+
+`Sampler` decides, per operation, whether a response is validated and
+keeps `Counters` of what was sampled, what failed and the time spent.
+A controller rescales every sampling rate once per `window` so that
+validation uses at most `budget` of the elapsed time.
+"""
+import json
+import random
+import time
+
+
+def label(route):
+    return '%s %s' % (route.method.upper(), route.template)
+
+
+class Counters:
+    """What sampling did for one operation."""
+
+    __slots__ = ('seen', 'sampled', 'failed', 'elapsed',)
+
+    def __init__(self):
+        self.seen = 0
+        self.sampled = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    def asJson(self):
+        return {
+            'seen': self.seen,
+            'sampled': self.sampled,
+            'failed': self.failed,
+            'elapsed': self.elapsed,
+        }
+
+
+class Sampler:
+    """Choose which responses to validate and account for the cost.
+
+    `rates` maps an `operationId`, or a label such as `GET /pets/{petId}`,
+    to the fraction of its responses to validate, and `rate` applies to
+    every other operation.  Every `window` seconds the rates are scaled
+    down when validation took more than `budget` of the elapsed time,
+    and back up, at most doubling, when it took less.  Once a window has
+    used up its budget nothing more is sampled until the next one.
+    `report`, if set, is called with the route, status and errors of
+    every failure.
+
+    A sampler keeps no locks: share it between the requests of one event
+    loop, not between threads.  Only `validate` may run in another
+    thread, as it leaves the sampler untouched; its result is then
+    passed to `account` on the loop.
+    """
+
+    def __init__(self, rate=0.01, rates=None, budget=0.01, window=1.0,
+                 report=None, clock=time.perf_counter, random=random.random):
+        self.rate = rate
+        self.rates = rates or {}
+        self.budget = budget
+        self.window = window
+        self.report = report
+        self.clock = clock
+        self.random = random
+        self.scale = 1.0
+        self.spent = 0.0
+        self.start = clock()
+        # The sampling rate and counters of every route seen so far.
+        self.routes = {}
+
+    def state(self, route):
+        state = self.routes.get(route)
+        if state is None:
+            name = label(route)
+            rate = self.rates.get(
+                route.operation.operationId, self.rates.get(name, self.rate))
+            if not any(route.responses.values()):
+                # Operations without response schemas are never sampled.
+                rate = 0.0
+            state = self.routes[route] = (rate, Counters())
+        return state
+
+    def sample(self, route):
+        """Return whether to validate the next response of `route`."""
+        rate, counters = self.state(route)
+        counters.seen += 1
+        if self.spent >= self.budget * self.window:
+            # The budget of this window is spent: wait for the next one.
+            self.adjust()
+            if self.spent:
+                return False
+        if not rate or self.random() >= rate * self.scale:
+            return False
+        counters.sampled += 1
+        return True
+
+    def check(self, route, status, contentType, body):
+        """Validate a sampled response body and return its errors.
+
+        Errors are `ValidationError`s, or a message if `body` is not JSON.
+        """
+        errors, elapsed = self.validate(route, status, contentType, body)
+        return self.account(route, status, errors, elapsed)
+
+    def validate(self, route, status, contentType, body):
+        """Return the errors of a response body and the time they took."""
+        start = self.clock()
+        errors = []
+        validator = route.response(status, contentType)
+        if validator is not None:
+            try:
+                instance = json.loads(body)
+            except ValueError as e:
+                errors = ['invalid JSON: %s' % e]
+            else:
+                errors = validator.errors(instance, 10)
+        return errors, self.clock() - start
+
+    def account(self, route, status, errors, elapsed):
+        """Count a checked response of `route` and return its errors."""
+        counters = self.state(route)[1]
+        counters.elapsed += elapsed
+        if errors:
+            counters.failed += 1
+            if self.report is not None:
+                self.report(route, status, errors)
+        self.charge(elapsed)
+        return errors
+
+    def charge(self, elapsed):
+        """Account for `elapsed` seconds of validation."""
+        self.spent += elapsed
+        self.adjust()
+
+    def adjust(self):
+        """Rescale the sampling rates at the end of a window."""
+        now = self.clock()
+        period = now - self.start
+        if period < self.window:
+            return
+        usage = self.spent / period
+        scale = self.scale * 2
+        if usage:
+            scale = min(scale, self.scale * self.budget / usage)
+        self.scale = max(min(scale, 1.0), 1e-6)
+        self.spent, self.start = 0.0, now
+
+    def asJson(self):
+        return {
+            'scale': self.scale,
+            'operations': dict(
+                (label(route), counters.asJson())
+                for route, (_, counters) in self.routes.items()),
+        }
@@ -0,0 +1,442 @@
+"""Thrift definitions and the compact protocol for `Record` trees.
+
+`idl` renders the output of `ThriftVisitor` as a Thrift IDL document,
+and `Codec` compiles it into closures that write instances with the
+Thrift compact protocol and read them back.
+"""
+import re
+import struct
+
+from . import primitives
+from .visitors import ThriftVisitor
+
+FLOAT64 = struct.Struct('<d')
+
+# Compact protocol types.
+STOP, TRUE, FALSE, BYTE, I16, I32, I64, DOUBLE, BINARY, LIST, SET, \
+    MAP, STRUCT = range(13)
+
+# Words that cannot name a field in Thrift IDL.
+RESERVED = frozenset((
+    'binary', 'bool', 'byte', 'const', 'double', 'enum', 'exception',
+    'extends', 'i8', 'i16', 'i32', 'i64', 'include', 'list', 'map',
+    'namespace', 'oneway', 'optional', 'required', 'service', 'set',
+    'string', 'struct', 'throws', 'typedef', 'union', 'void',
+))
+
+
+def write_varint(value, out):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def write_zigzag(value, out):
+    write_varint((value << 1) ^ (value >> 63), out)
+
+
+def read_varint(data, position):
+    b = data[position]
+    position += 1
+    n = b & 0x7F
+    shift = 7
+    while b & 0x80:
+        b = data[position]
+        position += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+    return n, position
+
+
+def read_zigzag(data, position):
+    n, position = read_varint(data, position)
+    return (n >> 1) ^ -(n & 1), position
+
+
+def write_header(id, delta, compact, out):
+    """Write a field header, as a delta from the previous ID if it fits."""
+    if 0 < delta <= 15:
+        out.append((delta << 4) | compact)
+    else:
+        out.append(compact)
+        write_zigzag(id, out)
+
+
+def skip(data, position, kind):
+    """Return the position after a value this schema does not know."""
+    if kind in (TRUE, FALSE):
+        return position
+    if kind == BYTE:
+        return position + 1
+    if kind in (I16, I32, I64):
+        return read_varint(data, position)[1]
+    if kind == DOUBLE:
+        return position + 8
+    if kind == BINARY:
+        size, position = read_varint(data, position)
+        return position + size
+    if kind in (LIST, SET):
+        header = data[position]
+        position += 1
+        size, items = header >> 4, header & 0x0F
+        if size == 15:
+            size, position = read_varint(data, position)
+        for _ in range(size):
+            # Booleans in containers take a byte of their own.
+            position = position + 1 if items in (TRUE, FALSE) else skip(
+                data, position, items)
+        return position
+    if kind == MAP:
+        size, position = read_varint(data, position)
+        if not size:
+            return position
+        keys, values = data[position] >> 4, data[position] & 0x0F
+        position += 1
+        for _ in range(size):
+            for item in (keys, values):
+                position = position + 1 if item in (TRUE, FALSE) else skip(
+                    data, position, item)
+        return position
+    if kind == STRUCT:
+        last = 0
+        while True:
+            header = data[position]
+            position += 1
+            if header == STOP:
+                return position
+            if header >> 4:
+                last += header >> 4
+            else:
+                last, position = read_zigzag(data, position)
+            position = skip(data, position, header & 0x0F)
+    raise ValueError('unsupported compact type %d' % kind)
+
+
+def idl(definition, namespace=None):
+    """Render the output of `ThriftVisitor` as Thrift IDL."""
+    lines = []
+    if namespace:
+        lines.extend(['namespace * %s' % namespace, ''])
+    rendered = set()
+    for definition in definitions(definition, []):
+        if definition['name'] in rendered:
+            continue
+        rendered.add(definition['name'])
+        render(definition, lines)
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def definitions(kind, found):
+    """Collect the definitions inlined in `kind`, dependencies first."""
+    if isinstance(kind, dict):
+        if kind['type'] == 'list':
+            definitions(kind['items'], found)
+        else:
+            for field in kind.get('fields', ()):
+                definitions(field['type'], found)
+            found.append(kind)
+    return found
+
+
+def constants(enum):
+    """Return the names of the values of `enum`, in order."""
+    names = []
+    for index, symbol in enumerate(enum['symbols'], 1):
+        name = re.sub(r'\W+', '_', str(symbol)).strip('_').upper()
+        if not name or name[0].isdigit() or name in names:
+            name = 'VALUE_%d' % index
+        names.append(name)
+    return names
+
+
+def typename(kind):
+    if isinstance(kind, str):
+        return kind
+    if kind['type'] == 'list':
+        return 'list<%s>' % typename(kind['items'])
+    return kind['name']
+
+
+def render(definition, lines):
+    # Only the root can be left without a name, by a schema without title.
+    name = definition['name'] or definition['type'].capitalize()
+    if definition['type'] == 'enum':
+        lines.append('enum %s {' % name)
+        names = constants(definition)
+        for number, name in enumerate(names, 1):
+            lines.append('  %s = %d%s' % (
+                name, number, ',' if number < len(names) else ''))
+        lines.append('}')
+        return
+    lines.append('%s %s {' % (definition['type'], name))
+    for field in definition['fields']:
+        name = field['name']
+        if name in RESERVED:
+            name += '_'
+        lines.append('  %d: %s%s %s,' % (
+            field['id'],
+            '' if definition['type'] == 'union' else (
+                'required ' if field['required'] else 'optional '),
+            typename(field['type']), name))
+    lines.append('}')
+
+
+def boolean(value):
+    """Return the compact type that carries the boolean `value`."""
+    if value.__class__ is not bool:
+        raise ValueError('%r is not a boolean' % value)
+    return TRUE if value else FALSE
+
+
+def write_bool(value, out):
+    out.append(boolean(value))
+
+
+def read_bool(data, position):
+    return data[position] == TRUE, position + 1
+
+
+def write_i64(value, out):
+    if value.__class__ is bool or not isinstance(value, int):
+        raise ValueError('%r is not an integer' % value)
+    if not -(1 << 63) <= value < 1 << 63:
+        raise ValueError('%r is out of range for i64' % value)
+    write_zigzag(value, out)
+
+
+def write_double(value, out):
+    if value.__class__ is bool or not isinstance(value, (int, float)):
+        raise ValueError('%r is not a number' % value)
+    try:
+        out += FLOAT64.pack(value)
+    except (OverflowError, struct.error):
+        raise ValueError('%r is out of range for double' % value)
+
+
+def read_double(data, position):
+    return FLOAT64.unpack_from(data, position)[0], position + 8
+
+
+def write_string(value, out):
+    value = value.encode('utf-8')
+    write_varint(len(value), out)
+    out += value
+
+
+def read_string(data, position):
+    size, position = read_varint(data, position)
+    end = position + size
+    if end > len(data):
+        raise IndexError(end)
+    return str(data[position:end], 'utf-8'), end
+
+
+class Codec:
+    """Encode and decode instances of one Thrift struct.
+
+    `schema` is a `Record`, converted with `ThriftVisitor`, or the
+    output of `ThriftVisitor`.  Fields that are absent or `None` are
+    not written, and decoding leaves fields that are not on the wire
+    out of the instance.
+    """
+
+    __slots__ = ('schema', 'write', 'read',)
+
+    def __init__(self, schema):
+        if isinstance(schema, primitives.Component):
+            schema = schema.accept(ThriftVisitor())
+        self.schema = schema
+        self.write, self.read = Compiler().compile(schema)[1:]
+
+    def encode(self, instance):
+        out = bytearray()
+        self.write(instance, out)
+        return bytes(out)
+
+    def decode(self, data):
+        try:
+            instance, position = self.read(data, 0)
+        except (IndexError, struct.error):
+            raise ValueError('truncated Thrift data')
+        if position != len(data):
+            raise ValueError('%d bytes of trailing data' % (
+                len(data) - position))
+        return instance
+
+
+class Compiler:
+    """Build the compact type, writer and reader of a Thrift type."""
+
+    scalars = {
+        'bool': (TRUE, write_bool, read_bool),
+        'i64': (I64, write_i64, read_zigzag),
+        'double': (DOUBLE, write_double, read_double),
+        'string': (BINARY, write_string, read_string),
+    }
+
+    def __init__(self):
+        # Structs by name, so that recursive references can be resolved.
+        self.named = {}
+
+    def compile(self, kind):
+        if isinstance(kind, str):
+            if kind in self.scalars:
+                return self.scalars[kind]
+            if kind not in self.named:
+                raise ValueError('unknown Thrift type %r' % kind)
+            cell = self.named[kind]
+            return (
+                STRUCT, lambda value, out: cell[0](value, out),
+                lambda data, position: cell[1](data, position))
+        if kind['type'] == 'list':
+            return self.sequence(kind)
+        if kind['type'] == 'enum':
+            return self.enum(kind)
+        if kind['type'] == 'union':
+            return self.union(kind)
+        return self.struct(kind)
+
+    def fields(self, definition):
+        fields = []
+        for field in definition['fields']:
+            compact, write, read = self.compile(field['type'])
+            fields.append((field['json'], field['id'], compact, write, read))
+        readers = dict(
+            (id, (name, compact, read))
+            for name, id, compact, write, read in fields)
+
+        def read(data, position):
+            value, last = {}, 0
+            while True:
+                header = data[position]
+                position += 1
+                if header == STOP:
+                    return value, position
+                compact = header & 0x0F
+                if header >> 4:
+                    last += header >> 4
+                else:
+                    last, position = read_zigzag(data, position)
+                field = readers.get(last)
+                if field is None:
+                    position = skip(data, position, compact)
+                elif compact == TRUE or compact == FALSE:
+                    # Boolean fields carry their value in the header.
+                    value[field[0]] = compact == TRUE
+                else:
+                    value[field[0]], position = field[2](data, position)
+        return fields, read
+
+    def struct(self, definition):
+        cell = self.named[definition['name']] = [None, None]
+        fields, read = self.fields(definition)
+        fields = tuple(
+            (name, id, compact, write)
+            for name, id, compact, write, read in fields)
+        required = tuple(
+            field['json'] for field in definition['fields']
+            if field['required'])
+
+        def write(value, out):
+            last = 0
+            for name, id, compact, write in fields:
+                member = value.get(name)
+                if member is None:
+                    continue
+                if compact == TRUE:
+                    compact = boolean(member)
+                write_header(id, id - last, compact, out)
+                if compact != TRUE and compact != FALSE:
+                    write(member, out)
+                last = id
+            out.append(STOP)
+        if required:
+            # Required fields must be present to be written.
+            unchecked = write
+
+            def write(value, out):
+                for name in required:
+                    if value.get(name) is None:
+                        raise ValueError('missing field %r' % name)
+                unchecked(value, out)
+        cell[:] = [write, read]
+        return STRUCT, write, read
+
+    def union(self, definition):
+        fields, read = self.fields(definition)
+        classes = {
+            TRUE: (bool,), I64: (int,), DOUBLE: (int, float,),
+            BINARY: (str,), I32: (str,), LIST: (list, tuple,),
+            STRUCT: (dict,),
+        }
+        # The first field accepting each Python class writes the value.
+        choices = {}
+        for name, id, compact, write, _ in fields:
+            for cls in classes[compact]:
+                choices.setdefault(cls, (id, compact, write))
+
+        def write(value, out):
+            choice = choices.get(value.__class__)
+            if choice is None:
+                raise ValueError('%r does not match any field of %r' % (
+                    value, definition['name']))
+            id, compact, write = choice
+            if compact == TRUE:
+                write_header(id, id, TRUE if value else FALSE, out)
+            else:
+                write_header(id, id, compact, out)
+                write(value, out)
+            out.append(STOP)
+
+        def read_union(data, position):
+            # A union is read as a struct with a single field.
+            value, position = read(data, position)
+            return next(iter(value.values()), None), position
+        return STRUCT, write, read_union
+
+    def enum(self, definition):
+        symbols = (None,) + tuple(definition['symbols'])
+        numbers = dict(
+            (primitives.canonical(symbol), index)
+            for index, symbol in enumerate(symbols) if index)
+
+        def write(value, out):
+            index = numbers.get(primitives.canonical(value))
+            if index is None:
+                raise ValueError('%r is not one of the symbols %r' % (
+                    value, symbols[1:]))
+            write_zigzag(index, out)
+
+        def read(data, position):
+            index, position = read_zigzag(data, position)
+            return symbols[index], position
+        return I32, write, read
+
+    def sequence(self, definition):
+        compact, write_item, read_item = self.compile(definition['items'])
+
+        def write(value, out):
+            size = len(value)
+            if size < 15:
+                out.append((size << 4) | compact)
+            else:
+                out.append(0xF0 | compact)
+                write_varint(size, out)
+            for item in value:
+                write_item(item, out)
+
+        def read(data, position):
+            header = data[position]
+            position += 1
+            size = header >> 4
+            if size == 15:
+                size, position = read_varint(data, position)
+            value = []
+            append = value.append
+            for _ in range(size):
+                item, position = read_item(data, position)
+                append(item)
+            return value, position
+        return LIST, write, read
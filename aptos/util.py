@@ -1,15 +1,105 @@
+import hashlib
 import json
+import os
+import pickle
+import threading
 
+from collections import OrderedDict
+
+from . import __version__
 from .primitives import Record
 from .visitors import TypeVisitor
 
 
+class Cache:
+    """A bounded, least-recently-used mapping shared between threads."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class Snapshots:
+    """Pickled, fully resolved schema trees stored in `directory`.
+
+    Snapshots are keyed by the content hash of the source document and
+    the `aptos` version, so a stale snapshot is never loaded.  Only point
+    this at a directory you trust: loading a snapshot unpickles it.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, digest):
+        return os.path.join(
+            self.directory, '{}-{}.pickle'.format(digest, __version__))
+
+    def load(self, digest):
+        try:
+            with open(self.path(digest), 'rb') as fp:
+                return pickle.load(fp)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def dump(self, digest, record):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(digest)
+        temporary = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary, 'wb') as fp:
+            pickle.dump(record, fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+
 class Parser:
 
-    @staticmethod
-    def parse(filename):
-        with open(filename) as fp:
-            instance = json.load(fp)
-        record = Record.fromJson(instance)
-        record.accept(TypeVisitor(instance))
+    cache = Cache()
+
+    @classmethod
+    def parse(cls, filename, snapshots=None):
+        """Parse and resolve the JSON Schema document at `filename`.
+
+        Parsed trees are cached by path and content hash, so repeated
+        calls for an unchanged file return the same shared `Record`.  If
+        `snapshots` is a directory, resolved trees are also stored there
+        and loaded instead of re-parsing the source.
+        """
+        with open(filename, 'rb') as fp:
+            content = fp.read()
+        digest = hashlib.sha256(content).hexdigest()
+        key = (os.path.abspath(filename), digest)
+        record = cls.cache.get(key)
+        if record is not None:
+            return record
+        if snapshots is not None:
+            snapshots = Snapshots(snapshots)
+            record = snapshots.load(digest)
+        if record is None:
+            instance = json.loads(content.decode('utf-8'))
+            record = TypeVisitor(instance).resolve(
+                '', Record.fromJson(instance))
+            if snapshots is not None:
+                snapshots.dump(digest, record)
+        cls.cache.put(key, record)
         return record
@@ -0,0 +1,106 @@
+from .compiler import compile
+from .errors import collect
+
+
+def validate_many(schema, instances):
+    """Validate every instance in `instances` against `schema`."""
+    return Validator(schema).validateMany(instances)
+
+
+class Results:
+    """The outcome of validating a batch of instances.
+
+    Validity is packed into `bitmap`, one bit per instance, and only the
+    instances that failed have an entry in `errors`, keyed by position.
+    Errors are kept as messages, so that a large batch does not keep the
+    tracebacks of its failures, and the instances they refer to, alive.
+    """
+
+    __slots__ = ('bitmap', 'errors', 'count',)
+
+    def __init__(self):
+        self.bitmap = bytearray()
+        self.errors = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return bool(self.bitmap[index >> 3] & (1 << (index & 7)))
+
+    def __iter__(self):
+        return (self[index] for index in range(self.count))
+
+    def __bool__(self):
+        return not self.errors
+
+    @property
+    def valid(self):
+        return self.count - len(self.errors)
+
+    @property
+    def invalid(self):
+        return len(self.errors)
+
+    def add(self, error=None):
+        index = self.count
+        if not index & 7:
+            self.bitmap.append(0)
+        if error is None:
+            self.bitmap[-1] |= 1 << (index & 7)
+        else:
+            self.errors[index] = error
+        self.count = index + 1
+
+
+class Validator:
+    """Validate instances against a schema that is compiled once.
+
+    All per-call state lives on the stack of `validate`, so a single
+    `Validator` can be built at startup and shared between threads.
+    """
+
+    __slots__ = ('schema', 'check',)
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.check = compile(schema)
+
+    def validate(self, instance):
+        self.check(instance)
+
+    def isValid(self, instance):
+        try:
+            self.check(instance)
+        except AssertionError:
+            return False
+        return True
+
+    def errors(self, instance, max_errors=None):
+        """Return every `ValidationError` of `instance`, in schema order.
+
+        Valid instances only pay for the compiled check; the schema is
+        walked again, collecting errors, only when that check fails.
+        """
+        try:
+            self.check(instance)
+        except AssertionError:
+            return collect(self.schema, instance, max_errors)
+        return []
+
+    def validateMany(self, instances):
+        check, results = self.check, Results()
+        add = results.add
+        for instance in instances:
+            try:
+                check(instance)
+            except AssertionError as e:
+                add(str(e))
+            else:
+                add()
+        return results
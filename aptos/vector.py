@@ -0,0 +1,154 @@
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from . import primitives
+
+# Arrays shorter than this are cheaper to check element by element than
+# to convert into a NumPy array first.
+THRESHOLD = 256
+
+
+def offending(mask, message, *args):
+    """Assert that no element of `mask` is set."""
+    if not mask.any():
+        return
+    indices = numpy.flatnonzero(mask)
+    shown = indices[:10].tolist()
+    raise AssertionError('%d elements at indices %r%s are %s' % (
+        len(indices), shown, '...' if len(indices) > len(shown) else '',
+        message % args))
+
+
+def vectorize(items):
+    """Build a check for a whole array whose elements match `items`.
+
+    Only homogeneous arrays of `Integer`, `Number` or `String` items
+    without `allOf`, `anyOf`, `oneOf` or `const` are supported; `None` is
+    returned for anything else or when NumPy is not installed.  The check
+    returns `False` when an array cannot be converted to a NumPy array of
+    the expected kind, in which case the caller falls back to validating
+    each element.
+    """
+    cls = items.__class__
+    if numpy is None or cls not in (
+            primitives.String, primitives.Integer, primitives.Number):
+        return None
+    if (items.allOf or items.anyOf or items.oneOf
+            or items.const is not None):
+        return None
+    if cls is primitives.String:
+        kinds, types, symbols = 'U', {str}, {str}
+    elif cls is primitives.Integer:
+        kinds, types, symbols = 'iu', {int}, {int, float}
+    else:
+        kinds, types, symbols = 'iuf', {int, float}, {int, float}
+    # Like canonical keys, `isin` compares integers and floats by value;
+    # members of other types can never match an element.
+    enum = [element for element in items.enum if type(element) in symbols]
+    checks = (
+        strings(items, enum) if cls is primitives.String
+        else numbers(items, enum))
+    text = cls is primitives.String
+
+    def validate(instance):
+        # `numpy.asarray` silently turns booleans into numbers, so the
+        # element types are checked before converting.
+        if not types.issuperset(map(type, instance)):
+            return False
+        # NumPy strips trailing NULs from strings, changing their values.
+        if text and any(value.endswith('\x00') for value in instance):
+            return False
+        values = numpy.asarray(instance)
+        if values.ndim != 1 or values.dtype.kind not in kinds:
+            return False
+        for check in checks:
+            check(values)
+        return True
+    return validate
+
+
+def members(enum):
+    def check(values):
+        offending(
+            ~numpy.isin(values, enum),
+            'not equal to one of the elements in this keyword\'s array value %r', enum)  # noqa: E501
+    return check
+
+
+def numbers(number, enum):
+    checks = []
+    if number.enum:
+        checks.append(members(enum))
+    if number.maximum is not None:
+        maximum = number.maximum
+        if number.exclusiveMaximum:
+            def check(values):
+                offending(
+                    values >= maximum,
+                    'not less than the value of this keyword %r', maximum)
+        else:
+            def check(values):
+                offending(
+                    values > maximum,
+                    'not less than, or equal to, the value of this keyword %r', maximum)  # noqa: E501
+        checks.append(check)
+    if number.minimum is not None:
+        minimum = number.minimum
+        if number.exclusiveMinimum:
+            def check(values):
+                offending(
+                    values <= minimum,
+                    'not greater than the value of this keyword %r', minimum)
+        else:
+            def check(values):
+                offending(
+                    values < minimum,
+                    'not greater than, or equal to, the value of this keyword %r', minimum)  # noqa: E501
+        checks.append(check)
+    if number.multipleOf:
+        multipleOf = number.multipleOf
+
+        def check(values):
+            if values.dtype.kind in 'iu' and isinstance(multipleOf, int):
+                mask = values % multipleOf != 0
+            else:
+                quotient = values / multipleOf
+                mask = quotient != numpy.floor(quotient)
+            offending(
+                mask, 'not a multiple of the value of this keyword %r',
+                multipleOf)
+        checks.append(check)
+    return checks
+
+
+def strings(string, enum):
+    checks = []
+    if string.enum:
+        checks.append(members(enum))
+    if string.maxLength or string.minLength:
+        maxLength, minLength = string.maxLength, string.minLength
+
+        def check(values):
+            lengths = numpy.char.str_len(values)
+            if maxLength:
+                offending(
+                    lengths > maxLength,
+                    'not less than, or equal to, the value of this keyword %r', maxLength)  # noqa: E501
+            if minLength:
+                offending(
+                    lengths < minLength,
+                    'not greater than, or equal to, the value of this keyword %r', minLength)  # noqa: E501
+        checks.append(check)
+    if string.pattern:
+        pattern, match = string.pattern, string.expression.match
+
+        def check(values):
+            offending(
+                numpy.fromiter(
+                    (match(value) is None for value in values.tolist()),
+                    bool, len(values)),
+                'not matched successfully by %r', pattern)
+        checks.append(check)
+    return checks
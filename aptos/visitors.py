@@ -1,6 +1,55 @@
 import re
 
-from . import primitives
+from urllib.parse import unquote
+
+from . import primitives, vector
+
+
+def multiple_of(instance, multipleOf):
+    if isinstance(instance, int) and isinstance(multipleOf, int):
+        return instance % multipleOf == 0
+    quotient = instance / multipleOf
+    return quotient == int(quotient)
+
+
+def typed(instance, types):
+    """Return whether `instance` is one of `types`.
+
+    A `bool` is only accepted where `bool` itself is one of `types`, not
+    as a number.
+    """
+    return isinstance(instance, types) and (
+        bool in types or not isinstance(instance, bool))
+
+
+def duplicate(instance):
+    """Return the index of the first element equal to an earlier one."""
+    seen = set()
+    add = seen.add
+    for index, element in enumerate(instance):
+        key = primitives.canonical(element)
+        if key in seen:
+            return index
+        add(key)
+    return None
+
+
+def matches(branches, instance, check, limit=1):
+    """Count, up to `limit`, the `branches` that `instance` passes.
+
+    Only the candidates for the type of `instance` are tried, and
+    `check(branch, instance)` raises `AssertionError` on a mismatch.
+    """
+    count = 0
+    for branch in branches.candidates(instance):
+        try:
+            check(branch, instance)
+        except AssertionError:
+            continue
+        count += 1
+        if count == limit:
+            break
+    return count
 
 
 class Visitor:
@@ -9,32 +58,50 @@ class Visitor:
         if isinstance(primitive, primitives.Reference):
             return primitive
         primitive.allOf.accept(self, *args)
+        if primitive.anyOf:
+            primitive.anyOf.accept(self, *args)
+        if primitive.oneOf:
+            primitive.oneOf.accept(self, *args)
         primitive.definitions.accept(self, *args)
         return primitive
 
     def visitDefinitions(self, definitions, *args):
         for name, member in definitions.items():
-            member = self.visitPrimitive(member, *args)
             definitions[name] = member.accept(self, *args)
 
     def visitProperties(self, properties, *args):
         for name, member in properties.items():
-            member = self.visitPrimitive(member, *args)
             properties[name] = member.accept(self, *args)
 
     def visitAllOf(self, allOf, *args):
         for i, item in enumerate(allOf):
-            item = self.visitPrimitive(item, *args)
             allOf[i] = item.accept(self, *args)
 
+    def visitAnyOf(self, anyOf, *args):
+        for i, item in enumerate(anyOf):
+            anyOf[i] = item.accept(self, *args)
+
+    def visitOneOf(self, oneOf, *args):
+        for i, item in enumerate(oneOf):
+            oneOf[i] = item.accept(self, *args)
+
     def visitUnion(self, union, *args):
+        for i, item in enumerate(union.type):
+            union.type[i] = item.accept(self, *args)
         return self.visitPrimitive(union, *args)
 
     def visitArray(self, array, *args):
         array = self.visitPrimitive(array, *args)
-        array.items = array.items.accept(self, *args)
+        if isinstance(array.items, primitives.Component):
+            array.items = array.items.accept(self, *args)
+        elif array.items is not None:
+            array.items = list(
+                item.accept(self, *args) for item in array.items)
         return array
 
+    def visitBoolean(self, boolean, *args):
+        return self.visitPrimitive(boolean, *args)
+
     def visitInt(self, integer, *args):
         return self.visitPrimitive(integer, *args)
 
@@ -47,28 +114,92 @@ class Visitor:
     def visitEnum(self, enumeration, *args):
         return self.visitPrimitive(enumeration, *args)
 
+    def visitNull(self, null, *args):
+        return self.visitPrimitive(null, *args)
+
     def visitDeclared(self, declared, *args):
         declared = self.visitPrimitive(declared, *args)
         declared.properties.accept(self, *args)
+        if declared.patternProperties:
+            declared.patternProperties.accept(self, *args)
         return declared
 
+    def visitPatternProperties(self, patternProperties, *args):
+        return self.visitProperties(patternProperties, *args)
+
+    def visitUnknown(self, unknown, *args):
+        return unknown
+
+
+def avro(schema):
+    """Reduce a `{'type': name}` schema to the bare type name."""
+    if len(schema) == 1:
+        return schema['type']
+    return schema
+
+
+# Avro names and enum symbols.
+NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
 
 class RecordVisitor(Visitor):
+    """Describe a `Primitive` tree as an Avro schema.
+
+    Records and enums without a `title` are named after the property
+    holding them, or `Record` and `Enum` at the root;
+    names are made valid and unique by replacing invalid characters and
+    numbering repeats.  A node reached again, such as a definition with
+    several references, refers back to its first definition by name.
+    Use one visitor per schema.
+    """
+
+    def __init__(self):
+        # The names given to records and enums, and the names taken.
+        self.names = {}
+        self.taken = set()
+
+    def name(self, primitive, default, hint=''):
+        title = primitive.title or (camel(hint) if hint else default)
+        name = re.sub(r'[^A-Za-z0-9_]', '_', title)
+        if name[0].isdigit():
+            name = '_' + name
+        unique, count = name, 1
+        while unique in self.taken:
+            count += 1
+            unique = '%s%d' % (name, count)
+        self.taken.add(unique)
+        self.names[primitive] = unique
+        return unique
 
     def visitEnum(self, enumeration, *args):
+        if enumeration in self.names:
+            return {'type': self.names[enumeration]}
+        symbols = list(enumeration.enum)
+        if not symbols and enumeration.const is not None:
+            symbols = [enumeration.const]
+        if not symbols:
+            branches = list(enumeration.anyOf or enumeration.oneOf)
+            if not branches:
+                raise ValueError('%r has no Avro representation' % (
+                    enumeration))
+            return {'type': list(
+                avro(branch.accept(self, *args)) for branch in branches)}
+        for symbol in symbols:
+            if not isinstance(symbol, str) or not NAME.match(symbol):
+                raise ValueError('%r is not a valid Avro enum symbol' % (
+                    symbol,))
         return {
-            'type': 'enum', 'name': enumeration.title,
-            'doc': enumeration.description, 'symbols': enumeration.enum}
+            'type': 'enum', 'name': self.name(enumeration, 'Enum', *args),
+            'doc': enumeration.description, 'symbols': symbols}
 
     def visitUnion(self, union, *args):
         return {'type': list(
-            identifier.accept(self)['type'] for identifier in union.type)}
+            avro(identifier.accept(self, *args))
+            for identifier in union.type)}
 
     def visitArray(self, array, *args):
-        items = array.items.accept(self)
-        if 'fields' not in items:
-            items = items['type']
-        return {'type': 'array', 'items': items}
+        return {
+            'type': 'array', 'items': avro(array.items.accept(self, *args))}
 
     def visitBoolean(self, boolean, *args):
         return {'type': 'boolean'}
@@ -86,35 +217,389 @@ class RecordVisitor(Visitor):
         return {'type': 'null'}
 
     def visitDeclared(self, declared, *args):
+        if declared in self.names:
+            return {'type': self.names[declared]}
+        # Named before its fields, so that recursive references find it.
+        name = self.name(declared, 'Record', *args)
         fields = []
-        for name, member in declared.properties.items():
-            field = member.accept(self)
-            if isinstance(member, (primitives.Record, primitives.Array)):
-                field = {'type': field}
-            field.update({'name': name, 'doc': member.description})
+        for member_name, member in declared.properties.items():
+            field = {
+                'type': avro(member.accept(self, member_name)),
+                'name': member_name, 'doc': member.description}
+            if member_name not in declared.required:
+                # Avro has no optional fields: absent values are null.
+                field['type'] = ['null'] + [
+                    branch for branch in (
+                        field['type'] if isinstance(field['type'], list)
+                        else [field['type']])
+                    if branch != 'null']
+                field['default'] = None
             fields.append(field)
         for item in declared.allOf:
-            # Index `fields` if `item` is of type `Record`.
-            fields.extend(
-                item.accept(self).get('fields', [item.accept(self, *args)]))
+            schema = item.accept(self, name)
+            if 'fields' in schema:
+                # Records in `allOf` are merged in, not defined.
+                self.taken.discard(self.names.pop(item))
+                fields.extend(schema['fields'])
+            else:
+                fields.append(schema)
         return {
-            'type': 'record', 'namespace': __name__, 'name': declared.title,
+            'type': 'record', 'namespace': __name__, 'name': name,
             'doc': declared.description, 'fields': fields}
 
-    def visitString(self, string):
+    def visitString(self, string, *args):
         return {'type': 'string'}
 
+    def visitUnknown(self, unknown, *args):
+        # A recursive reference refers back to its record by name.
+        return {'type': self.names[unknown.target]}
+
+
+def identifier(name):
+    """Turn a property name into a valid IDL identifier."""
+    name = re.sub(r'\W', '_', name)
+    return name if name and not name[0].isdigit() else '_' + name
+
+
+def camel(name):
+    """Turn a property name into a CamelCase type name."""
+    return ''.join(
+        part[:1].upper() + part[1:]
+        for part in re.split(r'[\W_]+', name)) or 'Message'
+
+
+def numbers(declared, names, keyword, limit):
+    """Return the numbers of the properties `names` of `declared`.
+
+    The `keyword` extension of a record, or of the records in its
+    `allOf`, maps property names to the numbers they keep.  The other
+    properties take the lowest free numbers from 1 in declaration order,
+    so their numbers only stay stable as long as new properties are
+    appended.  Pinned names that are not properties keep their numbers
+    reserved.
+    """
+    pinned = {}
+    for item in tuple(declared.allOf) + (declared,):
+        pinned.update(getattr(item, 'extensions', {}).get(keyword) or {})
+    taken = set()
+    for name, number in pinned.items():
+        if number.__class__ is not int or not 0 < number < limit or (
+                number in taken):
+            raise ValueError('%r is not a valid %s number for %r' % (
+                number, keyword, name))
+        taken.add(number)
+    result, number = [], 1
+    for name in names:
+        if name in pinned:
+            result.append(pinned[name])
+            continue
+        while number in taken:
+            number += 1
+        if number >= limit:
+            raise ValueError('%r has too many properties' % declared)
+        taken.add(number)
+        result.append(number)
+    return result
+
+
+class ProtobufVisitor(Visitor):
+    """Describe a `Record` tree as proto3 message definitions.
+
+    A record becomes a `message` and its properties fields numbered by
+    `numbers`, from its `x-protobuf-fields` extension or in declaration
+    order, below `ONEOF`.  Properties of type `null` are left out but
+    keep their number.  Nested records and enums are inlined in the
+    field that uses them, named after their title or property, and
+    unions of several types become a `oneof`.  The branches of a `oneof`
+    are numbered in a block of 16 numbers from `ONEOF` picked by the
+    number of their property: scalars have a fixed offset for their type
+    and messages and enums follow in declaration order, so adding a
+    branch renumbers neither other fields nor scalar branches.
+    """
+
+    ONEOF = 1000
+
+    # The offsets of scalar branches in the block of their `oneof`.
+    OFFSETS = {'bool': 0, 'int64': 1, 'double': 2, 'string': 3}
+
+    def visitEnum(self, enumeration, *args):
+        if not enumeration.enum:
+            raise ValueError(
+                '%r has no protobuf representation' % enumeration)
+        return {
+            'type': 'enum', 'name': enumeration.title,
+            'symbols': list(enumeration.enum)}
+
+    def visitUnion(self, union, *args):
+        branches = [
+            branch for branch in (
+                identifier.accept(self) for identifier in union.type)
+            if branch['type'] != 'null']
+        if not branches:
+            return {'type': 'null'}
+        if len(branches) == 1:
+            return branches[0]
+        return {'type': 'oneof', 'branches': branches}
+
+    def visitArray(self, array, *args):
+        if not isinstance(array.items, primitives.Component):
+            raise ValueError('only arrays with one `items` schema have a protobuf representation')  # noqa: E501
+        items = array.items.accept(self)
+        if items['type'] in ('repeated', 'oneof', 'null'):
+            raise ValueError(
+                'arrays of %s have no protobuf representation' % (
+                    items['type']))
+        return {'type': 'repeated', 'items': items}
+
+    def visitBoolean(self, boolean, *args):
+        return {'type': 'bool'}
+
+    def visitInt(self, integer, *args):
+        return {'type': 'int64'}
+
+    def visitLong(self, long, *args):
+        return {'type': 'double'}
+
+    def visitNull(self, null, *args):
+        return {'type': 'null'}
+
+    def visitString(self, string, *args):
+        return {'type': 'string'}
+
+    def visitDeclared(self, declared, *args):
+        members = list(declared.properties.items())
+        for item in declared.allOf:
+            # The properties of records in `allOf` are merged in.
+            members.extend((getattr(item, 'properties', None) or {}).items())
+        fields = []
+        slots = numbers(declared, (name for name, _ in members),
+                        'x-protobuf-fields', self.ONEOF)
+        for (name, member), number in zip(members, slots):
+            member = member.accept(self)
+            if member['type'] == 'null':
+                continue
+            if member['type'] != 'oneof':
+                fields.append(self.field(name, name, member, number))
+                continue
+            branches, block = [], self.ONEOF + 16 * (number - 1)
+            offset = len(self.OFFSETS)
+            for index, branch in enumerate(member['branches']):
+                if branch['type'] == 'repeated':
+                    raise ValueError(
+                        'the union %r has no protobuf representation' % name)
+                kind = branch.get('name') or branch['type']
+                if kind in ('message', 'enum'):
+                    kind = str(index)
+                if branch['type'] in self.OFFSETS:
+                    number = block + self.OFFSETS[branch['type']]
+                elif offset < 16:
+                    number, offset = block + offset, offset + 1
+                else:
+                    raise ValueError(
+                        'the union %r has too many branches' % name)
+                branches.append(self.field(
+                    '%s_%s' % (name, kind), name, branch, number))
+            fields.append({
+                'type': 'oneof', 'name': identifier(name), 'json': name,
+                'fields': branches})
+        return {'type': 'message', 'name': declared.title, 'fields': fields}
+
+    def visitUnknown(self, unknown, *args):
+        # A recursive reference refers back to its message by name.
+        if not unknown.target.title:
+            raise ValueError('recursive reference %r needs a title' % (
+                unknown.value))
+        return {'type': unknown.target.title}
+
+    @staticmethod
+    def field(name, json, member, number):
+        field = {'name': identifier(name), 'json': json, 'number': number}
+        if member['type'] == 'repeated':
+            field['label'] = 'repeated'
+            member = member['items']
+        if member['type'] in ('message', 'enum'):
+            if not member['name']:
+                member['name'] = camel(name)
+        else:
+            member = member['type']
+        field['type'] = member
+        return field
+
+
+class ThriftVisitor(Visitor):
+    """Describe a `Record` tree as Thrift definitions.
+
+    A record becomes a `struct` whose fields have IDs given by `numbers`,
+    from its `x-thrift-fields` extension or in declaration order, an enum
+    an `enum`, an array a `list` and a union of several types a `union`.
+    Properties of type `null` are left out but keep their ID.
+    Definitions are inlined where they are used and named after their
+    title or property; scalars and recursive references are plain type
+    names.
+    """
+
+    def visitEnum(self, enumeration, *args):
+        if not enumeration.enum:
+            raise ValueError('%r has no Thrift representation' % enumeration)
+        return {
+            'type': 'enum', 'name': enumeration.title,
+            'symbols': list(enumeration.enum)}
+
+    def visitUnion(self, union, *args):
+        branches = [
+            branch for branch in (
+                identifier.accept(self) for identifier in union.type)
+            if branch != 'null']
+        if not branches:
+            return 'null'
+        if len(branches) == 1:
+            return branches[0]
+        fields = []
+        for id, branch in enumerate(branches, 1):
+            name = '%sValue' % (
+                branch if isinstance(branch, str) else branch['type'])
+            if any(field['name'] == name for field in fields):
+                name = '%s%d' % (name, id)
+            fields.append({
+                'id': id, 'name': name, 'json': name, 'type': branch,
+                'required': False})
+        return {'type': 'union', 'name': '', 'fields': fields}
+
+    def visitArray(self, array, *args):
+        if not isinstance(array.items, primitives.Component):
+            raise ValueError('only arrays with one `items` schema have a Thrift representation')  # noqa: E501
+        items = array.items.accept(self)
+        if items == 'null':
+            raise ValueError('arrays of null have no Thrift representation')
+        return {'type': 'list', 'items': items}
+
+    def visitBoolean(self, boolean, *args):
+        return 'bool'
+
+    def visitInt(self, integer, *args):
+        return 'i64'
+
+    def visitLong(self, long, *args):
+        return 'double'
+
+    def visitNull(self, null, *args):
+        return 'null'
+
+    def visitString(self, string, *args):
+        return 'string'
+
+    def visitDeclared(self, declared, *args):
+        members = list(declared.properties.items())
+        for item in declared.allOf:
+            # The properties of records in `allOf` are merged in.
+            members.extend((getattr(item, 'properties', None) or {}).items())
+        fields = []
+        ids = numbers(declared, (name for name, _ in members),
+                      'x-thrift-fields', 1 << 15)
+        for (name, member), id in zip(members, ids):
+            kind = member.accept(self)
+            if kind == 'null':
+                continue
+            self.name(kind, name)
+            fields.append({
+                'id': id, 'name': identifier(name), 'json': name,
+                'type': kind, 'required': name in declared.required})
+        return {'type': 'struct', 'name': declared.title, 'fields': fields}
+
+    def visitUnknown(self, unknown, *args):
+        # A recursive reference refers back to its struct by name.
+        if not unknown.target.title:
+            raise ValueError('recursive reference %r needs a title' % (
+                unknown.value))
+        return unknown.target.title
+
+    def name(self, kind, name):
+        """Name the inlined definitions of the property `name`."""
+        if isinstance(kind, str):
+            return
+        if kind['type'] == 'list':
+            self.name(kind['items'], name)
+            return
+        if not kind['name']:
+            kind['name'] = camel(name)
+        if kind['type'] == 'union':
+            for field in kind['fields']:
+                self.name(field['type'], '%s_%s' % (name, field['name']))
+
+
+def escape(token):
+    return token.replace('~', '~0').replace('/', '~1')
+
 
 class TypeVisitor(Visitor):
+    """Replace every `Reference` with the node its JSON pointer targets.
+
+    Each JSON pointer is looked up in the document once, by way of its
+    already indexed parent, and resolved to a single node shared by every
+    reference to it.  The `definitions` of a resolved node are resolved
+    first, under their own pointers, so that references to them share
+    the members of `definitions` too.  A reference reached while its
+    own target is still being resolved belongs to a recursive schema: it
+    is kept as a lazy back-edge whose `target` is set once resolution of
+    that node finishes.
+    """
 
     def __init__(self, context):
         self.context = context
+        self.pointers = {'': context}
+        self.nodes = {}
+        self.pending = {}
+        # Nodes already resolved under a pointer, and not to be revisited.
+        self.resolved = set()
+
+    def lookup(self, pointer):
+        value = self.pointers.get(pointer)
+        if value is not None:
+            return value
+        parent, _, token = pointer.rpartition('/')
+        if not pointer.startswith('/'):
+            raise ValueError('unresolvable JSON pointer %r' % pointer)
+        container = self.lookup(parent)
+        token = token.replace('~1', '/').replace('~0', '~')
+        try:
+            value = container[
+                int(token) if isinstance(container, list) else token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise ValueError('unresolvable JSON pointer %r' % pointer)
+        self.pointers[pointer] = value
+        return value
+
+    def resolve(self, pointer, primitive=None):
+        node = self.nodes.get(pointer)
+        if node is not None:
+            return node
+        if primitive is None:
+            instance = self.lookup(pointer)
+            primitive = primitives.Creator.create(
+                instance.get('type')).fromJson(instance)
+        self.pending[pointer] = []
+        definitions = getattr(primitive, 'definitions', None) or {}
+        for name, member in definitions.items():
+            definitions[name] = self.resolve(
+                '%s/definitions/%s' % (pointer, escape(name)), member)
+        node = primitive.accept(self)
+        self.nodes[pointer] = node
+        self.resolved.add(node)
+        for reference in self.pending.pop(pointer):
+            reference.target = node
+        return node
+
+    def visitDefinitions(self, definitions, *args):
+        for name, member in definitions.items():
+            if member not in self.resolved:
+                definitions[name] = member.accept(self, *args)
 
     def visitUnknown(self, unknown, *args):
-        value = unknown.value.split('/')[-1]
-        instance = self.context['definitions'][value]
-        return primitives.Creator.create(
-            instance.get('type')).fromJson(instance)
+        pointer = unquote(unknown.fragment).rstrip('/')
+        if pointer in self.pending:
+            self.pending[pointer].append(unknown)
+            return unknown
+        return self.resolve(pointer)
 
 
 class ValidationVisitor(Visitor):
@@ -124,41 +609,55 @@ class ValidationVisitor(Visitor):
 
     def visitPrimitive(self, primitive, *args):
         instance = self.instance
-        for element in primitive.enum:
-            assert instance in primitive.enum, '%r not equal to one of the elements in this keyword\'s array value %r' % (instance, primitive.enum)  # noqa: E501
+        if primitive.enum:
+            assert primitives.canonical(instance) in primitive.enumKeys, '%r not equal to one of the elements in this keyword\'s array value %r' % (instance, primitive.enum)  # noqa: E501
+        if primitive.const is not None:
+            assert primitives.canonical(instance) == primitive.constKey, '%r not equal to the value of this keyword %r' % (instance, primitive.const)  # noqa: E501
         primitive.allOf.accept(self, *args)
+        if primitive.anyOf:
+            assert matches(primitive.anyOf, instance, self.trial), '%r is not valid against any of the schemas of this keyword' % instance  # noqa: E501
+        if primitive.oneOf:
+            count = matches(primitive.oneOf, instance, self.trial, 2)
+            assert count == 1, '%r is valid against %s of the schemas of this keyword, not exactly one' % (instance, 'more than one' if count else 'none')  # noqa: E501
         return primitive
 
+    @staticmethod
+    def trial(branch, instance):
+        branch.accept(ValidationVisitor(instance))
+
     def visitEnum(self, enumeration, *args):
-        instance = self.instance
-        enumeration = self.visitPrimitive(enumeration, *args)
-        if enumeration.enum:
-            assert instance in enumeration.enum, (
-                '%r not equal to one of the elements in this keyword\'s array value %r' % (instance, enumeration.enum))  # noqa: E501
+        self.visitPrimitive(enumeration, *args)
 
     def visitArray(self, array, *args):
         instance = self.instance
+        self.expect(list, tuple)
         array = self.visitPrimitive(array, *args)
         if isinstance(array.items, primitives.Component):
-            for element in instance:
-                array.items.accept(ValidationVisitor(element))
-        else:
-            for i, element in enumerate(instance):
-                array.items[i].accept(ValidationVisitor(element))
-        if not array.additionalItems and isinstance(
-                array.items, primitives.Array):
-            assert len(instance) <= array.items
+            check = (
+                vector.vectorize(array.items)
+                if len(instance) >= vector.THRESHOLD else None)
+            if check is None or not check(instance):
+                for element in instance:
+                    array.items.accept(ValidationVisitor(element))
+        elif array.items is not None:
+            for item, element in zip(array.items, instance):
+                item.accept(ValidationVisitor(element))
+            if array.additionalItems is False:
+                assert len(instance) <= len(array.items), (
+                    '%r is not less than, or equal to, the number of items %r' % (len(instance), len(array.items)))  # noqa: E501
         if array.maxItems:
             assert len(instance) <= array.maxItems, (
                 '%r is not less than, or equal to, the value of this keyword %r' % (len(instance), array.maxItems))  # noqa: E501
         assert len(instance) >= array.minItems, (
             '%r is not greater than, or equal to, the value of this keyword %r' % (len(instance), array.minItems))  # noqa: E501
         if array.uniqueItems:
-            assert len(list(set(instance))) == len(instance), (
-                '%r elements are not unique %r' % (instance, array.uniqueItems))  # noqa: E501
+            index = duplicate(instance)
+            assert index is None, (
+                'elements are not unique, %r at index %d equals an earlier element' % (instance[index], index))  # noqa: E501
 
     def visitString(self, string, *args):
         instance = self.instance
+        self.expect(str)
         string = self.visitPrimitive(string, *args)
         if string.maxLength:
             assert len(instance) <= string.maxLength, (
@@ -166,33 +665,68 @@ class ValidationVisitor(Visitor):
         assert len(instance) >= string.minLength, (
             '%r is not greater than, or equal to, the value of this keyword %r' % (len(instance), string.minLength))  # noqa: E501
         if string.pattern:
-            assert re.match(string.pattern, instance) is not None, (
+            assert string.expression.match(instance) is not None, (
                 '%r does not match the instance successfully %r' % (string.pattern, instance))  # noqa: E501
 
+    def expect(self, *types):
+        instance = self.instance
+        assert typed(instance, types), '%r is not of type %r' % (
+            instance, tuple(cls.__name__ for cls in types))
+
     def visitInt(self, integer, *args):
-        # TODO: write `visitInt` functionality.
-        pass
+        self.expect(int)
+        self.visitNumber(integer, *args)
 
     def visitLong(self, long, *args):
-        # TODO: write `visitLong` functionality.
-        pass
+        self.expect(int, float)
+        self.visitNumber(long, *args)
+
+    def visitNumber(self, number, *args):
+        instance = self.instance
+        number = self.visitPrimitive(number, *args)
+        if number.maximum is not None:
+            if number.exclusiveMaximum:
+                assert instance < number.maximum, (
+                    '%r is not less than the value of this keyword %r' % (instance, number.maximum))  # noqa: E501
+            else:
+                assert instance <= number.maximum, (
+                    '%r is not less than, or equal to, the value of this keyword %r' % (instance, number.maximum))  # noqa: E501
+        if number.minimum is not None:
+            if number.exclusiveMinimum:
+                assert instance > number.minimum, (
+                    '%r is not greater than the value of this keyword %r' % (instance, number.minimum))  # noqa: E501
+            else:
+                assert instance >= number.minimum, (
+                    '%r is not greater than, or equal to, the value of this keyword %r' % (instance, number.minimum))  # noqa: E501
+        if number.multipleOf:
+            assert multiple_of(instance, number.multipleOf), (
+                '%r is not a multiple of the value of this keyword %r' % (instance, number.multipleOf))  # noqa: E501
 
     def visitAllOf(self, allOf, *args):
         for item in allOf:
             item.accept(self, *args)
 
+    def visitBoolean(self, boolean, *args):
+        self.expect(bool)
+        self.visitPrimitive(boolean, *args)
+
     def visitNull(self, null, *args):
+        self.expect(type(None))
         self.visitPrimitive(null, *args)
 
+    def visitUnknown(self, unknown, *args):
+        unknown.target.accept(self, *args)
+
     def visitUnion(self, union, *args):
-        union = self.visitPrimitive(union, *args)
-        instance = args[0]
-        cls = primitives.Translator.translate(instance)
-        index = [type.__class__ for type in union.type].index(cls)
-        union.type[index].accept(self, *args)
+        instance = self.instance
+        assert matches(union.type, instance, self.trial), (
+            '%r does not match any of the types %r' % (
+                instance, tuple(sorted(union.kinds))))
+        self.visitPrimitive(union, *args)
 
     def visitDeclared(self, declared, *args):
         instance = self.instance
+        self.expect(dict)
         declared = self.visitPrimitive(declared, *args)
         if declared.maxProperties:
             assert len(instance.keys()) <= declared.maxProperties, (
@@ -202,9 +736,21 @@ class ValidationVisitor(Visitor):
         for item in declared.required:
             assert item in instance, '%r is not the name of a property in the instance %r' % (declared.required, item)  # noqa: E501
         declared.properties.accept(self)
+        if declared.patternProperties:
+            declared.patternProperties.accept(self)
 
     def visitProperties(self, properties, *args):
         for name, member in self.instance.items():
             if properties.get(name) is None:
                 continue
             properties[name].accept(ValidationVisitor(member))
+
+    def visitPatternProperties(self, patternProperties, *args):
+        expression = patternProperties.expression
+        for name, member in self.instance.items():
+            if expression is not None and expression.search(name) is None:
+                continue
+            for pattern, compiled in patternProperties.expressions:
+                if compiled.search(name) is not None:
+                    patternProperties[pattern].accept(
+                        ValidationVisitor(member))
@@ -0,0 +1,72 @@
+"""Compare Avro encoding throughput and size with the json module.
+
+    python benchmarks/avro.py --count 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.avro import Codec  # noqa: E402
+from aptos.models import OpenAPI, TypeVisitor  # noqa: E402
+from aptos.util import Parser  # noqa: E402
+
+SCHEMAS = os.path.join(
+    os.path.dirname(__file__), os.pardir, 'tests', 'schemas')
+
+
+def product():
+    record = Parser.parse(os.path.join(SCHEMAS, 'product'))
+    instance = {
+        'id': 2,
+        'name': 'An ice sculpture',
+        'price': 12.50,
+        'tags': ['cold', 'ice'],
+        'dimensions': {'length': 7.0, 'width': 12.0, 'height': 9.5},
+        'warehouseLocation': {'latitude': -78.75, 'longitude': 20.4},
+    }
+    return record, instance
+
+
+def petstore():
+    with open(os.path.join(SCHEMAS, 'petstore')) as fp:
+        instance = json.load(fp)
+    specification = OpenAPI.fromJson(instance)
+    specification.accept(TypeVisitor(instance))
+    pet = specification.components['schemas']['Pet']
+    return pet, {'id': 1, 'name': 'Fluffy', 'tag': 'cat'}
+
+
+def measure(function, instances):
+    start = time.perf_counter()
+    for instance in instances:
+        function(instance)
+    return len(instances) / (time.perf_counter() - start)
+
+
+def compare(name, record, instance, count):
+    codec = Codec(record)
+    encoded, serialized = codec.encode(instance), json.dumps(instance)
+    print('%s: avro %d bytes, json %d bytes' % (
+        name, len(encoded), len(serialized)))
+    print('  encode: avro %.0f records/s, json %.0f records/s' % (
+        measure(codec.encode, [instance] * count),
+        measure(json.dumps, [instance] * count)))
+    print('  decode: avro %.0f records/s, json %.0f records/s' % (
+        measure(codec.decode, [encoded] * count),
+        measure(json.loads, [serialized] * count)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args(argv)
+    compare('product', *product(), count=args.count)
+    compare('petstore', *petstore(), count=args.count)
+
+
+if __name__ == '__main__':
+    main()
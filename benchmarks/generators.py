@@ -0,0 +1,154 @@
+"""Generate schemas, OpenAPI documents and instances for benchmarks.
+
+Every schema generator stresses one axis of a schema and returns the
+schema with an instance that is valid against it and one that is not.
+The invalid instance fails as late as possible, so that validating it
+walks as much of the schema as validating the valid one, and only
+breaks a constraint of its own type.
+"""
+import copy
+
+TYPES = (
+    ({'type': 'string', 'maxLength': 64}, 'value', 'x' * 65),
+    ({'type': 'integer', 'minimum': 0}, 7, -1),
+    ({'type': 'number', 'maximum': 100}, 2.5, 100.5),
+    ({'type': 'boolean', 'enum': [True]}, True, False),
+    ({'type': 'array', 'maxItems': 2, 'items': {'type': 'string'}},
+     ['a', 'b'], ['a', 'b', 'c']),
+)
+
+
+def deep(depth):
+    """An object nested `depth` levels deep."""
+    schema = {'type': 'string', 'maxLength': 8}
+    valid, invalid = 'leaf', 'x' * 9
+    for level in range(depth):
+        schema = {
+            'type': 'object', 'required': ['value'],
+            'properties': {'value': {'type': 'integer'}, 'child': schema}}
+        valid = {'value': level, 'child': valid}
+        invalid = {'value': level, 'child': invalid}
+    return schema, valid, invalid
+
+
+def wide(width):
+    """An object with `width` required properties of assorted types."""
+    properties, valid = {}, {}
+    for index in range(width):
+        schema, value, _ = TYPES[index % len(TYPES)]
+        name = 'field%d' % index
+        properties[name] = copy.deepcopy(schema)
+        valid[name] = value
+    invalid = dict(valid)
+    invalid[name] = TYPES[(width - 1) % len(TYPES)][2]
+    return ({'type': 'object', 'properties': properties,
+             'required': sorted(properties)}, valid, invalid)
+
+
+def enum(size):
+    """A string restricted to an enumeration of `size` symbols."""
+    symbols = ['symbol%d' % index for index in range(size)]
+    return ({'type': 'object', 'required': ['value'],
+             'properties': {'value': {'type': 'string', 'enum': symbols}}},
+            {'value': symbols[-1]}, {'value': 'symbol'})
+
+
+def refs(count):
+    """An object whose `count` properties refer to shared definitions."""
+    definitions = {'common': {
+        'type': 'object', 'required': ['id'],
+        'properties': {'id': {'type': 'integer', 'minimum': 1}}}}
+    properties, valid = {}, {}
+    for index in range(count):
+        definitions['item%d' % index] = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'},
+                'owner': {'$ref': '#/definitions/common'}}}
+        properties['item%d' % index] = {
+            '$ref': '#/definitions/item%d' % index}
+        valid['item%d' % index] = {'name': 'a', 'owner': {'id': index + 1}}
+    invalid = copy.deepcopy(valid)
+    invalid['item%d' % (count - 1)]['owner']['id'] = 0
+    return ({'type': 'object', 'definitions': definitions,
+             'properties': properties}, valid, invalid)
+
+
+def union(branches):
+    """A `oneOf` of `branches` objects tagged by a `kind` constant."""
+    variants = []
+    for index in range(branches):
+        schema, value, wrong = TYPES[index % len(TYPES)]
+        variants.append({
+            'type': 'object', 'required': ['kind', 'value'],
+            'properties': {
+                'kind': {'const': 'kind%d' % index},
+                'value': copy.deepcopy(schema)}})
+    kind = 'kind%d' % (branches - 1)
+    return ({'type': 'object', 'required': ['event'], 'properties': {
+        'event': {'oneOf': variants},
+        'scalar': {'type': ['integer', 'string', 'boolean', 'null']}}},
+        {'event': {'kind': kind, 'value': value}, 'scalar': 'a'},
+        {'event': {'kind': kind, 'value': wrong}, 'scalar': 'a'})
+
+
+def schema(depth, width):
+    """A component schema with nested children and a `$ref` at the end."""
+    if not depth:
+        return {'$ref': '#/components/schemas/Error'}
+    properties = {
+        'field{}'.format(i): {'type': 'string', 'maxLength': 64}
+        for i in range(width)}
+    properties['count'] = {'type': 'integer', 'minimum': 0}
+    properties['tags'] = {'type': 'array', 'items': {'type': 'string'}}
+    properties['child'] = schema(depth - 1, width)
+    return {
+        'type': 'object', 'description': 'level {}'.format(depth),
+        'properties': properties, 'required': ['count']}
+
+
+def instance(depth, width, count=0):
+    """An instance of `schema(depth, width)` with `count` at the bottom."""
+    if not depth:
+        return {'code': 1, 'message': 'error'}
+    value = dict(('field{}'.format(i), 'value') for i in range(width))
+    value.update(count=count if depth == 1 else 0, tags=['a'],
+                 child=instance(depth - 1, width, count))
+    return value
+
+
+def specification(schemas, depth, width):
+    """An OpenAPI document with one path per component schema."""
+    components = {
+        'Schema{}'.format(i): schema(depth, width) for i in range(schemas)}
+    components['Error'] = {
+        'type': 'object', 'required': ['code', 'message'],
+        'properties': {
+            'code': {'type': 'integer'}, 'message': {'type': 'string'}}}
+    paths = {
+        '/resources{}/{{id}}'.format(i): {
+            'get': {
+                'operationId': 'getResource{}'.format(i),
+                'responses': {
+                    '200': {
+                        'description': 'A resource',
+                        'content': {
+                            'application/json': {
+                                'schema': {
+                                    '$ref': '#/components/schemas/Schema{}'.format(i)},  # noqa: E501
+                            },
+                        },
+                    },
+                },
+            },
+        }
+        for i in range(schemas)}
+    return {
+        'openapi': '3.0.0', 'info': {'title': 'Generated', 'version': '1'},
+        'paths': paths, 'components': {'schemas': components}}
+
+
+def openapi(paths, depth=4, width=8):
+    """An OpenAPI document with `paths` paths, and instances of one."""
+    return (specification(paths, depth, width), instance(depth, width),
+            instance(depth, width, -1))
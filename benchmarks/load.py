@@ -0,0 +1,51 @@
+"""Time and measure peak memory of loading large generated OpenAPI specs.
+
+    python benchmarks/load.py --schemas 2000 --depth 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.models import OpenAPI, TypeVisitor  # noqa: E402
+from generators import specification  # noqa: E402
+
+
+def load(instance, lazy=False):
+    if lazy:
+        return OpenAPI.fromJson(instance, lazy=True)
+    specification = OpenAPI.fromJson(instance)
+    specification.accept(TypeVisitor(instance))
+    return specification
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--schemas', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--width', type=int, default=8)
+    parser.add_argument(
+        '--lazy', action='store_true',
+        help='only materialise paths and schemas on first access')
+    args = parser.parse_args(argv)
+    instance = specification(args.schemas, args.depth, args.width)
+    size = len(json.dumps(instance))
+    start = time.perf_counter()
+    load(instance, args.lazy)
+    elapsed = time.perf_counter() - start
+    # Tracing slows allocation down considerably, so memory is measured
+    # on a second, untimed load.
+    tracemalloc.start()
+    load(instance, args.lazy)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('%.2f MB spec loaded in %.3fs, peak memory %.2f MB' % (
+        size / 1e6, elapsed, peak / 1e6))
+
+
+if __name__ == '__main__':
+    main()
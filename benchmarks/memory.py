@@ -0,0 +1,44 @@
+"""Measure the resident size of the schema trees of a large generated spec.
+
+    python benchmarks/memory.py --schemas 2000 --depth 4
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos import primitives  # noqa: E402
+from generators import specification  # noqa: E402
+from load import load  # noqa: E402
+
+
+def count():
+    return sum(
+        1 for value in gc.get_objects()
+        if isinstance(value, primitives.Primitive))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--schemas', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--width', type=int, default=8)
+    args = parser.parse_args(argv)
+    instance = specification(args.schemas, args.depth, args.width)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    loaded = load(instance)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    nodes = count()
+    del loaded
+    print('%d primitives retain %.2f MB (%.0f bytes per primitive)' % (
+        nodes, size / 1e6, size / nodes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""Time parsing, resolution and validation of generated schemas.
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json
+
+Each case generates a schema stressing one axis (deep nesting, wide
+objects, large enums, many `$ref`s, big unions, OpenAPI documents with
+many paths) and times every stage on it.  Results are the best time per
+call, in seconds, of several rounds.  With `--baseline`, they are
+compared with a stored run, and the exit status is 1 if any stage got
+slower by more than `--tolerance`.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import generators  # noqa: E402
+from aptos import __version__  # noqa: E402
+from aptos.models import OpenAPI, TypeVisitor  # noqa: E402
+from aptos.primitives import Record  # noqa: E402
+from aptos.util import Parser  # noqa: E402
+from aptos.validator import Validator  # noqa: E402
+from aptos.visitors import RecordVisitor, ValidationVisitor  # noqa: E402
+from aptos.visitors import TypeVisitor as SchemaTypeVisitor  # noqa: E402
+
+# Generators of each case and their size at `--scale 1`.
+CASES = (
+    ('deep', generators.deep, 50),
+    ('wide', generators.wide, 200),
+    ('enum', generators.enum, 1000),
+    ('refs', generators.refs, 200),
+    ('union', generators.union, 40),
+    ('openapi', generators.openapi, 500),
+)
+
+
+def timed(function, arguments):
+    # Like `timeit`, keep the collector from running within a round.
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for argument in arguments:
+            function(argument)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def measure(function, setup=None, rounds=5, target=0.05):
+    """Return the best time per call of `function(setup())`.
+
+    Arguments are built by `setup` before each round, outside of the
+    timed loop, and the number of calls per round grows until a round
+    takes at least `target` seconds.
+    """
+    setup = setup or (lambda: None)
+    number = 1
+    while True:
+        elapsed = timed(function, [setup() for _ in range(number)])
+        if elapsed >= target or number >= 1 << 20:
+            break
+        number *= 2 if elapsed * 10 > target else 10
+    best = elapsed / number
+    for _ in range(rounds - 1):
+        elapsed = timed(function, [setup() for _ in range(number)])
+        best = min(best, elapsed / number)
+    return best
+
+
+def passing(check, instance):
+    check(instance)
+    return lambda _: check(instance)
+
+
+def failing(check, instance):
+    def function(_):
+        try:
+            check(instance)
+        except AssertionError:
+            return
+        raise RuntimeError('%r is unexpectedly valid' % (instance,))
+    function(None)
+    return function
+
+
+def stages(name, document, valid, invalid):
+    """Yield the name and time of every stage of one case."""
+    if name == 'openapi':
+        yield 'fromJson', measure(lambda _: OpenAPI.fromJson(document))
+
+        def resolve(specification):
+            specification.accept(TypeVisitor(document))
+        yield 'resolve', measure(
+            resolve, lambda: OpenAPI.fromJson(document))
+        specification = OpenAPI.fromJson(document)
+        specification.accept(TypeVisitor(document))
+        record = specification.components['schemas']['Schema0']
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, name)
+            with open(filename, 'w') as fp:
+                json.dump(document, fp)
+
+            def parse(_):
+                # Clearing the cache is cheap next to parsing.
+                Parser.cache.clear()
+                Parser.parse(filename)
+            yield 'parse', measure(parse)
+        yield 'fromJson', measure(lambda _: Record.fromJson(document))
+        yield 'resolve', measure(
+            lambda record: SchemaTypeVisitor(document).resolve('', record),
+            lambda: Record.fromJson(document))
+        record = SchemaTypeVisitor(document).resolve(
+            '', Record.fromJson(document))
+
+    def visit(instance):
+        record.accept(ValidationVisitor(instance))
+    yield 'visit-valid', measure(passing(visit, valid))
+    yield 'visit-invalid', measure(failing(visit, invalid))
+    yield 'compile', measure(lambda _: Validator(record))
+    check = Validator(record).validate
+    yield 'compiled-valid', measure(passing(check, valid))
+    yield 'compiled-invalid', measure(failing(check, invalid))
+    yield 'record', measure(lambda _: record.accept(RecordVisitor()))
+
+
+def run(scale=1.0, only=None):
+    results = {}
+    for name, generate, size in CASES:
+        if only and name not in only:
+            continue
+        document, valid, invalid = generate(max(1, int(size * scale)))
+        for stage, seconds in stages(name, document, valid, invalid):
+            results['%s/%s' % (name, stage)] = seconds
+            print('%-24s %12.3f us' % (
+                '%s/%s' % (name, stage), seconds * 1e6), file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each stage against `baseline` and return the regressions."""
+    regressions = []
+    for key in sorted(set(results) & set(baseline)):
+        ratio = results[key] / baseline[key]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(key)
+        print('%-24s %12.3f us %12.3f us %6.2fx%s' % (
+            key, baseline[key] * 1e6, results[key] * 1e6, ratio,
+            '  slower' if regressed else ''))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='multiply the size of every generated schema by SCALE')
+    parser.add_argument(
+        '--case', action='append', choices=[name for name, _, _ in CASES],
+        help='only run CASE; may be repeated')
+    parser.add_argument('--output', help='write the results to OUTPUT')
+    parser.add_argument('--baseline', help='compare with a stored run')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='fraction by which a stage may be slower than the baseline')
+    args = parser.parse_args(argv)
+    results = run(args.scale, args.case)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump({
+                'aptos': __version__,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'scale': args.scale,
+                'results': results,
+            }, fp, indent=2, sort_keys=True)
+            fp.write('\n')
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        if baseline.get('scale') != args.scale:
+            print('warning: the baseline was run at scale %r' % (
+                baseline.get('scale')), file=sys.stderr)
+        if compare(results, baseline['results'], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
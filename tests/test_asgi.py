@@ -0,0 +1,155 @@
+import asyncio
+import concurrent.futures
+import json
+import unittest
+
+from aptos.asgi import Middleware
+from aptos.models import OpenAPI, TypeVisitor
+
+SPECIFICATION = {
+    'openapi': '3.0.0',
+    'paths': {
+        '/pets/{petId}': {
+            'put': {
+                'requestBody': {'content': {'application/json': {
+                    'schema': {'$ref': '#/components/schemas/Pet'}}}},
+                'responses': {},
+            },
+        },
+    },
+    'components': {'schemas': {'Pet': {
+        'type': 'object',
+        'required': ['name'],
+        'properties': {
+            'name': {'type': 'string'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+        },
+    }}},
+}
+
+
+def specification():
+    specification = OpenAPI.fromJson(SPECIFICATION)
+    specification.accept(TypeVisitor(SPECIFICATION))
+    return specification
+
+
+async def app(scope, receive, send):
+    """Echo the request body and path parameters."""
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    payload = json.dumps({
+        'body': body.decode('utf-8'),
+        'path_params': scope.get('path_params')}).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def request(middleware, method, path, body,
+            contentType=b'application/json'):
+    """Send one request through `middleware`, in chunks of 1 KiB."""
+    chunks = [body[i:i + 1024] for i in range(0, len(body), 1024)] or [b'']
+    messages = [
+        {'type': 'http.request', 'body': chunk,
+         'more_body': i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+    scope = {'type': 'http', 'method': method, 'path': path,
+             'headers': [(b'content-type', contentType)]}
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+class Counting(concurrent.futures.ThreadPoolExecutor):
+
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class MiddlewareTestCase(unittest.TestCase):
+
+    def runTest(self):
+        executor = Counting(1)
+        middleware = Middleware(
+            app, specification(), threshold=4096, executor=executor)
+        body = json.dumps({'name': 'Fluffy'}).encode('utf-8')
+        status, payload = request(middleware, 'PUT', '/pets/7', body)
+        self.assertEqual((status, payload['body']), (200, body.decode()))
+        self.assertEqual(payload['path_params'], {'petId': '7'})
+        status, payload = request(
+            middleware, 'PUT', '/pets/7', b'{"name": 1}')
+        self.assertEqual(status, 422)
+        self.assertEqual(payload['errors'][0]['instance'], '/name')
+        status, payload = request(middleware, 'PUT', '/pets/7', b'{"name"')
+        self.assertEqual(status, 400)
+        # Requests without a schema are passed through untouched.
+        status, payload = request(middleware, 'PUT', '/pets/7', b'x',
+                                  contentType=b'text/plain')
+        self.assertEqual((status, payload['body']), (200, 'x'))
+        status, _ = request(middleware, 'GET', '/pets', b'')
+        self.assertEqual(status, 200)
+        self.assertEqual(executor.submitted, 0)
+        # Large bodies are validated in the pool.
+        large = json.dumps({'name': 'Fluffy', 'tags': ['a'] * 2000})
+        status, payload = request(
+            middleware, 'PUT', '/pets/7', large.encode('utf-8'))
+        self.assertEqual((status, payload['body']), (200, large))
+        status, payload = request(
+            middleware, 'PUT', '/pets/7',
+            json.dumps({'tags': [1] * 2000}).encode('utf-8'))
+        self.assertEqual((status, len(payload['errors'])), (422, 10))
+        self.assertEqual(executor.submitted, 2)
+        middleware.close()
+        executor.shutdown()
+
+
+class ProcessMiddlewareTestCase(unittest.TestCase):
+
+    def runTest(self):
+        middleware = Middleware(
+            app, specification(), threshold=0, processes=1)
+        try:
+            status, _ = request(
+                middleware, 'PUT', '/pets/1', b'{"name": "Fluffy"}')
+            self.assertEqual(status, 200)
+            status, payload = request(middleware, 'PUT', '/pets/1', b'{}')
+            self.assertEqual(status, 422)
+            self.assertEqual(payload['errors'][0]['keyword'], 'required')
+        finally:
+            middleware.close()
+
+
+class ExternalProcessMiddlewareTestCase(unittest.TestCase):
+
+    def runTest(self):
+        executor = concurrent.futures.ProcessPoolExecutor(1)
+        try:
+            for _ in range(2):
+                # Both middlewares share the workers and their cache.
+                middleware = Middleware(
+                    app, specification(), threshold=0, executor=executor)
+                status, _ = request(
+                    middleware, 'PUT', '/pets/1', b'{"name": "Fluffy"}')
+                self.assertEqual(status, 200)
+                status, payload = request(
+                    middleware, 'PUT', '/pets/1', b'{}')
+                self.assertEqual(status, 422)
+                self.assertEqual(
+                    payload['errors'][0]['keyword'], 'required')
+                middleware.close()
+        finally:
+            executor.shutdown()
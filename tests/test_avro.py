@@ -0,0 +1,242 @@
+import io
+import json
+import os
+import unittest
+
+from aptos import primitives
+from aptos.avro import Codec, Reader, Writer
+from aptos.util import Parser
+from aptos.visitors import RecordVisitor, TypeVisitor
+
+try:
+    import fastavro
+except ImportError:
+    fastavro = None
+
+
+class AvroTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        codec = Codec(record)
+        instance = json.loads('''
+        {
+            "id": 2.0,
+            "name": "An ice sculpture",
+            "price": 12.50,
+            "tags": ["cold", "ice"],
+            "dimensions": {
+                "length": 7.0,
+                "width": 12.0,
+                "height": 9.5
+            },
+            "warehouseLocation": {
+                "latitude": -78.75,
+                "longitude": 20.4
+            }
+        }
+        ''')
+        data = codec.encode(instance)
+        self.assertLess(len(data), len(json.dumps(instance)))
+        self.assertEqual(codec.decode(data), instance)
+        instance = {'id': 1.0, 'name': 'A', 'price': 1.0}
+        self.assertEqual(codec.decode(codec.encode(instance)), instance)
+        with self.assertRaises(ValueError):
+            codec.encode({'id': 1.0, 'price': 1.0})
+        with self.assertRaises(ValueError):
+            codec.decode(data[:-1])
+        with self.assertRaises(ValueError):
+            codec.decode(data + b'\x00')
+
+
+class RecursiveAvroTestCase(unittest.TestCase):
+
+    def runTest(self):
+        instance = {
+            'title': 'Comment',
+            'type': 'object',
+            'properties': {
+                'text': {'type': 'string'},
+                'score': {'type': ['integer', 'null']},
+                'state': {'title': 'State', 'enum': ['open', 'closed']},
+                'replies': {'type': 'array', 'items': {'$ref': '#'}},
+            },
+            'required': ['text', 'score'],
+        }
+        record = TypeVisitor(instance).resolve(
+            '', primitives.Record.fromJson(instance))
+        codec = Codec(record)
+        instance = {'text': 'a', 'score': None, 'replies': [
+            {'text': 'b', 'score': -300, 'state': 'open'},
+            {'text': 'c', 'score': 1 << 40, 'replies': []},
+        ]}
+        self.assertEqual(codec.decode(codec.encode(instance)), instance)
+        with self.assertRaises(ValueError):
+            codec.encode({'text': 'a', 'score': 'high'})
+        with self.assertRaises(ValueError):
+            codec.encode({'text': 'a', 'score': 1, 'state': 'merged'})
+
+
+class NamedAvroTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        schema = record.accept(RecordVisitor())
+        names = dict(
+            (field['name'], field['type'][1]['name'])
+            for field in schema['fields'][-2:])
+        self.assertEqual(names, {
+            'dimensions': 'Dimensions',
+            'warehouseLocation': 'WarehouseLocation'})
+        instance = {
+            'type': 'object',
+            'definitions': {'person': {
+                'type': 'object',
+                'properties': {'name': {'type': 'string'}},
+                'required': ['name'],
+            }},
+            'properties': {
+                'author': {'$ref': '#/definitions/person'},
+                'editor': {'$ref': '#/definitions/person'},
+                'first-state': {'enum': ['open', 'closed']},
+                'second-state': {'enum': ['open', 'closed']},
+            },
+            'required': ['author', 'editor', 'first-state', 'second-state'],
+        }
+        record = TypeVisitor(instance).resolve(
+            '', primitives.Record.fromJson(instance))
+        schema = record.accept(RecordVisitor())
+        self.assertEqual(schema['name'], 'Record')
+        types = [field['type'] for field in schema['fields']]
+        self.assertEqual(types[0]['name'], 'Author')
+        self.assertEqual(types[1], 'Author')
+        self.assertEqual(
+            [types[2]['name'], types[3]['name']],
+            ['FirstState', 'SecondState'])
+        codec = Codec(record)
+        instance = {'author': {'name': 'Ada'}, 'editor': {'name': 'Grace'},
+                    'first-state': 'open', 'second-state': 'closed'}
+        self.assertEqual(codec.decode(codec.encode(instance)), instance)
+        for symbols in (['open', 1], ['in progress']):
+            with self.assertRaises(ValueError):
+                primitives.Enumerated(enum=symbols).accept(RecordVisitor())
+        with self.assertRaises(ValueError):
+            Codec({'type': 'enum', 'name': '', 'symbols': ['a']})
+        with self.assertRaises(ValueError):
+            Codec({'type': 'record', 'name': 'A', 'fields': [
+                {'name': 'b', 'type': {
+                    'type': 'enum', 'name': 'A', 'symbols': ['a']}}]})
+
+
+class UnionAvroTestCase(unittest.TestCase):
+
+    def runTest(self):
+        codec = Codec([
+            {'type': 'record', 'name': 'Point', 'fields': [
+                {'name': 'x', 'type': 'double'},
+                {'name': 'y', 'type': 'double'}]},
+            {'type': 'record', 'name': 'Circle', 'fields': [
+                {'name': 'x', 'type': 'double'},
+                {'name': 'y', 'type': 'double'},
+                {'name': 'radius', 'type': 'double'}]},
+            {'type': 'enum', 'name': 'Color', 'symbols': ['red', 'blue']},
+            {'type': 'enum', 'name': 'Shape', 'symbols': ['round', 'flat']},
+            'string',
+            'int',
+            'long',
+        ])
+        for instance, index in (({'x': 1.0, 'y': 2.0}, 0),
+                                ({'x': 1.0, 'y': 2.0, 'radius': 3.0}, 1),
+                                ('blue', 2), ('flat', 3), ('green', 4),
+                                (1, 5), (1 << 40, 6)):
+            data = codec.encode(instance)
+            self.assertEqual(data[0], index * 2)
+            self.assertEqual(codec.decode(data), instance)
+        for instance in ({'x': 1.0}, {'x': 1.0, 'y': 2.0, 'z': 3.0}):
+            with self.assertRaises(ValueError):
+                codec.encode(instance)
+
+
+class ZigZagTestCase(unittest.TestCase):
+
+    def runTest(self):
+        codec = Codec('long')
+        for value, data in ((0, b'\x00'), (-1, b'\x01'), (1, b'\x02'),
+                            (-64, b'\x7f'), (64, b'\x80\x01')):
+            self.assertEqual(codec.encode(value), data)
+            self.assertEqual(codec.decode(data), value)
+        for value in (-(1 << 63), (1 << 63) - 1):
+            self.assertEqual(codec.decode(codec.encode(value)), value)
+        with self.assertRaises(ValueError):
+            codec.encode(1 << 63)
+        for kind, value in (('long', True), ('long', 1.0), ('boolean', 'no'),
+                            ('boolean', 1), ('double', '1.5'),
+                            ('double', False), ('float', 1e40)):
+            with self.assertRaises(ValueError):
+                Codec(kind).encode(value)
+        codec = Codec({'type': 'map', 'values': ['null', 'boolean', 'double']})
+        instance = {'a': None, 'b': True, 'c': 2.5, 'd': 3}
+        self.assertEqual(codec.decode(codec.encode(instance)), instance)
+
+
+class ContainerTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = primitives.Record.fromJson({
+            'title': 'Event',
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer'},
+                'name': {'type': 'string'},
+            },
+            'required': ['id', 'name'],
+        })
+        instances = [
+            {'id': i, 'name': 'event %d' % (i % 10)} for i in range(1000)]
+        sizes = {}
+        for codec in ('null', 'deflate'):
+            fp = io.BytesIO()
+            with Writer(fp, record, codec, blockSize=1024) as writer:
+                writer.writeMany(instances[:500])
+                with self.assertRaises(ValueError):
+                    writer.write({'id': 1})
+                writer.writeMany(instances[500:])
+            data = fp.getvalue()
+            self.assertEqual(data[:4], b'Obj\x01')
+            self.assertGreater(data.count(writer.sync), 10)
+            sizes[codec] = len(data)
+            reader = Reader(io.BytesIO(data))
+            self.assertEqual(reader.codec, codec)
+            self.assertEqual(reader.schema['name'], 'Event')
+            self.assertEqual(list(reader), instances)
+        self.assertLess(sizes['deflate'], sizes['null'])
+        with self.assertRaises(ValueError):
+            Writer(io.BytesIO(), record, 'snappy')
+        with self.assertRaises(ValueError):
+            Reader(io.BytesIO(b'{"id": 1}'))
+
+
+@unittest.skipIf(fastavro is None, 'fastavro is not installed')
+class InteropTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        instances = [{
+            'id': float(i), 'name': 'product %d' % i, 'price': 1.5 * i,
+            'tags': ['a', 'b'][:i % 3],
+            'dimensions': {'length': 1.0, 'width': 2.0, 'height': 3.0},
+            'warehouseLocation': {'latitude': -78.75, 'longitude': 20.4},
+        } for i in range(100)]
+        for codec in ('null', 'deflate'):
+            fp = io.BytesIO()
+            with Writer(fp, record, codec, blockSize=512) as writer:
+                writer.writeMany(instances)
+            fp.seek(0)
+            self.assertEqual(list(fastavro.reader(fp)), instances)
+            fp = io.BytesIO()
+            fastavro.writer(fp, Codec(record).schema, instances, codec)
+            fp.seek(0)
+            self.assertEqual(list(Reader(fp)), instances)
@@ -0,0 +1,78 @@
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from aptos.__main__ import main
+from aptos.avro import Reader
+
+
+class ValidateCommandTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = os.path.join(os.path.dirname(__file__), 'schemas', 'product')
+        instances = [
+            {'id': 1, 'name': 'An ice sculpture', 'price': 12.50},
+            {'id': 2, 'name': 'A snow sculpture'},
+            {'id': 3, 'name': 'A sand sculpture', 'price': 4.0},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'instances.ndjson')
+            with open(filename, 'w') as fp:
+                for instance in instances:
+                    fp.write(json.dumps(instance) + '\n')
+                fp.write('\n{"id": \n')
+            output = os.path.join(directory, 'errors.tsv')
+            self.assertEqual(
+                main(['validate', schema, filename, '--output', output]), 1)
+            with open(output) as fp:
+                lines = [line.split('\t')[0] for line in fp]
+        self.assertEqual(lines, ['2', '5'])
+
+
+class ConvertCommandTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = os.path.join(os.path.dirname(__file__), 'schemas', 'product')
+        instances = [
+            {'id': 1.0, 'name': 'An ice sculpture', 'price': 12.50},
+            {'id': 2.0, 'name': 'A snow sculpture'},
+            {'id': 3.0, 'name': 'A sand sculpture', 'price': 4.0,
+             'tags': ['sand']},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'instances.ndjson')
+            with open(filename, 'w') as fp:
+                for instance in instances:
+                    fp.write(json.dumps(instance) + '\n')
+            output = os.path.join(directory, 'instances.avro')
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                self.assertEqual(
+                    main(['convert', schema, filename, output]), 1)
+            self.assertEqual(stdout.getvalue().split('\t')[0], '2')
+            with open(output, 'rb') as fp:
+                self.assertEqual(
+                    list(Reader(fp)), [instances[0], instances[2]])
+
+
+class GenerateCommandTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = os.path.join(
+            os.path.dirname(__file__), 'schemas', 'petstore')
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'validators.py')
+            self.assertEqual(main(['generate', schema, '-o', output]), 0)
+            self.assertTrue(os.listdir(os.path.join(
+                directory, '__pycache__')))
+            spec = importlib.util.spec_from_file_location(
+                'validators', output)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        module.validate_Pets([{'id': 1, 'name': 'Fluffy'}])
+        with self.assertRaises(AssertionError):
+            module.validate_Pet({'id': '1', 'name': 'Fluffy'})
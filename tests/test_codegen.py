@@ -0,0 +1,111 @@
+import os
+import types
+import unittest
+
+from aptos import primitives
+from aptos.codegen import generate
+from aptos.compiler import compile
+from aptos.util import Parser
+from aptos.visitors import TypeVisitor
+
+SCHEMAS = {
+    'Event': {'oneOf': [
+        {'type': 'object', 'properties': {
+            'kind': {'const': kind}, 'size': {'type': 'integer',
+                                              'minimum': minimum}},
+         'required': ['kind']}
+        for minimum, kind in enumerate(('a', 'b', 'c'))] + [
+        {'type': 'string', 'pattern': '^x'}]},
+    'Score': {'type': ['integer', 'string', 'null'], 'minimum': 2,
+              'maxLength': 3},
+    'Tree': {
+        'title': 'Tree',
+        'type': 'object',
+        'properties': {
+            'value': {'enum': [1, 'a', True, {'x': 1}]},
+            'children': {'type': 'array', 'items': {'$ref': '#'},
+                         'uniqueItems': True, 'maxItems': 2},
+        },
+        'patternProperties': {'^p': {'type': 'boolean'}},
+    },
+    'Pair': {'type': 'array', 'additionalItems': False, 'items': [
+        {'type': 'string', 'minLength': 1}, {'type': 'number'}]},
+}
+
+INSTANCES = (
+    None, True, 0, 2, 5, 2.5, '', 'x', 'abcd', [], ['a', 1], ['a', 1, 2],
+    [1, 'a'], {}, {'kind': 'a'}, {'kind': 'b', 'size': 0}, {'kind': 'z'},
+    {'value': 1, 'children': [{'value': 'a'}, {'value': 'a'}]},
+    {'value': 2}, {'p1': True}, {'p1': 1},
+    {'children': [{'children': [{'value': {'x': 1}}]}]},
+)
+
+
+def load(source):
+    module = types.ModuleType('validators')
+    exec(source, module.__dict__)
+    return module
+
+
+def error(validate, instance):
+    try:
+        validate(instance)
+    except AssertionError as e:
+        return str(e)
+    return None
+
+
+class GeneratedProductTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        source = generate({'Product': record})
+        self.assertNotIn('aptos import', source)
+        validate = load(source).validate_Product
+        validate({'id': 2, 'name': 'An ice sculpture', 'price': 12.50,
+                  'dimensions': {'length': 7.0, 'width': 12.0,
+                                 'height': 9.5}})
+        for instance in (
+                {'id': 2, 'name': 'An ice sculpture', 'price': 0},
+                {'id': 2, 'name': 'An ice sculpture', 'price': 1,
+                 'dimensions': {'length': 7.0}},
+                {'id': True, 'name': 'An ice sculpture', 'price': 1}):
+            with self.assertRaises(AssertionError):
+                validate(instance)
+
+
+class GeneratedParityTestCase(unittest.TestCase):
+
+    def runTest(self):
+        trees = dict(
+            (name, TypeVisitor(schema).resolve(
+                '', primitives.Creator.create(
+                    schema.get('type')).fromJson(schema)))
+            for name, schema in SCHEMAS.items())
+        source = generate(trees)
+        self.assertEqual(source, generate(trees))
+        module = load(source)
+        for name, tree in trees.items():
+            validate, check = getattr(module, 'validate_' + name), compile(
+                tree)
+            for instance in INSTANCES:
+                self.assertEqual(
+                    error(validate, instance), error(check, instance))
+
+
+class GeneratedBackreferenceTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = primitives.Record.fromJson({
+            'type': 'object',
+            'patternProperties': {
+                r'^(a)\1$': {'type': 'integer'},
+                r'^(b)\1$': {'type': 'integer'},
+            },
+        })
+        validate = load(generate({'Pairs': record})).validate_Pairs
+        validate({'aa': 1, 'bb': 2, 'ab': 'x'})
+        for instance in ({'aa': 'x'}, {'bb': 'x'}):
+            with self.assertRaises(AssertionError):
+                validate(instance)
@@ -0,0 +1,98 @@
+import json
+import os
+import re
+import unittest
+
+from aptos import primitives
+from aptos.compiler import compile
+from aptos.util import Parser
+from aptos.visitors import ValidationVisitor
+
+
+class CompilerTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        validate = compile(record)
+        instance = json.loads('''
+        {
+            "id": 2,
+            "name": "An ice sculpture",
+            "price": 12.50,
+            "tags": ["cold", "ice"],
+            "dimensions": {
+                "length": 7.0,
+                "width": 12.0,
+                "height": 9.5
+            },
+            "warehouseLocation": {
+                "latitude": -78.75,
+                "longitude": 20.4
+            }
+        }
+        ''')
+        validate(instance)
+        del instance['dimensions']['width']
+        with self.assertRaises(AssertionError):
+            validate(instance)
+        with self.assertRaises(AssertionError):
+            validate({'id': 2, 'name': 'An ice sculpture', 'price': '12.50'})
+        with self.assertRaises(AssertionError):
+            validate({'id': 2, 'name': 'An ice sculpture', 'price': 12.50,
+                      'tags': []})
+
+
+class CompiledKeywordTestCase(unittest.TestCase):
+
+    def runTest(self):
+        validate = compile(primitives.String(minLength=2, maxLength=3))
+        validate('AB')
+        for instance in ('A', 'ABCD', 2):
+            with self.assertRaises(AssertionError):
+                validate(instance)
+        validate = compile(primitives.Array(items=[
+            primitives.Integer(),
+            primitives.String(),
+            primitives.String(enum=['Street', 'Avenue', 'Boulevard']),
+        ]))
+        validate([1600, 'Pennsylvania', 'Avenue'])
+        with self.assertRaises(AssertionError):
+            validate([24, 'Sussex', 'Drive'])
+        with self.assertRaises(AssertionError):
+            validate([True, 'Sussex', 'Avenue'])
+        validate = compile(primitives.Array(
+            items=primitives.Integer(), uniqueItems=True, minItems=2,
+            maxItems=3))
+        validate([1, 2])
+        for instance in ([1], [1, 2, 3, 4], [1, 1]):
+            with self.assertRaises(AssertionError):
+                validate(instance)
+
+
+class AgreementTestCase(unittest.TestCase):
+
+    def runTest(self):
+        components = (
+            primitives.String(maxLength=3),
+            primitives.Integer(minimum=0),
+            primitives.Number(maximum=10),
+            primitives.Boolean(),
+            primitives.Null(),
+            primitives.Array(maxItems=1),
+            primitives.Record(
+                maxProperties=1, properties=primitives.Properties()),
+        )
+        instances = ('abc', 'abcd', 1, -1, 1.5, 11.0, True, None, [], [1, 2],
+                     {}, {'a': 1, 'b': 2})
+        for component in components:
+            validate = compile(component)
+            for instance in instances:
+                try:
+                    validate(instance)
+                except AssertionError as e:
+                    with self.assertRaisesRegex(
+                            AssertionError, '^%s$' % re.escape(str(e))):
+                        component.accept(ValidationVisitor(instance))
+                else:
+                    component.accept(ValidationVisitor(instance))
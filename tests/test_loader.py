@@ -1,10 +1,13 @@
 import json
 import os
+import shutil
+import tempfile
 import unittest
 
+from aptos.compiler import compile
 from aptos.util import Parser
-from aptos.primitives import Array, Record
-from aptos.visitors import ValidationVisitor
+from aptos.primitives import Array, Record, Reference
+from aptos.visitors import RecordVisitor, TypeVisitor, ValidationVisitor
 
 
 class LoaderTestCase(unittest.TestCase):
@@ -33,3 +36,82 @@ class LoaderTestCase(unittest.TestCase):
         self.assertEqual(len(record.definitions), 1)
         self.assertIsInstance(record.properties['warehouseLocation'], Record)
         self.assertIsInstance(record.properties['tags'], Array)
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'product')
+            shutil.copy(os.path.join(
+                os.path.dirname(__file__), 'schemas', 'product'), filename)
+            snapshots = os.path.join(directory, 'snapshots')
+            record = Parser.parse(filename, snapshots)
+            self.assertIs(Parser.parse(filename), record)
+            self.assertEqual(len(os.listdir(snapshots)), 1)
+            Parser.cache.clear()
+            snapshot = Parser.parse(filename, snapshots)
+            self.assertIsNot(snapshot, record)
+            self.assertEqual(
+                sorted(snapshot.properties), sorted(record.properties))
+            with open(filename) as fp:
+                instance = json.load(fp)
+            instance['title'] = 'Item'
+            with open(filename, 'w') as fp:
+                json.dump(instance, fp)
+            self.assertEqual(Parser.parse(filename).title, 'Item')
+
+
+class ReferenceTestCase(unittest.TestCase):
+
+    def runTest(self):
+        instance = {
+            'title': 'Comment',
+            'definitions': {
+                'author': {
+                    'type': 'object',
+                    'properties': {'name': {'type': 'string'}},
+                    'required': ['name'],
+                },
+            },
+            'properties': {
+                'author': {'$ref': '#/definitions/author'},
+                'editor': {'$ref': '#/definitions/author'},
+                'replies': {'type': 'array', 'items': {'$ref': '#'}},
+            },
+        }
+        record = TypeVisitor(instance).resolve('', Record.fromJson(instance))
+        properties = record.properties
+        self.assertIs(properties['author'], properties['editor'])
+        self.assertIs(record.definitions['author'], properties['author'])
+        instance = {
+            'definitions': {
+                'alias': {'$ref': '#/definitions/name'},
+                'name': {'type': 'string'},
+            },
+            'properties': {
+                'first': {'$ref': '#/definitions/alias'},
+                'last': {'$ref': '#/definitions/name'},
+            },
+        }
+        aliased = TypeVisitor(instance).resolve('', Record.fromJson(instance))
+        self.assertIs(aliased.properties['first'], aliased.properties['last'])
+        self.assertIs(aliased.definitions['name'], aliased.properties['last'])
+        reference = properties['replies'].items
+        self.assertIsInstance(reference, Reference)
+        self.assertIs(reference.target, record)
+        comment = {
+            'author': {'name': 'Ada'},
+            'replies': [{'author': {'name': 'Grace'}, 'replies': [
+                {'author': {'name': 'Ada'}}]}],
+        }
+        compile(record)(comment)
+        record.accept(ValidationVisitor(comment))
+        comment['replies'][0]['replies'][0]['author'] = {}
+        with self.assertRaises(AssertionError):
+            compile(record)(comment)
+        with self.assertRaises(AssertionError):
+            record.accept(ValidationVisitor(comment))
+        schema = record.accept(RecordVisitor())
+        self.assertEqual(schema['fields'][-1]['type'], [
+            'null', {'type': 'array', 'items': 'Comment'}])
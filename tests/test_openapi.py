@@ -2,7 +2,11 @@ import json
 import os
 import unittest
 
-from aptos.models import OpenAPI, TypeVisitor
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+from aptos.models import Lazy, OpenAPI, PathItem, TypeVisitor
+from aptos.primitives import Record
 from aptos.visitors import RecordVisitor
 
 
@@ -11,8 +15,76 @@ class OpenAPITestCase(unittest.TestCase):
     def runTest(self):
         with open(os.path.join(os.path.dirname(__file__), 'schemas', 'petstore')) as fp:  # noqa: E501
             instance = json.load(fp)
+        original = deepcopy(instance)
         specification = OpenAPI.fromJson(instance)
         specification.accept(TypeVisitor(instance))
+        self.assertEqual(instance, original)
         record = specification.components['schemas']['Pet']
         schema = record.accept(RecordVisitor())
         print(json.dumps(schema, indent=2))
+
+
+class LazyOpenAPITestCase(unittest.TestCase):
+
+    def runTest(self):
+        with open(os.path.join(os.path.dirname(__file__), 'schemas', 'petstore')) as fp:  # noqa: E501
+            instance = json.load(fp)
+        specification = OpenAPI.fromJson(instance, lazy=True)
+        paths = specification.paths
+        self.assertIsInstance(dict.__getitem__(paths, '/pets'), dict)
+        operation = paths['/pets'].get
+        self.assertIsInstance(dict.__getitem__(paths, '/pets'), PathItem)
+        self.assertIsInstance(dict.__getitem__(paths, '/pets/{petId}'), dict)
+        content = operation.responses['200'].content
+        schema = content['application/json'].schema
+        self.assertIs(schema, specification.components['schemas']['Pets'])
+        self.assertIsInstance(schema.items, Record)
+
+
+class LazyMappingTestCase(unittest.TestCase):
+
+    def runTest(self):
+        def convert(key, value):
+            converted.append(key)
+            return value * 2
+        converted = []
+        lazy = Lazy({'a': 1, 'b': 2, 'c': 3}, convert)
+        self.assertEqual(dict(lazy), {'a': 2, 'b': 4, 'c': 6})
+        self.assertEqual(sorted(converted), ['a', 'b', 'c'])
+        lazy = Lazy({'a': 1, 'b': 2, 'c': 3}, convert)
+        self.assertEqual({**lazy}, {'a': 2, 'b': 4, 'c': 6})
+        lazy = Lazy({'a': 1, 'b': 2, 'c': 3}, convert)
+        self.assertEqual(lazy, {'a': 2, 'b': 4, 'c': 6})
+        self.assertEqual(repr(Lazy({'a': 1}, convert)), "Lazy({'a': 2})")
+        lazy = Lazy({'a': 1, 'b': 2, 'c': 3}, convert)
+        self.assertEqual(lazy.pop('a'), 2)
+        self.assertEqual(lazy.setdefault('b'), 4)
+        self.assertEqual(lazy.copy(), {'b': 4, 'c': 6})
+        self.assertEqual(lazy.popitem(), ('c', 6))
+        lazy.update(d=1)
+        self.assertEqual(lazy['d'], 1)
+        lazy = Lazy({'a': 1, 'b': 2}, convert)
+        items, values = lazy.items(), lazy.values()
+        self.assertEqual((len(items), len(values)), (2, 2))
+        self.assertEqual(list(items), [('a', 2), ('b', 4)])
+        self.assertEqual(list(items), [('a', 2), ('b', 4)])
+        self.assertEqual(list(values), [2, 4])
+        self.assertIn(('b', 4), items)
+
+
+class ConcurrentLazyTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with open(os.path.join(os.path.dirname(__file__), 'schemas', 'petstore')) as fp:  # noqa: E501
+            instance = json.load(fp)
+        specification = OpenAPI.fromJson(instance, lazy=True)
+        schemas = specification.components['schemas']
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(
+                lambda name: schemas[name], list(schemas) * 8))
+        for name, schema in zip(list(schemas) * 8, results):
+            self.assertIs(schema, schemas[name])
+        # Specifications convert under locks of their own.
+        other = OpenAPI.fromJson(instance, lazy=True)
+        self.assertIs(schemas.lock, specification.paths.lock)
+        self.assertIsNot(schemas.lock, other.components['schemas'].lock)
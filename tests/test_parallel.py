@@ -0,0 +1,36 @@
+import json
+import os
+import tempfile
+import unittest
+
+from aptos import ndjson, parallel
+from aptos.util import Parser
+
+
+class ParallelValidationTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'instances.ndjson')
+            with open(filename, 'w') as fp:
+                for i in range(1, 1001):
+                    instance = {'id': i, 'name': 'product', 'price': 1.0}
+                    if not i % 97:
+                        del instance['price']
+                    fp.write(json.dumps(instance) + '\n')
+                    if not i % 250:
+                        fp.write('\n')
+            offsets = parallel.shards(filename, 7)
+            self.assertEqual(offsets[0][0], 0)
+            self.assertEqual(offsets[-1][1], os.path.getsize(filename))
+            with open(filename, 'rb') as fp:
+                data = fp.read()
+            for begin, end in offsets:
+                self.assertEqual(data[end - 1:end], b'\n')
+            meter = ndjson.Meter()
+            errors = list(parallel.validate(schema, filename, 2, meter))
+        self.assertEqual(meter.records, 1000)
+        self.assertEqual([lineno for lineno, error in errors], [
+            i + i // 250 for i in range(97, 1001, 97)])
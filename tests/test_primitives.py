@@ -0,0 +1,64 @@
+import pickle
+import unittest
+
+from aptos import primitives
+
+
+class SlotsTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = primitives.Record.fromJson({
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'maxLength': 8},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+            },
+        })
+        name = record.properties['name']
+        tags = record.properties['tags']
+        for primitive in (record, name, tags, tags.items):
+            self.assertFalse(hasattr(primitive, '__dict__'))
+        self.assertEqual(name.maxLength, 8)
+        self.assertEqual(list(name.enum), [])
+        self.assertIs(name.allOf, record.allOf)
+        self.assertIs(name.definitions, tags.definitions)
+        self.assertIs(record.patternProperties, primitives.EMPTY)
+        with self.assertRaises(TypeError):
+            record.patternProperties['^x-'] = name
+        record = pickle.loads(pickle.dumps(record))
+        self.assertEqual(record.properties['name'].maxLength, 8)
+        self.assertIs(
+            record.properties['name'].allOf, record.properties['tags'].allOf)
+
+
+class RequiredTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = primitives.Record.fromJson({
+            'type': 'object', 'required': ['b', 'a', 'c', 'a']})
+        self.assertEqual(record.required, ['b', 'a', 'c'])
+        self.assertEqual(primitives.Record().required, [])
+
+
+class SharedEmptyTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record, string = primitives.Record(), primitives.String()
+        for mutate in (
+                lambda: record.allOf.append(string),
+                lambda: record.allOf.extend([string]),
+                lambda: record.definitions.update(a=string),
+                lambda: record.enum.append('a'),
+                lambda: record.required.insert(0, 'a'),
+                lambda: record.anyOf.append(string)):
+            with self.assertRaises(TypeError):
+                mutate()
+        with self.assertRaises(TypeError):
+            record.allOf += [string]
+        for keyword in ('allOf', 'definitions', 'enum', 'anyOf', 'oneOf'):
+            self.assertEqual(len(getattr(string, keyword)), 0)
+        # Absent keywords have the types they have when present.
+        for keyword in ('enum', 'required', 'anyOf', 'oneOf'):
+            self.assertIsInstance(getattr(record, keyword), list)
+        self.assertIsInstance(
+            primitives.Record(enum=[{}], required=['a']).enum, list)
@@ -0,0 +1,124 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from aptos import primitives
+from aptos.protobuf import Codec, proto
+from aptos.util import Parser
+from aptos.visitors import ProtobufVisitor, TypeVisitor
+
+COMMENT = {
+    'title': 'Comment',
+    'type': 'object',
+    'properties': {
+        'text': {'type': 'string'},
+        'x-score': {'type': ['integer', 'string', 'null']},
+        'state': {'enum': ['open', 'closed']},
+        'ids': {'type': 'array', 'items': {'type': 'integer'}},
+        'replies': {'type': 'array', 'items': {'$ref': '#'}},
+    },
+}
+
+
+def comment():
+    return TypeVisitor(COMMENT).resolve(
+        '', primitives.Record.fromJson(COMMENT))
+
+
+class ProtobufVisitorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        message = record.accept(ProtobufVisitor())
+        self.assertEqual(
+            [(field['name'], field['number']) for field in message['fields']],
+            [('id', 1), ('name', 2), ('price', 3), ('tags', 4),
+             ('dimensions', 5), ('warehouseLocation', 6)])
+        self.assertEqual(message['fields'][3]['label'], 'repeated')
+        self.assertEqual(message['fields'][4]['type']['name'], 'Dimensions')
+        text = proto(comment().accept(ProtobufVisitor()), 'aptos')
+        self.assertIn('  oneof x_score {\n', text)
+        self.assertIn(
+            'int64 x_score_int64 = 1017 [json_name = "x-score"];', text)
+        self.assertIn('  State state = 3;\n', text)
+        self.assertIn('  repeated Comment replies = 5;\n', text)
+        self.assertIn('    STATE_UNSPECIFIED = 0;\n', text)
+
+
+class ProtobufCodecTestCase(unittest.TestCase):
+
+    def runTest(self):
+        codec = Codec(comment())
+        instance = {'text': 'a', 'x-score': -5, 'ids': [1, -2, 300],
+                    'replies': [{'text': 'b', 'state': 'closed',
+                                 'x-score': 'high'}]}
+        data = codec.encode(instance)
+        # `ids` is packed: one key, one length and three varints.
+        self.assertIn(b'\x22\x0d\x01' + b'\xfe' + b'\xff' * 8 + b'\x01', data)
+        self.assertEqual(codec.decode(data), instance)
+        self.assertEqual(codec.decode(b''), {})
+        # Fields this schema does not know are skipped.
+        self.assertEqual(codec.decode(b'\x78\x01' + data), instance)
+        with self.assertRaises(ValueError):
+            codec.decode(data[:-1])
+        with self.assertRaises(ValueError):
+            codec.encode({'state': 'merged'})
+        with self.assertRaises(ValueError):
+            codec.encode({'x-score': 2.5})
+
+
+class FieldNumberTestCase(unittest.TestCase):
+
+    def runTest(self):
+        instance = {
+            'title': 'Event',
+            'type': 'object',
+            'properties': {
+                'kind': {'type': 'null'},
+                'value': {'type': ['boolean', 'string']},
+                'done': {'type': 'boolean'},
+                'weight': {'type': 'number'},
+            },
+            'x-protobuf-fields': {'weight': 1, 'removed': 2},
+        }
+        message = primitives.Record.fromJson(instance).accept(
+            ProtobufVisitor())
+        self.assertEqual(
+            [(field['name'], field.get('number'))
+             for field in message['fields']],
+            [('value', None), ('done', 5), ('weight', 1)])
+        self.assertEqual(
+            [field['number'] for field in message['fields'][0]['fields']],
+            [1048, 1051])
+        instance['properties']['value']['type'].insert(0, 'integer')
+        message = primitives.Record.fromJson(instance).accept(
+            ProtobufVisitor())
+        self.assertEqual(
+            [field['number'] for field in message['fields'][0]['fields']],
+            [1049, 1048, 1051])
+        codec = Codec(message)
+        for value in ({'done': 1}, {'weight': '1.5'}, {'weight': True}):
+            with self.assertRaises(ValueError):
+                codec.encode(value)
+        instance['x-protobuf-fields'] = {'weight': 1, 'done': 1}
+        with self.assertRaises(ValueError):
+            primitives.Record.fromJson(instance).accept(ProtobufVisitor())
+
+
+@unittest.skipIf(shutil.which('protoc') is None, 'protoc is not installed')
+class ProtocTestCase(unittest.TestCase):
+
+    def runTest(self):
+        codec = Codec(comment())
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'comment.proto'), 'w') as fp:
+                fp.write(proto(codec.schema, 'aptos'))
+            output = subprocess.check_output(
+                ['protoc', '--decode=aptos.Comment', 'comment.proto'],
+                cwd=directory, input=codec.encode(
+                    {'text': 'a', 'ids': [7, -9], 'state': 'open'}))
+        self.assertEqual(output.decode('utf-8').split('\n'), [
+            'text: "a"', 'state: STATE_OPEN', 'ids: 7', 'ids: -9', ''])
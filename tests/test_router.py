@@ -0,0 +1,81 @@
+import json
+import os
+import unittest
+
+from aptos.models import OpenAPI, TypeVisitor
+from aptos.router import Router
+
+
+def specification(instance):
+    specification = OpenAPI.fromJson(instance)
+    specification.accept(TypeVisitor(instance))
+    return specification
+
+
+class PetstoreRouterTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with open(os.path.join(os.path.dirname(__file__), 'schemas', 'petstore')) as fp:  # noqa: E501
+            router = Router(specification(json.load(fp)))
+        self.assertEqual(
+            sorted(repr(route) for route in router.routes()),
+            ["Route('GET', '/pets')", "Route('GET', '/pets/{petId}')",
+             "Route('POST', '/pets')"])
+        route, parameters = router.match('GET', '/pets/fluffy%20one?x=1')
+        self.assertEqual(route.template, '/pets/{petId}')
+        self.assertEqual(parameters, {'petId': 'fluffy one'})
+        self.assertIsNone(router.match('DELETE', '/pets'))
+        self.assertIsNone(router.match('GET', '/pets/1/toys'))
+        self.assertIsNone(router.match('GET', '/pets/'))
+        route, _ = router.match('get', '/pets')
+        validator = route.response(200, 'application/json; charset=utf-8')
+        validator.validate([{'id': 1, 'name': 'Fluffy'}])
+        with self.assertRaises(AssertionError):
+            validator.validate([{'id': 1}])
+        # Other statuses fall back to the `default` error response.
+        self.assertIs(
+            route.response(500),
+            router.validator(route.operation.responses['default'].content[
+                'application/json'].schema))
+        self.assertIsNone(route.request())
+        self.assertIsNone(route.response(200, 'text/plain'))
+
+
+class TemplateRouterTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = {'$ref': '#/components/schemas/User'}
+        operation = {'responses': {'2XX': {'description': '', 'content': {
+            'application/*': {'schema': schema}}}}}
+        paths = dict(
+            ('/users/%d/{id}' % index, {'get': operation})
+            for index in range(500))
+        paths['/users/me/{id}'] = {
+            'get': operation,
+            'post': {'requestBody': {'content': {'*/*': {'schema': schema}}},
+                     'responses': {}}}
+        paths['/files/{name}.{extension}'] = {'get': operation}
+        paths['/files/{path}'] = {'get': operation}
+        router = Router(specification({
+            'openapi': '3.0.0', 'paths': paths, 'components': {'schemas': {
+                'User': {'type': 'object', 'required': ['name']}}}}))
+        self.assertEqual(len(list(router.routes())), 504)
+        route, parameters = router.match('GET', '/users/499/7')
+        self.assertEqual(
+            (route.template, parameters), ('/users/499/{id}', {'id': '7'}))
+        route, _ = router.match('POST', '/users/me/7')
+        route.request('application/json').validate({'name': 'a'})
+        self.assertIsNone(router.match('POST', '/users/1/7'))
+        route, parameters = router.match('GET', '/files/report.tar.gz')
+        self.assertEqual(parameters, {'name': 'report', 'extension': 'tar.gz'})
+        route, parameters = router.match('GET', '/files/README')
+        self.assertEqual(parameters, {'path': 'README'})
+        # Operations referring to one component share its validator.
+        validator = route.response(204, 'application/json')
+        self.assertIs(validator, router.match(
+            'GET', '/users/1/2')[0].response(201, 'application/xml'))
+        with self.assertRaises(AssertionError):
+            validator.validate({})
+        with self.assertRaises(ValueError):
+            router.add('get', '/files/{other}', router.match(
+                'GET', '/files/a')[0].operation)
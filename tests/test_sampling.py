@@ -0,0 +1,139 @@
+import asyncio
+import concurrent.futures
+import threading
+import unittest
+
+from aptos.asgi import Middleware
+from aptos.models import OpenAPI, TypeVisitor
+from aptos.router import Router
+from aptos.sampling import Sampler
+
+SPECIFICATION = {
+    'openapi': '3.0.0',
+    'paths': {
+        '/pets': {'get': {'operationId': 'listPets', 'responses': {
+            '200': {'description': '', 'content': {'application/json': {
+                'schema': {'type': 'array', 'items': {
+                    '$ref': '#/components/schemas/Pet'}}}}}}}},
+        '/pets/{petId}': {'get': {'responses': {
+            '200': {'description': '', 'content': {'application/json': {
+                'schema': {'$ref': '#/components/schemas/Pet'}}}}}}},
+        '/health': {'get': {'responses': {'200': {'description': ''}}}},
+    },
+    'components': {'schemas': {'Pet': {
+        'type': 'object', 'required': ['name'],
+        'properties': {'name': {'type': 'string'}}}}},
+}
+
+
+def router():
+    specification = OpenAPI.fromJson(SPECIFICATION)
+    specification.accept(TypeVisitor(SPECIFICATION))
+    return Router(specification)
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SamplerTestCase(unittest.TestCase):
+
+    def runTest(self):
+        routes = router()
+        pets = routes.match('GET', '/pets')[0]
+        pet = routes.match('GET', '/pets/1')[0]
+        health = routes.match('GET', '/health')[0]
+        failures = []
+        sampler = Sampler(
+            rate=0.5, rates={'listPets': 1.0}, budget=1.0, window=100,
+            report=lambda *args: failures.append(args),
+            random=iter([0.9, 0.4, 0.6, 0.1]).__next__)
+        self.assertTrue(sampler.sample(pets))
+        self.assertEqual(
+            [sampler.sample(pet) for _ in range(3)], [True, False, True])
+        self.assertFalse(sampler.sample(health))
+        self.assertEqual(sampler.check(pets, 200, 'application/json',
+                                       b'[{"name": "Fluffy"}]'), [])
+        errors = sampler.check(pet, 200, 'application/json', b'{}')
+        self.assertEqual(errors[0].keyword, 'required')
+        self.assertEqual(failures, [(pet, 200, errors)])
+        operations = sampler.asJson()['operations']
+        self.assertEqual(
+            dict((name, (counters['seen'], counters['sampled'],
+                         counters['failed']))
+                 for name, counters in operations.items()),
+            {'GET /pets': (1, 1, 0), 'GET /pets/{petId}': (3, 2, 1),
+             'GET /health': (1, 0, 0)})
+        self.assertGreater(operations['GET /pets']['elapsed'], 0)
+
+
+class BudgetTestCase(unittest.TestCase):
+
+    def runTest(self):
+        route = router().match('GET', '/pets/1')[0]
+        clock = Clock()
+        sampler = Sampler(rate=1.0, budget=0.1, window=1.0, clock=clock,
+                          random=lambda: 0.3)
+        sampler.charge(0.5)
+        self.assertEqual(sampler.scale, 1.0)
+        # Half of the window went on validation, five times the budget.
+        clock.now = 1.0
+        sampler.charge(0.0)
+        self.assertAlmostEqual(sampler.scale, 0.2)
+        self.assertFalse(sampler.sample(route))
+        # Without validation the scale recovers, at most doubling.
+        for now, scale in ((2.0, 0.4), (3.0, 0.8), (4.0, 1.0)):
+            clock.now = now
+            sampler.charge(0.0)
+            self.assertAlmostEqual(sampler.scale, scale)
+        self.assertTrue(sampler.sample(route))
+
+
+class SampledMiddlewareTestCase(unittest.TestCase):
+
+    def runTest(self):
+        body = b'[{"id": 1}]'
+
+        async def app(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200,
+                        'headers': [(b'content-type', b'application/json')]})
+            await send({'type': 'http.response.body', 'body': body[:5],
+                        'more_body': True})
+            await send({'type': 'http.response.body', 'body': body[5:]})
+        sampler = Sampler(rate=1.0)
+        validate, threads = sampler.validate, []
+
+        def recorded(*args):
+            threads.append(threading.current_thread().name)
+            return validate(*args)
+        sampler.validate = recorded
+        executor = concurrent.futures.ThreadPoolExecutor(
+            1, thread_name_prefix='pool')
+        routes = router()
+        for threshold in (64 * 1024, 0):
+            # Large responses are checked in the pool, off the event loop.
+            middleware = Middleware(
+                app, routes, threshold=threshold, executor=executor,
+                sampler=sampler)
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                sent.append(message)
+            asyncio.run(middleware(
+                {'type': 'http', 'method': 'GET', 'path': '/pets',
+                 'headers': []}, receive, send))
+            self.assertEqual(
+                b''.join(message.get('body', b'') for message in sent), body)
+        executor.shutdown()
+        self.assertEqual(threads[0], threading.main_thread().name)
+        self.assertTrue(threads[1].startswith('pool'))
+        self.assertEqual(
+            sampler.asJson()['operations']['GET /pets']['failed'], 2)
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+
+from aptos import primitives
+from aptos.thrift import Codec, idl
+from aptos.util import Parser
+from aptos.visitors import ThriftVisitor, TypeVisitor
+
+try:
+    import thriftpy2
+    from thriftpy2.protocol import TCompactProtocolFactory
+    from thriftpy2.utils import deserialize
+except ImportError:
+    thriftpy2 = None
+
+COMMENT = {
+    'title': 'Comment',
+    'type': 'object',
+    'properties': {
+        'text': {'type': 'string'},
+        'x-score': {'type': ['integer', 'string', 'null']},
+        'state': {'enum': ['open', 'closed']},
+        'done': {'type': 'boolean'},
+        'ids': {'type': 'array', 'items': {'type': 'integer'}},
+        'replies': {'type': 'array', 'items': {'$ref': '#'}},
+    },
+    'required': ['text'],
+}
+
+
+def comment():
+    return TypeVisitor(COMMENT).resolve(
+        '', primitives.Record.fromJson(COMMENT))
+
+
+class ThriftVisitorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        record = Parser.parse(os.path.join(
+            os.path.dirname(__file__), 'schemas', 'product'))
+        struct = record.accept(ThriftVisitor())
+        self.assertEqual(
+            [(field['id'], field['name'], field['required'])
+             for field in struct['fields']][:4],
+            [(1, 'id', True), (2, 'name', True), (3, 'price', True),
+             (4, 'tags', False)])
+        self.assertEqual(
+            struct['fields'][3]['type'], {'type': 'list', 'items': 'string'})
+        text = idl(comment().accept(ThriftVisitor()))
+        self.assertLess(text.index('union XScore {'),
+                        text.index('struct Comment {'))
+        self.assertIn('  2: optional XScore x_score,\n', text)
+        self.assertIn('  6: optional list<Comment> replies,\n', text)
+        self.assertIn('  CLOSED = 2\n', text)
+
+
+class ThriftCodecTestCase(unittest.TestCase):
+
+    def runTest(self):
+        codec = Codec(comment())
+        instance = {'text': 'a', 'x-score': -5, 'done': False,
+                    'ids': list(range(-1, 20)),
+                    'replies': [{'text': 'b', 'state': 'closed',
+                                 'x-score': 'high', 'done': True}]}
+        data = codec.encode(instance)
+        # `text` is field 1, a binary, and its header is a delta.
+        self.assertEqual(data[:3], b'\x18\x01a')
+        self.assertEqual(codec.decode(data), instance)
+        with self.assertRaises(ValueError):
+            codec.encode({'done': True})
+        for done in ('no', 1):
+            with self.assertRaises(ValueError):
+                codec.encode({'text': 'a', 'done': done})
+        with self.assertRaises(ValueError):
+            codec.encode({'text': 'a', 'x-score': 2.5})
+        with self.assertRaises(ValueError):
+            codec.decode(data[:-1])
+
+
+class FieldIdTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'kind': {'type': 'null'},
+                'done': {'type': 'boolean'},
+                'weight': {'type': 'number'},
+            },
+            'x-thrift-fields': {'weight': 1, 'removed': 2},
+        }
+        record = primitives.Record.fromJson(schema)
+        struct = record.accept(ThriftVisitor())
+        self.assertEqual(
+            [(field['id'], field['name']) for field in struct['fields']],
+            [(4, 'done'), (1, 'weight')])
+        self.assertTrue(idl(struct).startswith('struct Struct {\n'))
+        codec = Codec(record)
+        instance = {'done': True, 'weight': 2.5}
+        self.assertEqual(codec.decode(codec.encode(instance)), instance)
+        for weight in ('2.5', True, 1 << 1100):
+            with self.assertRaises(ValueError):
+                codec.encode({'weight': weight})
+        for pins in ({'weight': 0}, {'weight': 1, 'done': 1}):
+            schema['x-thrift-fields'] = pins
+            with self.assertRaises(ValueError):
+                primitives.Record.fromJson(schema).accept(ThriftVisitor())
+
+
+@unittest.skipIf(thriftpy2 is None, 'thriftpy2 is not installed')
+class CompactProtocolTestCase(unittest.TestCase):
+
+    def runTest(self):
+        codec = Codec(comment())
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'comment.thrift')
+            with open(filename, 'w') as fp:
+                fp.write(idl(codec.schema))
+            module = thriftpy2.load(filename, module_name='comment_thrift')
+        value = deserialize(module.Comment(), codec.encode(
+            {'text': 'a', 'x-score': 'high', 'state': 'open', 'ids': [7]}),
+            TCompactProtocolFactory())
+        self.assertEqual(value.text, 'a')
+        self.assertEqual(value.x_score.stringValue, 'high')
+        self.assertEqual((value.state, value.ids), (1, [7]))
@@ -1,6 +1,9 @@
 import unittest
 
+from concurrent.futures import ThreadPoolExecutor
+
 from aptos import primitives
+from aptos.validator import Validator, validate_many
 from aptos.visitors import ValidationVisitor
 
 
@@ -66,3 +69,262 @@ class ArrayValidatorTestCase(unittest.TestCase):
             items=primitives.Integer(), uniqueItems=True)
         with self.assertRaises(AssertionError):
             component.accept(ValidationVisitor([1, 2, 3, 3, 4]))
+
+
+class NumberValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = primitives.Number(
+            minimum=0, exclusiveMinimum=True, maximum=100, multipleOf=0.5)
+        component.accept(ValidationVisitor(12.5))
+        component.accept(ValidationVisitor(100))
+        for instance in (0, -1, 100.5, 12.25):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+        component = primitives.Integer(maximum=10, exclusiveMaximum=True)
+        component.accept(ValidationVisitor(9))
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(10))
+        component = primitives.Number(minimum=0, multipleOf=2)
+        for instance in ('abc', True, None, [1]):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+        with self.assertRaises(AssertionError):
+            primitives.Integer(minimum=0).accept(ValidationVisitor(1.5))
+
+
+class ValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        validator = Validator(primitives.Record(
+            properties=primitives.Properties({
+                'name': primitives.String(minLength=1),
+                'tags': primitives.Array(items=primitives.String()),
+            }),
+            required=['name']
+        ))
+        validator.validate({'name': 'William Shakespeare', 'tags': []})
+        with self.assertRaises(AssertionError):
+            validator.validate({'tags': ['playwright']})
+        instances = [{'name': str(i), 'tags': [str(i)]} for i in range(64)]
+        instances.extend({'name': ''} for i in range(64))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(validator.isValid, instances))
+        self.assertEqual(results, [True] * 64 + [False] * 64)
+
+
+class BatchValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = primitives.Array(
+            items=primitives.Integer(), uniqueItems=True)
+        instances = [[1, 2], [1, 1], [], [3], ['a'], [4, 5, 6], [7], [8, 8],
+                     [9], [10, 11]]
+        results = validate_many(component, iter(instances))
+        self.assertEqual(len(results), 10)
+        self.assertEqual(list(results), [
+            True, False, True, True, False, True, True, False, True, True])
+        self.assertEqual(sorted(results.errors), [1, 4, 7])
+        self.assertEqual(results.errors[4], "'a' is not of type ('int',)")
+        self.assertEqual((results.valid, results.invalid), (7, 3))
+        self.assertEqual(len(results.bitmap), 2)
+        self.assertFalse(results)
+        self.assertTrue(results[-1])
+
+
+class PatternValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with self.assertRaises(ValueError):
+            primitives.String.fromJson({'type': 'string', 'pattern': '('})
+        component = primitives.Record.fromJson({
+            'type': 'object',
+            'patternProperties': {
+                '^x-': {'type': 'string', 'pattern': '^[a-z]+$'},
+                'count$': {'type': 'integer', 'minimum': 0},
+            },
+        })
+        self.assertIsInstance(
+            component.patternProperties, primitives.PatternProperties)
+        validator = Validator(component)
+        for instance in ({'x-name': 'abc', 'count': 1, 'other': None},
+                         {'x-total': 'abc'}):
+            validator.validate(instance)
+            component.accept(ValidationVisitor(instance))
+        for instance in ({'x-name': 'ABC'}, {'count': -1},
+                         {'x-total': 'abc', 'item_count': -2}):
+            with self.assertRaises(AssertionError):
+                validator.validate(instance)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+        component = primitives.Record(
+            patternProperties={'^p': primitives.Boolean()})
+        self.assertIsInstance(
+            component.patternProperties, primitives.PatternProperties)
+        Validator(component).validate({'p1': True, 'q': 1})
+        component.accept(ValidationVisitor({'p1': True, 'q': 1}))
+        with self.assertRaises(AssertionError):
+            Validator(component).validate({'p1': 1})
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor({'p1': 1}))
+        # Backreferences keep pointing at the groups of their own pattern.
+        component = primitives.Record.fromJson({
+            'type': 'object',
+            'patternProperties': {
+                r'^(a)\1$': {'type': 'integer'},
+                r'^(b)\1$': {'type': 'integer'},
+            },
+        })
+        self.assertIsNone(component.patternProperties.expression)
+        for instance in ({'aa': 'notint'}, {'bb': 'notint'}):
+            with self.assertRaises(AssertionError):
+                Validator(component).validate(instance)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+
+
+class EnumValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        symbols = ['SE', 'NW', 1, {'x': [1, 2]}, None, 'SE']
+        component = primitives.Enumerated(enum=symbols)
+        self.assertEqual(component.enum, symbols[:-1])
+        validator = Validator(component)
+        for instance in ('NW', 1.0, {'x': [1.0, 2]}, None):
+            validator.validate(instance)
+            component.accept(ValidationVisitor(instance))
+        for instance in ('NE', True, {'x': [2, 1]}, [None]):
+            with self.assertRaises(AssertionError):
+                validator.validate(instance)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+        component = primitives.Enumerated(const={'a': [True]})
+        Validator(component).validate({'a': [True]})
+        with self.assertRaises(AssertionError):
+            Validator(component).validate({'a': [1]})
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor({'a': [1]}))
+
+
+class UniqueItemsValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = primitives.Array(uniqueItems=True)
+        validator = Validator(component)
+        for instance in ([1, True, '1'], [{'a': 1}, {'a': 2}], [[1], [1, 1]]):
+            validator.validate(instance)
+            component.accept(ValidationVisitor(instance))
+        for instance, index in (([1, 2, 1.0], 2),
+                                ([{'a': 1, 'b': 2}, {'b': 2, 'a': 1.0}], 1),
+                                ([[1], [True], [1]], 2)):
+            with self.assertRaises(AssertionError) as context:
+                validator.validate(instance)
+            self.assertIn('at index %d ' % index, str(context.exception))
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+
+
+class ErrorsValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        validator = Validator(primitives.Record(
+            properties=primitives.Properties({
+                'name': primitives.String(minLength=1),
+                'tags': primitives.Array(
+                    items=primitives.String(pattern='^[a-z]+$'),
+                    uniqueItems=True),
+                'age': primitives.Integer(minimum=0),
+            }),
+            required=['name']
+        ))
+        self.assertEqual(validator.errors({'name': 'Ada', 'tags': []}), [])
+        instance = {'tags': ['a/b', 'c', 'c'], 'age': -1}
+        errors = validator.errors(instance)
+        self.assertEqual(sorted(
+            (error.keyword, error.instancePointer, error.schemaPointer)
+            for error in errors), [
+            ('minimum', '/age', '/properties/age/minimum'),
+            ('pattern', '/tags/0', '/properties/tags/items/pattern'),
+            ('required', '', '/required'),
+            ('uniqueItems', '/tags', '/properties/tags/uniqueItems'),
+        ])
+        self.assertIn('-1', errors[[
+            error.keyword for error in errors].index('minimum')].message)
+        self.assertEqual(len(validator.errors(instance, max_errors=2)), 2)
+        self.assertEqual(validator.errors(
+            {'name': 1})[0].asJson(), {
+            'keyword': 'type', 'instance': '/name',
+            'schema': '/properties/name/type',
+            'message': "1 is not of type ('str',)"})
+
+
+class UnionValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = primitives.Union.fromJson(
+            {'type': ['number', 'null'], 'minimum': 0})
+        validator = Validator(component)
+        for instance in (1, 2.5, None):
+            validator.validate(instance)
+            component.accept(ValidationVisitor(instance))
+        for instance in (-1, True, 'a', []):
+            with self.assertRaises(AssertionError):
+                validator.validate(instance)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+
+
+class CombinatorValidatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = primitives.Enumerated.fromJson({
+            'anyOf': [{'type': 'string'}, {'type': 'integer'}],
+            'oneOf': [{'type': 'integer'}, {'type': 'number', 'minimum': 5}],
+        })
+        validator = Validator(component)
+        for instance in (1, 3):
+            validator.validate(instance)
+            component.accept(ValidationVisitor(instance))
+        for instance in (6, 2.5, 'a', None):
+            with self.assertRaises(AssertionError):
+                validator.validate(instance)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+        self.assertEqual(
+            [error.keyword for error in validator.errors(None)],
+            ['anyOf', 'oneOf'])
+        component = primitives.Enumerated.fromJson({'oneOf': [{
+            'type': 'object',
+            'properties': {
+                'kind': {'const': 'event-%d' % i},
+                'value': {'type': 'integer'},
+            },
+            'required': ['kind', 'value'],
+        } for i in range(32)] + [{'type': 'string'}]})
+        validator = Validator(component)
+        validator.validate({'kind': 'event-7', 'value': 1})
+        validator.validate('event-7')
+        for instance in ({'kind': 'event-7', 'value': 'x'},
+                         {'kind': 'event-99', 'value': 1}, {'value': 1}):
+            with self.assertRaises(AssertionError):
+                validator.validate(instance)
+        self.assertEqual(component.oneOf.discriminator, 'kind')
+        self.assertEqual(
+            len(component.oneOf.candidates({'kind': 'event-7'})), 1)
+        self.assertEqual(len(component.oneOf.candidates({})), 32)
+        self.assertEqual(len(component.oneOf.candidates('')), 1)
+        component = primitives.Enumerated(
+            anyOf=[primitives.String(), primitives.Integer()],
+            oneOf=[primitives.Integer(), primitives.Number(minimum=5)],
+            allOf=[primitives.Number(maximum=10)])
+        self.assertIsInstance(component.anyOf, primitives.AnyOf)
+        self.assertIsInstance(component.oneOf, primitives.OneOf)
+        self.assertIsInstance(component.allOf, primitives.AllOf)
+        validator = Validator(component)
+        validator.validate(3)
+        component.accept(ValidationVisitor(3))
+        for instance in (6, 12, 'a'):
+            with self.assertRaises(AssertionError):
+                validator.validate(instance)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
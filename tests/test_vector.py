@@ -0,0 +1,80 @@
+import unittest
+
+from aptos import primitives, vector
+from aptos.compiler import compile
+from aptos.visitors import ValidationVisitor
+
+
+@unittest.skipIf(vector.numpy is None, 'NumPy is not installed')
+class VectorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = primitives.Array(items=primitives.Number(
+            minimum=0, maximum=1, exclusiveMaximum=True))
+        validate = compile(component)
+        instance = [i / 1000 for i in range(1000)]
+        validate(instance)
+        component.accept(ValidationVisitor(instance))
+        instance[10], instance[999] = -0.5, -1
+        with self.assertRaises(AssertionError) as context:
+            validate(instance)
+        self.assertIn('[10, 999]', str(context.exception))
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(instance))
+        with self.assertRaises(AssertionError):
+            validate([0.5] * 999 + [True])
+        validate = compile(primitives.Array(items=primitives.String(
+            maxLength=3, enum=['a', 'ab', 'abc', 'abcd'])))
+        validate(['a', 'ab', 'abc'] * 100)
+        with self.assertRaises(AssertionError) as context:
+            validate(['a', 'ab', 'abc'] * 100 + ['abcd'])
+        self.assertIn('[300]', str(context.exception))
+
+
+class ScalarFallbackTestCase(unittest.TestCase):
+
+    def runTest(self):
+        validate = compile(primitives.Array(
+            items=primitives.Integer(multipleOf=3)))
+        validate([3 * i for i in range(vector.THRESHOLD * 2)])
+        with self.assertRaises(AssertionError):
+            validate([3 * i + 1 for i in range(vector.THRESHOLD * 2)])
+        with self.assertRaises(AssertionError):
+            validate([0, 3, 6.5] * vector.THRESHOLD)
+
+
+@unittest.skipIf(vector.numpy is None, 'NumPy is not installed')
+class VectorAgreementTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # Long arrays are accepted or rejected like short ones.
+        for items, element in (
+                (primitives.Integer(enum=[1.0, 2.0]), 1),
+                (primitives.Number(enum=[1, 2.5]), 1.0),
+                (primitives.String(minLength=3), 'ab\x00')):
+            validate = compile(primitives.Array(items=items))
+            validate([element] * 3)
+            validate([element] * vector.THRESHOLD * 2)
+        for items, element in (
+                (primitives.Integer(enum=[True, 2]), 1),
+                (primitives.String(maxLength=2), 'ab\x00')):
+            validate = compile(primitives.Array(items=items))
+            for size in (3, vector.THRESHOLD * 2):
+                with self.assertRaises(AssertionError):
+                    validate([element] * size)
+
+
+class CombinatorFallbackTestCase(unittest.TestCase):
+
+    def runTest(self):
+        for keyword in ('anyOf', 'oneOf'):
+            component = primitives.Array(items=primitives.Integer(**{
+                keyword: [primitives.Integer(minimum=10)]}))
+            self.assertIsNone(vector.vectorize(component.items))
+            validate = compile(component)
+            validate([10] * vector.THRESHOLD * 2)
+            for instance in ([1], [1] * vector.THRESHOLD * 2):
+                with self.assertRaises(AssertionError):
+                    validate(instance)
+                with self.assertRaises(AssertionError):
+                    component.accept(ValidationVisitor(instance))